@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Array Backtest Engine
+Long-only signal backtests without a per-bar Python loop
+
+Same rules as the original StockBacktester.run_backtest loop:
+- Enter long on an entry signal when flat, buying int(cash * position_size / price)
+  shares at the close
+- From the bar after entry, exit at the close on the first bar where
+  1. the exit signal fires (PROFIT), else
+  2. close < entry * (1 - stop_loss_pct) (LOSS), else
+  3. close > entry * (1 + take_profit_pct) (PROFIT)
+- No new entry on the exit bar; a position still open at the end stays open
+- Equity = cash + shares * close while long, cash otherwise
+
+Instead of visiting every bar, the engine jumps from event to event: the
+next entry and the next exit signal come from np.searchsorted over the
+signal positions, and stop/target hits from a vectorized scan of the
+closes after the entry (in growing chunks, so long holds stay cheap).
+Python only runs once per trade. Cash and equity are then laid out per
+bar with np.repeat, using the same floating point operations as the loop,
+so results match it exactly.
+"""
+
+import numpy as np
+
+EXIT_SIGNAL = 0
+EXIT_STOP = 1
+EXIT_TARGET = 2
+
+# Trade log type of each exit reason
+EXIT_TYPES = {EXIT_SIGNAL: 'PROFIT', EXIT_STOP: 'LOSS', EXIT_TARGET: 'PROFIT'}
+
+
+def _next_position(positions, start):
+    """First signal position >= start (None if there is none)"""
+    i = np.searchsorted(positions, start)
+    return int(positions[i]) if i < len(positions) else None
+
+
+def _first_cross(close, start, stop, low_level, high_level):
+    """First bar in [start, stop) with close < low_level or close > high_level (stop if none)"""
+    size = 32
+    while start < stop:
+        end = min(start + size, stop)
+        segment = close[start:end]
+        hits = np.flatnonzero((segment < low_level) | (segment > high_level))
+        if len(hits):
+            return start + int(hits[0])
+        start = end
+        size *= 2
+    return stop
+
+
+def run_signals(close, entries, exits, stop_loss_pct=0.025, take_profit_pct=0.04,
+                initial_capital=100000000, position_size=0.2):
+    """
+    Backtest one ticker from entry/exit signal arrays
+
+    Args:
+        close: Close prices, float array[bars]
+        entries: bool array[bars], entry signal (ignored where close is NaN)
+        exits: bool array[bars], exit signal (ignored where close is NaN)
+        stop_loss_pct, take_profit_pct: Stop and target distance from the entry price
+        initial_capital: Starting cash
+        position_size: Fraction of cash invested per trade
+
+    Returns:
+        Dictionary with one entry per trade:
+            entry_index, exit_index (-1 while open), exit_reason (EXIT_*, -1 while open),
+            quantity, entry_price, exit_price, pnl
+        and one entry per bar:
+            cash, quantity_held, in_position, equity
+        plus final_cash (cash at the last bar, with an open position's cost deducted)
+    """
+    close = np.asarray(close, dtype=np.float64)
+    bars = len(close)
+    entry_positions = np.flatnonzero(np.asarray(entries, dtype=bool) & ~np.isnan(close))
+    exit_positions = np.flatnonzero(np.asarray(exits, dtype=bool) & ~np.isnan(close))
+
+    cash = initial_capital
+    trades = {name: [] for name in ('entry_index', 'exit_index', 'exit_reason', 'quantity', 'entry_price', 'exit_price', 'pnl')}
+    # Bars where cash / holdings change, with the values from that bar on
+    changes, cash_levels, held_levels = [0], [cash], [0]
+
+    start = 0
+    while True:
+        entry = _next_position(entry_positions, start)
+        if entry is None:
+            break
+
+        price = close[entry]
+        quantity = int((cash * position_size) / price)
+        cash = cash - (quantity * price)
+        changes.append(entry)
+        cash_levels.append(cash)
+        held_levels.append(quantity)
+
+        # Exit signal wins over stop/target on the same bar
+        signal_exit = _next_position(exit_positions, entry + 1)
+        limit = signal_exit if signal_exit is not None else bars
+        exit_bar = _first_cross(close, entry + 1, limit, price * (1 - stop_loss_pct), price * (1 + take_profit_pct))
+
+        trades['entry_index'].append(entry)
+        trades['quantity'].append(quantity)
+        trades['entry_price'].append(price)
+
+        if exit_bar >= bars:
+            trades['exit_index'].append(-1)
+            trades['exit_reason'].append(-1)
+            trades['exit_price'].append(np.nan)
+            trades['pnl'].append(np.nan)
+            break
+
+        exit_price = close[exit_bar]
+        if exit_bar == signal_exit:
+            reason = EXIT_SIGNAL
+        elif exit_price < price * (1 - stop_loss_pct):
+            reason = EXIT_STOP
+        else:
+            reason = EXIT_TARGET
+
+        cash = cash + (quantity * exit_price)
+        changes.append(exit_bar)
+        cash_levels.append(cash)
+        held_levels.append(0)
+
+        trades['exit_index'].append(exit_bar)
+        trades['exit_reason'].append(reason)
+        trades['exit_price'].append(exit_price)
+        trades['pnl'].append((exit_price - price) * quantity)
+
+        start = exit_bar + 1
+
+    # Lay the piecewise constant cash / holdings out per bar
+    lengths = np.diff(np.append(changes, bars))
+    cash_per_bar = np.repeat(np.array(cash_levels, dtype=np.float64), lengths)
+    held = np.repeat(np.array(held_levels, dtype=np.int64), lengths)
+    in_position = np.repeat(np.arange(len(changes)) % 2 == 1, lengths)
+
+    equity = np.where(in_position, cash_per_bar + (held * close), cash_per_bar)
+
+    result = {name: np.array(values) for name, values in trades.items()}
+    result['entry_index'] = result['entry_index'].astype(np.int64)
+    result['exit_index'] = result['exit_index'].astype(np.int64)
+    result['exit_reason'] = result['exit_reason'].astype(np.int64)
+    result['quantity'] = result['quantity'].astype(np.int64)
+    result.update({
+        'cash': cash_per_bar,
+        'quantity_held': held,
+        'in_position': in_position,
+        'equity': equity,
+        'final_cash': cash,
+    })
+    return result
+
+
+def trade_log(result, dates, extra=None):
+    """
+    Trade records in the loop's format (one BUY and one SELL dict per trade)
+
+    Args:
+        result: Output of run_signals
+        dates: Bar dates (DatetimeIndex)
+        extra: Dictionary of field -> array[bars] recorded on every trade (e.g., {'rsi': rsi})
+
+    Returns:
+        List of dicts in chronological order
+    """
+    extra = extra or {}
+    records = []
+
+    for i, entry in enumerate(result['entry_index']):
+        price = float(result['entry_price'][i])
+        quantity = int(result['quantity'][i])
+
+        buy = {'date': dates[entry], 'action': 'BUY', 'price': price, 'quantity': quantity, 'type': 'LONG'}
+        buy.update({field: values[entry] for field, values in extra.items()})
+        records.append(buy)
+
+        exit_bar = result['exit_index'][i]
+        if exit_bar < 0:
+            continue
+
+        sell = {
+            'date': dates[exit_bar],
+            'action': 'SELL',
+            'price': float(result['exit_price'][i]),
+            'quantity': quantity,
+            'type': EXIT_TYPES[int(result['exit_reason'][i])],
+            'pnl': float(result['pnl'][i]),
+            'hold_days': (dates[exit_bar] - dates[entry]).days,
+        }
+        sell.update({field: values[exit_bar] for field, values in extra.items()})
+        records.append(sell)
+
+    return records
+
+
+def max_bar_drawdown(equity):
+    """Largest single-bar equity drop as a fraction of the previous bar (0 if none)"""
+    equity = np.asarray(equity, dtype=np.float64)
+    if len(equity) < 2:
+        return 0.0
+
+    previous, current = equity[:-1], equity[1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        drops = np.where(current < previous, (previous - current) / previous, 0.0)
+    return max(float(np.max(drops)), 0.0)
+
+
+def sharpe_ratio(equity):
+    """Annualized Sharpe ratio of daily equity returns (0 without returns)"""
+    equity = np.asarray(equity, dtype=np.float64)
+    daily_returns = equity[1:] / equity[:-1] - 1
+    daily_returns = daily_returns[~np.isnan(daily_returns)]
+    if len(daily_returns) == 0:
+        return 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (daily_returns.mean() * 252) / (daily_returns.std(ddof=1) * np.sqrt(252))
+
+
+def summarize(result, initial_capital=100000000):
+    """
+    Performance metrics of a run_signals result (or another result with the same trade fields)
+
+    Same definitions as StockBacktester.run_backtest: trades counts the BUY
+    and SELL records, win rate is PROFIT exits over those records, profit
+    factor is 0 without losing trades.
+
+    Returns:
+        Dictionary with final_capital, total_pnl, total_return, win_rate,
+        max_drawdown, sharpe_ratio, profit_factor, total_trades,
+        winning_trades, losing_trades
+    """
+    reasons = result['exit_reason']
+    pnl = result['pnl']
+
+    closed = reasons >= 0
+    losing = reasons == EXIT_STOP
+    winning = closed & ~losing
+    records = len(reasons) + int(closed.sum())
+
+    # P&L per BUY/SELL record, summed in trade log order like run_backtest's DataFrame
+    buy_records = np.arange(len(reasons)) + np.cumsum(closed) - closed
+    record_pnl = np.zeros(records)
+    record_pnl[buy_records[closed] + 1] = pnl[closed]
+    total_pnl = float(record_pnl.sum())
+    winning_pnl = float(pnl[winning].sum())
+    losing_pnl = float(pnl[losing].sum())
+
+    return {
+        'final_capital': result['final_cash'],
+        'total_pnl': total_pnl,
+        'total_return': (total_pnl / initial_capital) * 100,
+        'win_rate': (int(winning.sum()) / records) * 100 if records else 0.0,
+        'max_drawdown': max_bar_drawdown(result['equity']) * 100,
+        'sharpe_ratio': float(sharpe_ratio(result['equity'])),
+        'profit_factor': abs(winning_pnl) / abs(losing_pnl) if losing_pnl != 0 else 0,
+        'total_trades': records,
+        'winning_trades': int(winning.sum()),
+        'losing_trades': int(losing.sum()),
+    }
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Portfolio Backtest Engine
+All tickers on one date axis with a shared cash balance
+
+Same trade rules as backtest_engine.run_signals, per ticker:
+- Exit at the close on the first bar after entry where the exit signal
+  fires (PROFIT), close < entry * (1 - stop_loss_pct) (LOSS) or
+  close > entry * (1 + take_profit_pct) (PROFIT)
+- No new entry in a ticker on its exit bar
+
+Portfolio rules:
+- One cash balance; exits are settled before entries on the same bar
+- At most max_positions open positions; when more tickers signal than
+  there are free slots, higher scores go first (ticker order without scores)
+- Each new position buys int(min(cash, equity * position_size) / price) shares,
+  where equity is cash plus holdings at the current closes
+- Holdings are valued at the last known close (a suspended ticker keeps
+  its last price), so the combined equity has no gaps
+
+The engine steps through the dates once, with every step a handful of
+array operations across all tickers (exits, stop/target levels, holdings);
+dates with no open position and no entry signal are skipped. With a single
+ticker and max_positions=1 it reproduces run_signals exactly.
+
+Output:
+- /tmp/portfolio_trade_log.csv    - One row per trade
+- /tmp/portfolio_equity_curve.csv - Cash, holdings value, equity and open positions per date
+
+Usage:
+    python scripts/trading/portfolio.py [--universe] [--strategy=rsi_divergence] [--max-positions=3]
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+import sys
+import os
+import time
+
+# Shared data modules live in the top-level trading/ directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'trading'))
+
+from data_quality import QualityIndex
+import backtest_engine
+from backtest_engine import EXIT_SIGNAL, EXIT_STOP, EXIT_TARGET, EXIT_TYPES
+from simple_backtest import strategy_signals
+from sweep import load_prices
+
+
+def align_prices(prices, column='Close'):
+    """
+    One column of several tickers on their combined date axis
+
+    Args:
+        prices: Dictionary of ticker -> DataFrame (DatetimeIndex)
+
+    Returns:
+        (dates, tickers, values): DatetimeIndex, list, float array[dates, tickers]
+        (NaN where a ticker has no bar)
+    """
+    tickers = list(prices)
+    frame = pd.concat([prices[ticker][column].rename(ticker) for ticker in tickers], axis=1).sort_index()
+    return frame.index, tickers, frame.to_numpy(dtype=np.float64)
+
+
+def portfolio_signals(prices, strategy_name="rsi_divergence", rsi_oversold=30, rsi_overbought=70, rsi_period=14):
+    """
+    Close prices and entry/exit signals of every ticker on the combined date axis
+
+    Returns:
+        (dates, tickers, close, entries, exits): arrays are [dates, tickers]
+    """
+    dates, tickers, close = align_prices(prices)
+    entries = np.zeros(close.shape, dtype=bool)
+    exits = np.zeros(close.shape, dtype=bool)
+
+    for column, ticker in enumerate(tickers):
+        data = prices[ticker]
+        ticker_entries, ticker_exits = strategy_signals(strategy_name, data, rsi_oversold, rsi_overbought, rsi_period)
+        rows = dates.get_indexer(data.index)
+        entries[rows, column] = ticker_entries
+        exits[rows, column] = ticker_exits
+
+    return dates, tickers, close, entries, exits
+
+
+def _last_known(values):
+    """Forward-fill NaN down each column"""
+    rows = np.where(np.isnan(values), 0, np.arange(values.shape[0])[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])]
+
+
+def run_portfolio(close, entries, exits, max_positions=3, position_size=0.2, stop_loss_pct=0.025,
+                  take_profit_pct=0.04, initial_capital=100000000, scores=None):
+    """
+    Backtest several tickers with shared cash
+
+    Args:
+        close: Close prices, float array[dates, tickers] (NaN where not traded)
+        entries, exits: bool arrays[dates, tickers] (ignored where close is NaN)
+        max_positions: Maximum number of open positions
+        position_size: Fraction of equity invested per new position
+        stop_loss_pct, take_profit_pct: Stop and target distance from the entry price
+        initial_capital: Starting cash
+        scores: Optional float array[dates, tickers]; higher scores fill free slots first
+
+    Returns:
+        Dictionary with one entry per trade (in entry order):
+            ticker_index, entry_index, exit_index (-1 while open),
+            exit_reason (EXIT_*, -1 while open), quantity, entry_price, exit_price, pnl
+        and one entry per date:
+            cash, holdings (int array[dates, tickers]), positions, holdings_value, equity
+        plus final_cash
+    """
+    close = np.asarray(close, dtype=np.float64)
+    dates, tickers = close.shape
+    valid = ~np.isnan(close)
+    entries = np.asarray(entries, dtype=bool) & valid
+    exits = np.asarray(exits, dtype=bool) & valid
+    mark = np.nan_to_num(_last_known(close), nan=0.0)
+    has_entry = entries.any(axis=1)
+
+    if scores is not None:
+        scores = np.where(np.isnan(scores), -np.inf, np.asarray(scores, dtype=np.float64))
+
+    cash = initial_capital
+    quantity = np.zeros(tickers, dtype=np.int64)
+    entry_bar = np.full(tickers, -1, dtype=np.int64)
+    entry_price = np.zeros(tickers)
+    trade_number = np.full(tickers, -1, dtype=np.int64)
+
+    trades = {name: [] for name in ('ticker_index', 'entry_index', 'exit_index', 'exit_reason', 'quantity', 'entry_price', 'exit_price', 'pnl')}
+    cash_per_date = np.empty(dates)
+    holdings = np.zeros((dates, tickers), dtype=np.int64)
+    open_positions = 0
+
+    for t in range(dates):
+        if open_positions == 0 and not has_entry[t]:
+            cash_per_date[t] = cash
+            continue
+
+        price = close[t]
+        exited = np.zeros(tickers, dtype=bool)
+
+        if open_positions:
+            # Exit signal wins over stop/target on the same bar
+            held = (quantity > 0) & (entry_bar < t) & valid[t]
+            on_signal = held & exits[t]
+            on_stop = held & ~on_signal & (price < entry_price * (1 - stop_loss_pct))
+            on_target = held & ~on_signal & ~on_stop & (price > entry_price * (1 + take_profit_pct))
+            exited = on_signal | on_stop | on_target
+
+            for column in np.flatnonzero(exited):
+                exit_price = price[column]
+                cash = cash + (quantity[column] * exit_price)
+
+                number = trade_number[column]
+                trades['exit_index'][number] = t
+                trades['exit_reason'][number] = EXIT_SIGNAL if on_signal[column] else (EXIT_STOP if on_stop[column] else EXIT_TARGET)
+                trades['exit_price'][number] = exit_price
+                trades['pnl'][number] = (exit_price - entry_price[column]) * quantity[column]
+
+            quantity[exited] = 0
+            open_positions -= int(exited.sum())
+
+        if has_entry[t] and open_positions < max_positions:
+            candidates = np.flatnonzero(entries[t] & (quantity == 0) & ~exited)
+            if scores is not None and len(candidates):
+                candidates = candidates[np.argsort(-scores[t, candidates], kind='stable')]
+
+            equity = cash + float(np.dot(quantity, mark[t])) if open_positions else cash
+
+            for column in candidates:
+                if open_positions >= max_positions:
+                    break
+
+                buy_price = price[column]
+                shares = int(min(cash, equity * position_size) / buy_price)
+                if shares <= 0:
+                    continue
+
+                cash = cash - (shares * buy_price)
+                quantity[column] = shares
+                entry_bar[column] = t
+                entry_price[column] = buy_price
+                trade_number[column] = len(trades['entry_index'])
+                open_positions += 1
+
+                trades['ticker_index'].append(column)
+                trades['entry_index'].append(t)
+                trades['quantity'].append(shares)
+                trades['entry_price'].append(buy_price)
+                trades['exit_index'].append(-1)
+                trades['exit_reason'].append(-1)
+                trades['exit_price'].append(np.nan)
+                trades['pnl'].append(np.nan)
+
+        cash_per_date[t] = cash
+        holdings[t] = quantity
+
+    holdings_value = np.where(holdings > 0, holdings * mark, 0.0).sum(axis=1)
+
+    result = {name: np.array(values, dtype=np.float64) for name, values in trades.items()}
+    for name in ('ticker_index', 'entry_index', 'exit_index', 'exit_reason', 'quantity'):
+        result[name] = result[name].astype(np.int64)
+    result.update({
+        'cash': cash_per_date,
+        'holdings': holdings,
+        'positions': (holdings > 0).sum(axis=1),
+        'holdings_value': holdings_value,
+        'equity': cash_per_date + holdings_value,
+        'final_cash': cash,
+    })
+    return result
+
+
+def portfolio_trade_log(result, dates, tickers):
+    """
+    One row per trade
+
+    Returns:
+        DataFrame with stock, entry_date, entry_price, quantity, exit_date,
+        exit_price, type (PROFIT/LOSS, OPEN while open), pnl, hold_days
+    """
+    exit_index = result['exit_index']
+    closed = exit_index >= 0
+    exit_dates = pd.Series(pd.NaT, index=range(len(exit_index)), dtype=dates.dtype)
+    exit_dates[closed] = dates[exit_index[closed]]
+    entry_dates = dates[result['entry_index']]
+
+    return pd.DataFrame({
+        'stock': np.asarray(tickers, dtype=object)[result['ticker_index']],
+        'entry_date': entry_dates,
+        'entry_price': result['entry_price'],
+        'quantity': result['quantity'],
+        'exit_date': exit_dates.to_numpy(),
+        'exit_price': result['exit_price'],
+        'type': [EXIT_TYPES[int(reason)] if reason >= 0 else 'OPEN' for reason in result['exit_reason']],
+        'pnl': result['pnl'],
+        'hold_days': (exit_dates - pd.Series(entry_dates)).dt.days.to_numpy(),
+    })
+
+
+def _option(name, default=None):
+    """Value of a --name=value command line option"""
+    for arg in sys.argv:
+        if arg.startswith(f"--{name}="):
+            return arg.split('=', 1)[1]
+    return default
+
+
+def main():
+    """Main function to run the portfolio backtest"""
+    print("=" * 60)
+    print("💼 Portfolio Backtest - Indonesian Banking Stocks")
+    print("=" * 60)
+
+    tickers = ['BMRI.JK', 'BBRI.JK', 'BBCA.JK']
+
+    initial_capital = 100000000  # 100 Juta Rupiah
+    strategy_name = _option('strategy', 'rsi_divergence')
+    max_positions = int(_option('max-positions', 3))
+    position_size = 0.2
+    universe_path = "data/universe" if '--universe' in sys.argv else None
+
+    # Skip tickers flagged by the ingest-time quality checks
+    quality = QualityIndex.load()
+    for ticker in tickers:
+        if not quality.is_ok(ticker):
+            print(f"\n⚠️  Skipping {ticker}: {', '.join(quality.get(ticker)['issues'])}")
+    tickers = quality.filter(tickers)
+
+    prices = load_prices(tickers, universe_path=universe_path)
+    if not prices:
+        print("❌ No price data available")
+        return
+
+    print(f"\n📊 Stocks: {', '.join(prices)}")
+    print(f"📊 Initial Capital: Rp {initial_capital:,} ({initial_capital / 1e6:.2f} Juta)")
+    print(f"📊 Strategy: {strategy_name}, max {max_positions} positions, {position_size * 100:.0f}% of equity each")
+
+    started = time.time()
+    dates, tickers, close, entries, exits = portfolio_signals(prices, strategy_name)
+    result = run_portfolio(close, entries, exits, max_positions, position_size, initial_capital=initial_capital)
+    metrics = backtest_engine.summarize(result, initial_capital)
+    trades = portfolio_trade_log(result, dates, tickers)
+
+    print(f"\n" + "=" * 60)
+    print(f"📊 PORTFOLIO RESULTS: {strategy_name.upper()} ({time.time() - started:.2f}s)")
+    print("=" * 60)
+    print(f"Final Equity: Rp {result['equity'][-1]:,.0f} ({result['equity'][-1] / 1e6:.2f} Juta)")
+    print(f"Total P&L (closed): Rp {metrics['total_pnl']:,.0f}")
+    print(f"Total Return (closed): {metrics['total_return']:.2f}%")
+    print(f"Win Rate: {metrics['win_rate']:.2f}%")
+    print(f"Profit Factor: {metrics['profit_factor']:.2f}")
+    print(f"Max Drawdown: {metrics['max_drawdown']:.2f}%")
+    print(f"Sharpe Ratio: {metrics['sharpe_ratio']:.2f}")
+    print(f"Trades: {len(trades)} ({metrics['winning_trades']} winning, {metrics['losing_trades']} losing)")
+    print(f"Average Open Positions: {result['positions'].mean():.2f}")
+
+    for ticker in tickers:
+        ticker_trades = trades[trades['stock'] == ticker]
+        print(f"  {ticker}: {len(ticker_trades)} trades, P&L Rp {ticker_trades['pnl'].sum():,.0f}")
+
+    print("=" * 60)
+
+    trade_log_file = '/tmp/portfolio_trade_log.csv'
+    trades.to_csv(trade_log_file, index=False)
+
+    equity_curve_file = '/tmp/portfolio_equity_curve.csv'
+    pd.DataFrame({
+        'date': dates,
+        'cash': result['cash'],
+        'holdings_value': result['holdings_value'],
+        'equity': result['equity'],
+        'positions': result['positions'],
+    }).to_csv(equity_curve_file, index=False)
+
+    print(f"\n📄 Exported {datetime.now().strftime('%Y-%m-%d %H:%M')}:")
+    print(f"   ✅ Trade Log: {trade_log_file}")
+    print(f"   ✅ Equity Curve: {equity_curve_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,6 @@ Backtesting Components:
 5. CSV Export - Save all results to CSV files
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -19,6 +18,55 @@ import csv
 import sys
 import os
 
+# Shared data modules live in the top-level trading/ directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'trading'))
+
+from ohlcv_store import OHLCVStore
+from history_cache import cached_history
+from data_quality import QualityIndex
+import indicators
+from multi_timeframe import multi_timeframe
+import patterns
+import backtest_engine
+from indicator_graph import IndicatorGraph
+from strategies import STRATEGIES, OHLCV_COLUMNS, IndicatorColumns, column, get_strategy, run_strategies
+
+def build_strategy(strategy_name, rsi_oversold=30, rsi_overbought=70, rsi_period=14):
+    """
+    Registered strategy instance (see strategies.py)
+
+    Args:
+        strategy_name: Name in strategies.STRATEGIES
+        rsi_oversold, rsi_overbought, rsi_period: Passed to strategies that take them
+
+    Returns:
+        Strategy
+    """
+    if strategy_name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy_name}")
+
+    rsi_params = {'rsi_oversold': rsi_oversold, 'rsi_overbought': rsi_overbought, 'rsi_period': rsi_period}
+    defaults = STRATEGIES[strategy_name].defaults
+    return get_strategy(strategy_name, **{key: value for key, value in rsi_params.items() if key in defaults})
+
+
+def strategy_signals(strategy_name, data, rsi_oversold=30, rsi_overbought=70, rsi_period=14, graph=None):
+    """
+    Entry/exit signals of a registered strategy (see strategies.py)
+
+    Args:
+        strategy_name: Name in strategies.STRATEGIES
+        data: DataFrame with OHLCV columns
+        rsi_oversold, rsi_overbought, rsi_period: Passed to strategies that take them
+        graph: IndicatorGraph over data, to reuse its cached indicators
+
+    Returns:
+        (entries, exits): bool arrays, one value per bar
+    """
+    strategy = build_strategy(strategy_name, rsi_oversold, rsi_overbought, rsi_period)
+    return IndicatorColumns(data, graph).signals(strategy)
+
+
 class StockBacktester:
     """Simple backtesting engine for Indonesian stocks with CSV export"""
 
@@ -28,14 +76,28 @@ class StockBacktester:
         self.equity_curve = pd.DataFrame()
         self.drawdowns = pd.Series()
         self.output_dir = "/tmp"
-
-    def download_data(self, ticker, start_date="2015-01-01", end_date=datetime.now()):
-        """Download historical data from Yahoo Finance"""
-        print(f"📥 Downloading {ticker} from {start_date} to {end_date}")
+        self.backtest_results = {}
+        self._graph = None
+
+    @property
+    def indicator_graph(self):
+        """
+        IndicatorGraph over the loaded OHLCV data, shared by every backtest on it
+
+        Rebuilt whenever self.data is replaced (download_data, load_data,
+        load_universe or direct assignment); added indicator columns do not
+        change the OHLCV columns the graph reads.
+        """
+        if self._graph is None or self._graph[0] is not self.data:
+            self._graph = (self.data, IndicatorGraph(self.data[OHLCV_COLUMNS]))
+        return self._graph[1]
+
+    def download_data(self, ticker, start_date="2015-01-01", end_date=None):
+        """Download historical data from Yahoo Finance (end_date None: up to the latest bar)"""
+        print(f"📥 Downloading {ticker} from {start_date} to {end_date or 'latest'}")
 
         try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(start=start_date, end=end_date)
+            hist = cached_history(ticker, start=start_date, end=end_date)
 
             if hist.empty:
                 print(f"   ❌ No data found for {ticker}")
@@ -68,48 +130,85 @@ class StockBacktester:
             print(f"   ❌ Error downloading {ticker}: {str(e)}")
             return None
 
-    def calculate_rsi(self, prices, period=14):
-        """Calculate Relative Strength Index"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    def load_data(self, ticker, start_date="2015-01-01", end_date=None, store_dir="data/store"):
+        """Load historical data from the local OHLCV store instead of downloading"""
+        print(f"📦 Loading {ticker} from {store_dir}")
 
-        rs = 100 - (100 / (1 + gain / loss))
+        hist = OHLCVStore(store_dir).read(ticker, start=start_date, end=end_date)
 
-        return rs
+        if hist is None or hist.empty:
+            print(f"   ❌ No stored data for {ticker}")
+            return None
 
-    def calculate_macd(self, prices, fast=12, slow=26, signal=9):
-        """Calculate MACD indicator"""
-        exp1 = prices.ewm(span=fast, adjust=False).mean()
-        exp2 = prices.ewm(span=slow, adjust=False).mean()
-        macd = exp1 - exp2
+        print(f"   ✅ Loaded {len(hist)} days of data")
+        print(f"   Date range: {hist.index[0]} to {hist.index[-1]}")
+
+        self.data = hist
+        return hist
+
+    def load_universe(self, universe, ticker, start_date="2015-01-01", end_date=None):
+        """Load historical data for one ticker from a memory-mapped Universe"""
+        hist = universe.frame(ticker, start=start_date, end=end_date)
+
+        if hist.empty:
+            print(f"   ❌ No data for {ticker} in universe")
+            return None
+
+        self.data = hist
+        return hist
 
-        signal_line = macd.ewm(span=signal, adjust=False).mean()
-        histogram = macd - signal_line
+    def calculate_rsi(self, prices, period=14):
+        """Calculate RSI (Relative Strength Index)"""
+        return indicators.rsi(prices, period)
 
-        return macd, signal_line, histogram
+    def calculate_macd(self, prices, fast=12, slow=26, signal=9):
+        """Calculate MACD (Moving Average Convergence Divergence)"""
+        return indicators.macd(prices, fast, slow, signal)
 
     def calculate_atr(self, high, low, close, period=14):
         """Calculate Average True Range (Volatility)"""
-        high_low = high - low
-        true_range = high_low.rolling(window=period).mean()
-
-        return true_range
+        return indicators.atr(high, low, close, period)
 
     def calculate_bollinger_bands(self, prices, period=20, std_dev=2):
-        """Calculate Bollinger Bands"""
-        sma = prices.rolling(window=period).mean()
-        std = prices.rolling(window=period).std()
-        upper_band = sma + (std * std_dev)
-        lower_band = sma - (std * std_dev)
-        middle_band = sma
-
-        # Bandwidth: (upper - lower) / middle
-        bandwidth = (upper_band - lower_band) / middle_band
+        """Calculate Bollinger Bands (upper, middle, lower, bandwidth)"""
+        return indicators.bollinger(prices, period, std_dev)
+
+    def calculate_support_resistance(self, high, low, left=5, right=5):
+        """Calculate Support/Resistance from confirmed pivot lows/highs (no lookahead)"""
+        return indicators.pivot_levels(high, low, left, right)
+
+    def add_timeframes(self, timeframes=('W', 'M')):
+        """Add weekly/monthly indicator columns (W_RSI, W_Trend, M_Trend, ...) aligned on the daily bars"""
+        higher = multi_timeframe(self.data, timeframes)
+        self.data = self.data.drop(columns=[c for c in higher.columns if c in self.data.columns]).join(higher)
+        return self.data
+
+    def add_patterns(self, breakout_period=20):
+        """Add one bool column per candlestick/chart pattern (Hammer, NR7, Range_Breakout, ...)"""
+        found = patterns.pattern_frame(self.data, breakout_period)
+        for name in found.columns:
+            self.data[name] = found[name]
+        return self.data
+
+    def compare_strategies(self, strategy_names=None, initial_capital=100000000, position_size=0.2, stop_loss_pct=0.025, take_profit_pct=0.04):
+        """
+        Backtest several registered strategies over the loaded data in one pass
+
+        Indicators are computed once and shared by all strategies.
+
+        Returns:
+            DataFrame with one row of metrics per strategy, best total return first
+        """
+        results = run_strategies(
+            self.data, strategy_names or list(STRATEGIES), stop_loss_pct, take_profit_pct, initial_capital, position_size,
+            graph=self.indicator_graph
+        )
 
-        return upper_band, middle_band, lower_band, bandwidth
+        rows = [dict(strategy=label, **run['metrics']) for label, run in results.items()]
+        return pd.DataFrame(rows).sort_values('total_return', ascending=False, kind='stable').reset_index(drop=True)
 
-    def run_backtest(self, strategy_name="rsi_divergence", initial_capital=100000000, position_size=0.2, stop_loss_pct=0.025, take_profit_pct=0.04):
+    def run_backtest(self, strategy_name="rsi_divergence", initial_capital=100000000, position_size=0.2, stop_loss_pct=0.025, take_profit_pct=0.04,
+                     rsi_oversold=30, rsi_overbought=70, rsi_period=14):
         """Run backtest on historical data and export to CSV"""
 
         if self.data.empty:
@@ -120,133 +219,23 @@ class StockBacktester:
         print(f"   Initial Capital: Rp {initial_capital:,} ({initial_capital / 1e6:.2f} Juta)")
         print(f"   Stop Loss: {stop_loss_pct * 100:.1f}%")
         print(f"   Take Profit: {take_profit_pct * 100:.1f}%")
-
-        # Initialize variables
-        cash = initial_capital
-        position = None  # 'long' or 'short' or None
-        entry_price = 0
-        entry_date = None
-        quantity = 0
-        trades = []
-        equity_curve = []
-
-        # Strategy parameters
-        if strategy_name == "rsi_divergence":
-            rsi_oversold = 30
-            rsi_overbought = 70
-            rsi_period = 14
-        else:
-            rsi_oversold = 30
-            rsi_overbought = 70
-            rsi_period = 14
-
-        # Add technical indicators to data
-        self.data['RSI'] = self.calculate_rsi(self.data['Close'], period=14)
-        self.data['MACD'], self.data['MACD_Signal'], self.data['MACD_Hist'] = self.calculate_macd(self.data['Close'])
-        self.data['ATR'] = self.calculate_atr(self.data['High'], self.data['Low'], self.data['Close'])
-        self.data['BB_Upper'], self.data['BB_Mid'], self.data['BB_Lower'], self.data['Bandwidth'] = self.calculate_bollinger_bands(self.data['Close'])
-
-        # Run through each day
-        for date, row in self.data.iterrows():
-            price = row['Close']
-            rsi = row['RSI']
-
-            # Entry logic (Long)
-            if position is None:
-                # RSI Divergence strategy
-                if rsi < rsi_oversold and (rsi > rsi_oversold):
-                    # Enter long position
-                    quantity = int((cash * position_size) / price)
-
-                    entry_price = price
-                    entry_date = date
-                    cash = cash - (quantity * price)
-                    position = 'long'
-
-                    trades.append({
-                        'date': date,
-                        'action': 'BUY',
-                        'price': price,
-                        'quantity': quantity,
-                        'type': 'LONG',
-                        'rsi': rsi
-                    })
-
-            # Exit logic (Long)
-            elif position == 'long':
-                # RSI Overbought
-                if rsi > rsi_overbought:
-                    # Take profit
-                    cash = cash + (quantity * price)
-
-                    trades.append({
-                        'date': date,
-                        'action': 'SELL',
-                        'price': price,
-                        'quantity': quantity,
-                        'type': 'PROFIT',
-                        'pnl': (price - entry_price) * quantity,
-                        'hold_days': (date - entry_date).days if entry_date else 0,
-                        'rsi': rsi
-                    })
-
-                    position = None
-                    entry_price = 0
-                    quantity = 0
-                    entry_date = None
-
-                # Stop Loss
-                elif price < (entry_price * (1 - stop_loss_pct)):
-                    # Stop loss
-                    cash = cash + (quantity * price)
-
-                    trades.append({
-                        'date': date,
-                        'action': 'SELL',
-                        'price': price,
-                        'quantity': quantity,
-                        'type': 'LOSS',
-                        'pnl': (price - entry_price) * quantity,
-                        'hold_days': (date - entry_date).days if entry_date else 0,
-                        'rsi': rsi
-                    })
-
-                    position = None
-                    entry_price = 0
-                    quantity = 0
-                    entry_date = None
-
-                # Take Profit (aggressive)
-                elif price > (entry_price * (1 + take_profit_pct)):
-                    # Take profit
-                    cash = cash + (quantity * price)
-
-                    trades.append({
-                        'date': date,
-                        'action': 'SELL',
-                        'price': price,
-                        'quantity': quantity,
-                        'type': 'PROFIT',
-                        'pnl': (price - entry_price) * quantity,
-                        'hold_days': (date - entry_date).days if entry_date else 0,
-                        'rsi': rsi
-                    })
-
-                    position = None
-                    entry_price = 0
-                    quantity = 0
-                    entry_date = None
-
-            # Calculate equity at each day (for drawdown)
-            if position == 'long':
-                equity = cash + (quantity * price)
-            else:
-                equity = cash
-
-            equity_curve.append({
-                'date': date,
-                'equity': equity
-            })
+        print(f"   RSI: {rsi_period} periods, oversold {rsi_oversold}, overbought {rsi_overbought}")
+
+        # Entry/exit signals for every bar, from indicator arrays computed once
+        # on the shared graph; the trade log's RSI is read from the same columns
+        strategy = build_strategy(strategy_name, rsi_oversold, rsi_overbought, rsi_period)
+        columns = IndicatorColumns(self.data, self.indicator_graph)
+        entries, exits = columns.signals(strategy)
+        rsi = columns.get(column('rsi', period=rsi_period))
+        close = self.data['Close'].to_numpy(dtype=np.float64)
+
+        # Resolve positions, trades and equity (same rules as the former per-bar loop)
+        result = backtest_engine.run_signals(
+            close, entries, exits, stop_loss_pct, take_profit_pct, initial_capital, position_size
+        )
+        cash = result['final_cash']
+        trades = backtest_engine.trade_log(result, self.data.index, extra={'rsi': rsi})
+        equity_curve = {'date': self.data.index, 'equity': result['equity']}
 
         # Calculate performance metrics
         trades_df = pd.DataFrame(trades)
@@ -255,37 +244,14 @@ class StockBacktester:
             print("❌ No trades generated")
             return None
 
-        # Calculate total P&L
-        total_pnl = trades_df['pnl'].sum()
-
-        # Calculate total return
-        total_return = (total_pnl / initial_capital) * 100
-
-        # Calculate win rate
-        winning_trades = trades_df[trades_df['type'] == 'PROFIT']
-        win_rate = (len(winning_trades) / len(trades_df)) * 100
-
-        # Calculate maximum drawdown
-        equity_series = pd.Series([row['equity'] for row in equity_curve])
-        max_drawdown = 0
-
-        for i in range(1, len(equity_series)):
-            if equity_series[i] >= equity_series[i-1]:
-                max_drawdown = max(max_drawdown, 0)
-            elif equity_series[i] < equity_series[i-1]:
-                dd = (equity_series[i-1] - equity_series[i]) / equity_series[i-1]
-                max_drawdown = max(max_drawdown, dd)
-
-        max_drawdown_pct = max_drawdown * 100
-
-        # Calculate Sharpe ratio
-        daily_returns = equity_series.pct_change().dropna()
-        sharpe_ratio = (daily_returns.mean() * 252) / (daily_returns.std() * np.sqrt(252)) if len(daily_returns) > 0 else 0
-
-        # Calculate Profit Factor
-        winning_trades_pnl = winning_trades['pnl'].sum()
-        losing_trades_pnl = trades_df[trades_df['type'] == 'LOSS']['pnl'].sum()
-        profit_factor = abs(winning_trades_pnl) / abs(losing_trades_pnl) if losing_trades_pnl != 0 else 0
+        # Calculate performance metrics (total P&L, return, win rate, drawdown, Sharpe, profit factor)
+        metrics = backtest_engine.summarize(result, initial_capital)
+        total_pnl = metrics['total_pnl']
+        total_return = metrics['total_return']
+        win_rate = metrics['win_rate']
+        max_drawdown_pct = metrics['max_drawdown']
+        sharpe_ratio = metrics['sharpe_ratio']
+        profit_factor = metrics['profit_factor']
 
         # Create equity curve dataframe
         equity_df = pd.DataFrame(equity_curve)
@@ -303,8 +269,8 @@ class StockBacktester:
         print(f"Max Drawdown: {max_drawdown_pct:.2f}%")
         print(f"Sharpe Ratio: {sharpe_ratio:.2f}")
         print(f"Total Trades: {len(trades)}")
-        print(f"Winning Trades: {len(winning_trades)}")
-        print(f"Losing Trades: {len(trades_df[trades_df['type'] == 'LOSS'])}")
+        print(f"Winning Trades: {metrics['winning_trades']}")
+        print(f"Losing Trades: {metrics['losing_trades']}")
         print("=" * 60)
 
         # Export to CSV files
@@ -415,6 +381,13 @@ def main():
     print(f"📊 Initial Capital: Rp {initial_capital:,} ({initial_capital / 1e6:.2f} Juta)")
     print(f"📊 Time Range: 2015-01-01 to {datetime.now().strftime('%Y-%m-%d')} (last 11 years)")
 
+    # Skip tickers flagged by the ingest-time quality checks
+    quality = QualityIndex.load()
+    for ticker in tickers:
+        if not quality.is_ok(ticker):
+            print(f"\n⚠️  Skipping {ticker}: {', '.join(quality.get(ticker)['issues'])}")
+    tickers = quality.filter(tickers)
+
     # Initialize backtester
     backtester = StockBacktester()
 
@@ -429,12 +402,6 @@ def main():
         if data is None:
             continue
 
-        # Add technical indicators to data
-        data['RSI'] = backtester.calculate_rsi(data['Close'], period=14)
-        data['MACD'], data['MACD_Signal'], data['MACD_Hist'] = backtester.calculate_macd(data['Close'])
-        data['ATR'] = backtester.calculate_atr(data['High'], data['Low'], data['Close'])
-        data['BB_Upper'], data['BB_Mid'], data['BB_Lower'], data['Bandwidth'] = backtester.calculate_bollinger_bands(data['Close'])
-
         # Run backtest for each stock
         print(f"\n{'=' * 60}")
         print(f"🔄 Running Backtest: RSI DIVERGENCE")
@@ -452,9 +419,15 @@ def main():
             continue
 
         # Store result
-        backtester.backtest_results = {}
         backtester.backtest_results[ticker] = result
 
+        # Same data, every registered strategy
+        comparison = backtester.compare_strategies(initial_capital=initial_capital)
+        print(f"\n📊 Strategy Comparison ({ticker}):")
+        for _, row in comparison.iterrows():
+            print(f"   {row['strategy']:<20} Return {row['total_return']:>7.2f}%  Win Rate {row['win_rate']:>6.2f}%  "
+                  f"Sharpe {row['sharpe_ratio']:>5.2f}  Trades {row['total_trades']}")
+
     # Print comparison summary
     print(f"\n" + "=" * 60)
     print("📊 BACKTEST COMPARISON SUMMARY")
@@ -479,8 +452,8 @@ def main():
 
     print(f"\n💡 Next Steps:")
     print(f"   1. Review CSV files for detailed analysis")
-    print(f"   2. Compare performance across BMRI, BBRI, BBCA")
-    print(f"   3. Optimize parameters for best performing stock")
+    print(f"   2. Compare performance across BMRI, BBRI, BBCA (as one portfolio: python scripts/trading/portfolio.py)")
+    print(f"   3. Optimize parameters for best performing stock (python scripts/trading/sweep.py)")
     print(f"   4. Run forward testing (paper trading) with live data")
     print(f"   5. Scale to more stocks once strategy is validated")
 
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Trading Strategies
+Pluggable entry/exit rules for the array backtest engine
+
+A strategy declares the indicator columns it needs and turns them into
+entry/exit bool arrays; it never computes indicators or walks bars itself:
+
+    @register_strategy
+    class MyStrategy(Strategy):
+        name = 'my_strategy'
+        defaults = {'period': 14}
+
+        def requires(self):
+            return {'RSI': column('rsi', period=self.params['period'])}
+
+        def signals(self, columns):
+            return columns['RSI'] < 30, columns['RSI'] > 70
+
+Column specs name an IndicatorGraph node (rsi, macd, bollinger, sma, ...)
+or one of the extra nodes price (OHLCV column), patterns (pattern_frame)
+and timeframes (multi_timeframe). IndicatorColumns resolves every spec
+once per dataset, so strategies asking for the same column (e.g., RSI 14)
+share one array, and the graph shares nodes underneath (MACD reuses the
+EMAs, Bollinger reuses the SMA pass).
+
+Built-in strategies:
+1. rsi_divergence - RSI crosses back above oversold, exit above overbought
+2. pattern_breakout - Bullish candlestick/chart pattern, exit above RSI overbought
+3. macd_cross - MACD crosses above / below its signal line
+4. bollinger_squeeze - Close breaks above the upper band right after a bandwidth squeeze
+5. weekly_trend - Daily RSI pullback entries while the weekly trend is up
+"""
+
+import numpy as np
+import sys
+import os
+
+# Shared data modules live in the top-level trading/ directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'trading'))
+
+from indicator_graph import IndicatorGraph
+from multi_timeframe import multi_timeframe
+import patterns
+import rolling
+import backtest_engine
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+STRATEGIES = {}
+
+
+def register_strategy(cls):
+    """Class decorator adding a Strategy subclass to STRATEGIES under its name"""
+    STRATEGIES[cls.name] = cls
+    return cls
+
+
+def get_strategy(name, **params):
+    """Strategy instance by registered name"""
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {name}")
+    return STRATEGIES[name](**params)
+
+
+def column(node, field=None, **params):
+    """
+    Indicator column spec
+
+    Args:
+        node: IndicatorGraph method (rsi, macd, bollinger, ...) or price / patterns / timeframes
+        field: Tuple position or column name within the node's value (None for a single series)
+        **params: Node parameters
+
+    Returns:
+        Hashable spec (node, params, field)
+    """
+    return (node, tuple(sorted(params.items())), field)
+
+
+def crossed_above(values, level):
+    """values moved from below level to at/above it on this bar (level: scalar or array)"""
+    values = np.asarray(values, dtype=np.float64)
+    level = np.broadcast_to(np.asarray(level, dtype=np.float64), values.shape)
+    result = np.zeros(values.shape, dtype=bool)
+    result[1:] = (values[:-1] < level[:-1]) & (values[1:] >= level[1:])
+    return result
+
+
+def crossed_below(values, level):
+    """values moved from at/above level to below it on this bar"""
+    values = np.asarray(values, dtype=np.float64)
+    level = np.broadcast_to(np.asarray(level, dtype=np.float64), values.shape)
+    result = np.zeros(values.shape, dtype=bool)
+    result[1:] = (values[:-1] >= level[:-1]) & (values[1:] < level[1:])
+    return result
+
+
+class Strategy:
+    """Base class: declared indicator columns in, entry/exit arrays out"""
+
+    name = None
+    defaults = {}
+
+    def __init__(self, **params):
+        unknown = [key for key in params if key not in self.defaults]
+        if unknown:
+            raise ValueError(f"Unknown parameters for {self.name}: {', '.join(unknown)}")
+        self.params = dict(self.defaults)
+        self.params.update(params)
+
+    @property
+    def label(self):
+        """Name plus the parameters that differ from the defaults"""
+        changed = [f"{key}={value}" for key, value in self.params.items() if value != self.defaults[key]]
+        return f"{self.name}({', '.join(changed)})" if changed else self.name
+
+    def requires(self):
+        """Dictionary of column name -> column spec this strategy reads"""
+        return {}
+
+    def signals(self, columns):
+        """
+        Args:
+            columns: Dictionary of requires() names -> arrays (one value per bar)
+
+        Returns:
+            (entries, exits): bool arrays
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"<Strategy {self.label}>"
+
+
+@register_strategy
+class RSIStrategy(Strategy):
+    """Enter when RSI crosses back above oversold, exit above overbought"""
+
+    name = 'rsi_divergence'
+    defaults = {'rsi_period': 14, 'rsi_oversold': 30, 'rsi_overbought': 70}
+
+    def requires(self):
+        return {'RSI': column('rsi', period=self.params['rsi_period'])}
+
+    def signals(self, columns):
+        rsi = columns['RSI']
+        with np.errstate(invalid='ignore'):
+            return crossed_above(rsi, self.params['rsi_oversold']), rsi > self.params['rsi_overbought']
+
+
+# Bullish patterns that open a position in the pattern_breakout strategy
+ENTRY_PATTERNS = ['Bullish_Engulfing', 'Hammer', 'Range_Breakout']
+
+
+@register_strategy
+class PatternBreakoutStrategy(Strategy):
+    """Enter on a bullish pattern, exit above RSI overbought"""
+
+    name = 'pattern_breakout'
+    defaults = {'rsi_period': 14, 'rsi_overbought': 70, 'breakout_period': 20}
+
+    def requires(self):
+        required = {'RSI': column('rsi', period=self.params['rsi_period'])}
+        for pattern in ENTRY_PATTERNS:
+            required[pattern] = column('patterns', pattern, breakout_period=self.params['breakout_period'])
+        return required
+
+    def signals(self, columns):
+        entries = np.logical_or.reduce([np.asarray(columns[pattern], dtype=bool) for pattern in ENTRY_PATTERNS])
+        with np.errstate(invalid='ignore'):
+            return entries, columns['RSI'] > self.params['rsi_overbought']
+
+
+@register_strategy
+class MACDCrossStrategy(Strategy):
+    """Enter when MACD crosses above its signal line, exit when it crosses below"""
+
+    name = 'macd_cross'
+    defaults = {'fast': 12, 'slow': 26, 'signal': 9}
+
+    def requires(self):
+        params = {'fast': self.params['fast'], 'slow': self.params['slow'], 'signal': self.params['signal']}
+        return {'MACD': column('macd', 0, **params), 'MACD_Signal': column('macd', 1, **params)}
+
+    def signals(self, columns):
+        return crossed_above(columns['MACD'], columns['MACD_Signal']), crossed_below(columns['MACD'], columns['MACD_Signal'])
+
+
+@register_strategy
+class BollingerSqueezeStrategy(Strategy):
+    """
+    Enter when the close breaks above the upper band within squeeze_window bars
+    of a squeeze (bandwidth within squeeze_tolerance of its squeeze_lookback-bar low);
+    exit when the close falls below the middle band
+    """
+
+    name = 'bollinger_squeeze'
+    defaults = {'bb_period': 20, 'bb_std': 2, 'squeeze_lookback': 120, 'squeeze_tolerance': 0.1, 'squeeze_window': 5}
+
+    def requires(self):
+        params = {'period': self.params['bb_period'], 'std_dev': self.params['bb_std']}
+        return {
+            'Close': column('price', 'Close'),
+            'BB_Upper': column('bollinger', 0, **params),
+            'BB_Mid': column('bollinger', 1, **params),
+            'Bandwidth': column('bollinger', 3, **params),
+        }
+
+    def signals(self, columns):
+        close, bandwidth = columns['Close'], columns['Bandwidth']
+
+        # A squeeze needs a full lookback of bandwidth values: the partial windows
+        # right after the Bollinger warm-up would flag almost every early bar
+        lookback = self.params['squeeze_lookback']
+        lowest = rolling.rolling_min(bandwidth, lookback)
+        warmed_up = rolling.rolling_stats(bandwidth, (lookback,), ['count'])[lookback]['count'] >= lookback
+        with np.errstate(invalid='ignore'):
+            squeeze = (warmed_up & (bandwidth <= lowest * (1 + self.params['squeeze_tolerance']))).astype(np.float64)
+            recent_squeeze = rolling.rolling_max(squeeze, self.params['squeeze_window']) > 0
+
+            entries = recent_squeeze & crossed_above(close, columns['BB_Upper'])
+            exits = close < columns['BB_Mid']
+        return entries, exits
+
+
+@register_strategy
+class WeeklyTrendStrategy(Strategy):
+    """
+    Buy daily RSI pullbacks (RSI crosses back above rsi_pullback) while the
+    completed weekly bars are in an uptrend (W_Trend = 1); exit above RSI
+    overbought or when the weekly trend turns down
+    """
+
+    name = 'weekly_trend'
+    defaults = {'rsi_period': 14, 'rsi_pullback': 40, 'rsi_overbought': 70}
+
+    def requires(self):
+        return {
+            'RSI': column('rsi', period=self.params['rsi_period']),
+            'W_Trend': column('timeframes', 'W_Trend', timeframes=('W',)),
+        }
+
+    def signals(self, columns):
+        rsi, trend = columns['RSI'], columns['W_Trend']
+        with np.errstate(invalid='ignore'):
+            entries = (trend > 0) & crossed_above(rsi, self.params['rsi_pullback'])
+            exits = (rsi > self.params['rsi_overbought']) | (trend < 0)
+        return entries, exits
+
+
+class IndicatorColumns:
+    """Indicator arrays of one OHLCV dataset, each computed once and shared by all strategies"""
+
+    def __init__(self, data, graph=None):
+        """
+        Args:
+            data: DataFrame with Open/High/Low/Close/Volume columns (other columns are ignored)
+            graph: IndicatorGraph over the same data (default: a new one)
+        """
+        self.graph = graph or IndicatorGraph(data[OHLCV_COLUMNS])
+        self.arrays = {}
+
+    def _node(self, node, params):
+        graph = self.graph
+        if node == 'price':
+            return graph.data
+        if node == 'patterns':
+            return graph.node('patterns', lambda: patterns.pattern_frame(graph.data, **params), **params)
+        if node == 'timeframes':
+            return graph.node('timeframes', lambda: multi_timeframe(graph.data, **params), **params)
+        return getattr(graph, node)(**params)
+
+    def get(self, spec):
+        """Array of one column spec"""
+        if spec not in self.arrays:
+            node, params, field = spec
+            value = self._node(node, dict(params))
+            if field is not None:
+                value = value[field]
+            self.arrays[spec] = value.to_numpy() if hasattr(value, 'to_numpy') else np.asarray(value)
+        return self.arrays[spec]
+
+    def select(self, strategy):
+        """Columns a strategy requires, by the strategy's names"""
+        return {name: self.get(spec) for name, spec in strategy.requires().items()}
+
+    def signals(self, strategy):
+        """(entries, exits) of a strategy on this dataset"""
+        entries, exits = strategy.signals(self.select(strategy))
+        return np.asarray(entries, dtype=bool), np.asarray(exits, dtype=bool)
+
+
+def run_strategies(data, strategies, stop_loss_pct=0.025, take_profit_pct=0.04, initial_capital=100000000,
+                   position_size=0.2, graph=None):
+    """
+    Backtest several strategies over the same data
+
+    Indicator columns are computed once and shared; each strategy is then one
+    backtest_engine.run_signals call.
+
+    Args:
+        data: OHLCV DataFrame of one ticker
+        strategies: Strategy instances or registered names
+
+    Returns:
+        Dictionary of strategy label -> {'strategy', 'entries', 'exits', 'result', 'metrics'}
+    """
+    columns = IndicatorColumns(data, graph)
+    close = data['Close'].to_numpy(dtype=np.float64)
+    results = {}
+
+    for strategy in strategies:
+        if isinstance(strategy, str):
+            strategy = get_strategy(strategy)
+
+        entries, exits = columns.signals(strategy)
+        result = backtest_engine.run_signals(close, entries, exits, stop_loss_pct, take_profit_pct, initial_capital, position_size)
+
+        results[strategy.label] = {
+            'strategy': strategy,
+            'entries': entries,
+            'exits': exits,
+            'result': result,
+            'metrics': backtest_engine.summarize(result, initial_capital),
+        }
+
+    return results
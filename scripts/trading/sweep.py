@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Parameter Sweep Optimizer
+Runs a grid of run_backtest parameters over many tickers on a process pool
+
+Parameters swept (any subset, see parameter_grid):
+- rsi_period, rsi_oversold, rsi_overbought - Indicator / signal thresholds
+- stop_loss_pct, take_profit_pct, position_size - Trade management
+
+Work layout:
+1. Every worker process loads the price history of all tickers once, in the
+   pool initializer (local OHLCVStore or memory-mapped Universe), with one
+   IndicatorGraph per ticker. Tasks only carry parameters, so no price data
+   is pickled per task.
+2. One task = one (ticker, rsi_period, rsi_oversold, rsi_overbought) group
+   with all of its stop / target / size combinations. The entry/exit signals
+   are computed once per task (indicators such as RSI per period are cached
+   by the worker's graphs), then each combination is a single
+   backtest_engine.run_signals call (~1-2 ms).
+3. Rows stream back as tasks complete: they are appended to a CSV file
+   right away and collected into a DataFrame sorted by any metric.
+
+Output:
+- /tmp/sweep_results.csv - One row per (ticker, parameter combination)
+- /tmp/sweep_heatmap.csv - Pivot of a metric over two parameters (heatmap-ready)
+
+Usage:
+    python scripts/trading/sweep.py [--universe] [--strategy=rsi_divergence] [--sort=sharpe_ratio] [--workers=8]
+"""
+
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import itertools
+import csv
+import sys
+import os
+import time
+
+# Shared data modules live in the top-level trading/ directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'trading'))
+
+from ohlcv_store import OHLCVStore
+from universe import Universe
+from data_quality import QualityIndex
+from indicator_graph import IndicatorGraph
+import backtest_engine
+from simple_backtest import strategy_signals
+from strategies import STRATEGIES, OHLCV_COLUMNS
+
+PARAMETERS = ['rsi_period', 'rsi_oversold', 'rsi_overbought', 'stop_loss_pct', 'take_profit_pct', 'position_size']
+
+# Parameters shared by one task (signals are computed once per group)
+SIGNAL_PARAMETERS = ['rsi_period', 'rsi_oversold', 'rsi_overbought']
+
+DEFAULTS = {
+    'rsi_period': 14,
+    'rsi_oversold': 30,
+    'rsi_overbought': 70,
+    'stop_loss_pct': 0.025,
+    'take_profit_pct': 0.04,
+    'position_size': 0.2,
+}
+
+METRICS = ['final_capital', 'total_pnl', 'total_return', 'win_rate', 'max_drawdown', 'sharpe_ratio', 'profit_factor', 'total_trades']
+
+RESULT_COLUMNS = ['ticker', 'strategy'] + PARAMETERS + METRICS
+
+# Default grid: 4 x 4 x 4 x 10 x 9 x 3 = 17,280 combinations per ticker
+DEFAULT_GRID = {
+    'rsi_period': [7, 10, 14, 21],
+    'rsi_oversold': [20, 25, 30, 35],
+    'rsi_overbought': [65, 70, 75, 80],
+    'stop_loss_pct': [round(x, 3) for x in np.arange(0.01, 0.06, 0.005)],
+    'take_profit_pct': [round(x, 3) for x in np.arange(0.02, 0.11, 0.01)],
+    'position_size': [0.1, 0.2, 0.3],
+}
+
+# Per-process price data, filled by _init_worker
+_worker = {}
+
+
+def parameter_grid(**ranges):
+    """
+    Every combination of the given parameter values
+
+    Args:
+        **ranges: parameter -> list of values (PARAMETERS not given use DEFAULTS)
+
+    Returns:
+        List of parameter dictionaries
+    """
+    unknown = [name for name in ranges if name not in PARAMETERS]
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+
+    values = [list(ranges.get(name, [DEFAULTS[name]])) for name in PARAMETERS]
+    return [dict(zip(PARAMETERS, combo)) for combo in itertools.product(*values)]
+
+
+def load_prices(tickers, store_dir="data/store", universe_path=None, start_date="2015-01-01", end_date=None):
+    """
+    OHLCV history of every ticker from the universe (if given) or the local store
+
+    Returns:
+        Dictionary of ticker -> DataFrame (tickers without data are left out)
+    """
+    source = Universe(universe_path) if universe_path else OHLCVStore(store_dir)
+    prices = {}
+
+    for ticker in tickers:
+        if universe_path:
+            hist = source.frame(ticker, start=start_date, end=end_date) if ticker in source.ticker_index else None
+        else:
+            hist = source.read(ticker, start=start_date, end=end_date)
+
+        if hist is not None and not hist.empty:
+            prices[ticker] = hist
+
+    return prices
+
+
+def _init_worker(tickers, store_dir, universe_path, start_date, end_date):
+    """Pool initializer: load prices once per process, with one indicator graph per ticker"""
+    _worker.clear()
+    for ticker, hist in load_prices(tickers, store_dir, universe_path, start_date, end_date).items():
+        _worker[ticker] = {
+            'data': hist,
+            'close': hist['Close'].to_numpy(dtype=np.float64),
+            'graph': IndicatorGraph(hist[OHLCV_COLUMNS]),
+        }
+
+
+def _run_group(ticker, strategy_name, signal_params, combos, initial_capital):
+    """
+    Backtest one ticker for every combination sharing the same signals
+
+    Returns:
+        List of result rows (RESULT_COLUMNS)
+    """
+    if ticker not in _worker:
+        return []
+
+    data = _worker[ticker]
+    entries, exits = strategy_signals(
+        strategy_name, data['data'], signal_params['rsi_oversold'], signal_params['rsi_overbought'],
+        signal_params['rsi_period'], graph=data['graph']
+    )
+
+    rows = []
+    for stop_loss_pct, take_profit_pct, position_size in combos:
+        result = backtest_engine.run_signals(
+            data['close'], entries, exits, stop_loss_pct, take_profit_pct, initial_capital, position_size
+        )
+        metrics = backtest_engine.summarize(result, initial_capital)
+
+        row = {'ticker': ticker, 'strategy': strategy_name}
+        row.update(signal_params)
+        row.update({'stop_loss_pct': stop_loss_pct, 'take_profit_pct': take_profit_pct, 'position_size': position_size})
+        row.update({name: metrics[name] for name in METRICS})
+        rows.append(row)
+
+    return rows
+
+
+def _tasks(tickers, grid):
+    """Group the grid into one task per (ticker, signal parameters)"""
+    groups = {}
+    for params in grid:
+        key = tuple(params[name] for name in SIGNAL_PARAMETERS)
+        groups.setdefault(key, []).append((params['stop_loss_pct'], params['take_profit_pct'], params['position_size']))
+
+    return [
+        (ticker, dict(zip(SIGNAL_PARAMETERS, key)), combos)
+        for ticker in tickers
+        for key, combos in groups.items()
+    ]
+
+
+def results_table(rows, sort_by='total_return', ascending=False):
+    """Sweep rows as a DataFrame sorted by one metric"""
+    table = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    return table.sort_values(sort_by, ascending=ascending, kind='stable').reset_index(drop=True)
+
+
+def run_sweep(tickers, grid, strategy_name="rsi_divergence", initial_capital=100000000, store_dir="data/store",
+              universe_path=None, start_date="2015-01-01", end_date=None, max_workers=None,
+              output_file="/tmp/sweep_results.csv", sort_by='total_return'):
+    """
+    Run a parameter grid over several tickers on a process pool
+
+    Args:
+        tickers: List of stock tickers
+        grid: List of parameter dictionaries (from parameter_grid)
+        strategy_name: Strategy passed to strategy_signals
+        store_dir / universe_path: Price source loaded by every worker
+        max_workers: Worker processes (default: CPU count)
+        output_file: CSV the rows are appended to as they arrive (None to skip)
+        sort_by: Metric to sort the returned table by
+
+    Returns:
+        DataFrame with one row per (ticker, combination), sorted by sort_by
+    """
+    tasks = _tasks(tickers, grid)
+    total = len(tickers) * len(grid)
+    rows = []
+
+    print(f"\n🔄 Sweeping {len(grid):,} combinations x {len(tickers)} tickers = {total:,} backtests ({len(tasks)} tasks)")
+
+    csvfile = open(output_file, 'w', newline='') if output_file else None
+    writer = csv.DictWriter(csvfile, fieldnames=RESULT_COLUMNS) if csvfile else None
+    if writer:
+        writer.writeheader()
+
+    started = time.time()
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(tickers, store_dir, universe_path, start_date, end_date)) as executor:
+            futures = [
+                executor.submit(_run_group, ticker, strategy_name, signal_params, combos, initial_capital)
+                for ticker, signal_params, combos in tasks
+            ]
+
+            for done, future in enumerate(as_completed(futures), 1):
+                task_rows = future.result()
+                rows.extend(task_rows)
+
+                if writer:
+                    writer.writerows(task_rows)
+                    csvfile.flush()
+
+                if done % 10 == 0 or done == len(futures):
+                    elapsed = time.time() - started
+                    print(f"   {done}/{len(futures)} tasks, {len(rows):,} backtests ({len(rows) / max(elapsed, 1e-9):,.0f}/s)")
+    finally:
+        if csvfile:
+            csvfile.close()
+
+    print(f"   ✅ {len(rows):,} backtests in {time.time() - started:.1f}s")
+    if output_file:
+        print(f"   ✅ Results: {output_file}")
+
+    return results_table(rows, sort_by)
+
+
+def export_heatmap(table, output_file="/tmp/sweep_heatmap.csv", index='stop_loss_pct', columns='take_profit_pct',
+                   value='total_return', aggfunc='mean'):
+    """
+    Pivot one metric over two parameters and save it as CSV
+
+    Other parameters (and tickers) are aggregated with aggfunc, e.g. the
+    mean total return of every stop loss / take profit pair.
+
+    Returns:
+        DataFrame with index values as rows and columns values as columns
+    """
+    heatmap = table.pivot_table(index=index, columns=columns, values=value, aggfunc=aggfunc)
+    heatmap.to_csv(output_file)
+    print(f"   ✅ Heatmap ({value} by {index} x {columns}): {output_file}")
+    return heatmap
+
+
+def _option(name, default=None):
+    """Value of a --name=value command line option"""
+    for arg in sys.argv:
+        if arg.startswith(f"--{name}="):
+            return arg.split('=', 1)[1]
+    return default
+
+
+def main():
+    """Main function to run the parameter sweep"""
+    print("=" * 60)
+    print("🔍 Parameter Sweep Optimizer - Indonesian Banking Stocks")
+    print("=" * 60)
+
+    tickers = ['BMRI.JK', 'BBRI.JK', 'BBCA.JK']
+
+    strategy_name = _option('strategy', 'rsi_divergence')
+    sort_by = _option('sort', 'total_return')
+    workers = _option('workers')
+    universe_path = "data/universe" if '--universe' in sys.argv else None
+
+    if sort_by not in METRICS:
+        print(f"❌ Unknown sort metric: {sort_by} (available: {', '.join(METRICS)})")
+        return
+
+    if strategy_name not in STRATEGIES:
+        print(f"❌ Unknown strategy: {strategy_name} (available: {', '.join(STRATEGIES)})")
+        return
+
+    # Skip tickers flagged by the ingest-time quality checks
+    quality = QualityIndex.load()
+    for ticker in tickers:
+        if not quality.is_ok(ticker):
+            print(f"\n⚠️  Skipping {ticker}: {', '.join(quality.get(ticker)['issues'])}")
+    tickers = quality.filter(tickers)
+
+    # Signal parameters the strategy does not take would only repeat identical runs
+    defaults = STRATEGIES[strategy_name].defaults
+    grid = parameter_grid(**{
+        name: values for name, values in DEFAULT_GRID.items() if name not in SIGNAL_PARAMETERS or name in defaults
+    })
+
+    print(f"\n📊 Stocks: {', '.join(tickers)}")
+    print(f"📊 Strategy: {strategy_name}")
+    print(f"📊 Data: {universe_path or 'data/store'} (2015-01-01 to {datetime.now().strftime('%Y-%m-%d')})")
+
+    table = run_sweep(tickers, grid, strategy_name=strategy_name, universe_path=universe_path,
+                      max_workers=int(workers) if workers else None, sort_by=sort_by)
+
+    if table.empty:
+        print("❌ No backtests completed")
+        return
+
+    print(f"\n" + "=" * 60)
+    print(f"🏆 TOP 10 BY {sort_by.upper()}")
+    print("=" * 60)
+    print(table.head(10).to_string(index=False))
+
+    export_heatmap(table, value=sort_by)
+
+
+if __name__ == "__main__":
+    main()
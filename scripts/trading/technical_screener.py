@@ -7,262 +7,227 @@ Scoring Criteria:
 1. Momentum Strength (RSI, MACD, Volume) - 40%
 2. Volatility Characteristics (ATR, Bollinger) - 25%
 3. Volume Profile (High, Increasing, Spike) - 20%
-4. Price Action (Support/Resistance, Trend) - 15%
+4. Price Action (Support/Resistance, Trend, Candlestick Patterns) - 15%
 
 Total Score: 100%
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import csv
+import sys
+import os
+
+# Shared data modules live in the top-level trading/ directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'trading'))
+
+from fetch_engine import FetchEngine, report_errors
+from data_quality import QualityIndex
+import indicators
+import patterns
+from cross_section import CrossSection
+from compact_frames import compact_cross_section
+from volume_profile import get_profile_cache
+from universe import Universe
 
 class TechnicalScreener:
     """Technical stock screener for momentum-based swing trading (FIXED VERSION)"""
 
-    def __init__(self):
+    def __init__(self, max_workers=8, compact=False):
+        """
+        Args:
+            max_workers: Concurrent downloads
+            compact: Keep every screened ticker's indicator history in
+                     self.stocks_data as float32 CompactFrames
+        """
         self.stocks_data = {}
+        self.compact = compact
+        self.engine = FetchEngine(max_workers=max_workers)
 
     def calculate_rsi(self, prices, period=14):
         """Calculate RSI (Relative Strength Index)"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0).rolling(window=period).mean())
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-
-        rs = 100 - (100 / (1 + gain / loss))
-
-        return rs
+        return indicators.rsi(prices, period)
 
     def calculate_macd(self, prices, fast=12, slow=26, signal=9):
         """Calculate MACD (Moving Average Convergence Divergence)"""
-        ema_fast = prices.ewm(span=fast, adjust=False).mean()
-        ema_slow = prices.ewm(span=slow, adjust=False).mean()
-        macd = ema_fast - ema_slow
-
-        macd_signal = macd.ewm(span=signal, adjust=False).mean()
-        histogram = macd - macd_signal
-
-        return macd, macd_signal, histogram
+        return indicators.macd(prices, fast, slow, signal)
 
     def calculate_atr(self, high, low, close, period=14):
         """Calculate Average True Range (Volatility)"""
-        high_low = high - low
-        true_range = high_low.rolling(window=period).mean()
-
-        return true_range
+        return indicators.atr(high, low, close, period)
 
     def calculate_bollinger(self, prices, period=20, std_dev=2):
-        """Calculate Bollinger Bands (Volatility)"""
-        sma = prices.rolling(window=period).mean()
-        std = prices.rolling(window=period).std()
-
-        upper_band = sma + (std * std_dev)
-        lower_band = sma - (std * std_dev)
-        middle_band = sma
-
-        return upper_band, middle_band, lower_band
+        """Calculate Bollinger Bands (upper, middle, lower, bandwidth)"""
+        return indicators.bollinger(prices, period, std_dev)
 
     def calculate_volume_ma(self, volume, period=20):
         """Calculate 20-day volume moving average"""
-        return volume.rolling(window=period).mean()
-
-    def calculate_momentum_score(self, stock_data):
-        """Calculate momentum strength score (40 points)"""
-        score = 0
-
-        # RSI Momentum (15 points)
-        rsi = stock_data['RSI'].iloc[-1]
-
-        # RSI between 30-70 is neutral
-        if 30 < rsi < 70:
-            score += 5  # Neutral momentum
-        elif rsi > 70:
-            score += 10  # Bullish momentum (strong)
-        elif rsi < 30:
-            score += 0  # Bearish momentum (not good for swing)
-
-        # RSI Trend (rising/falling) (10 points)
-        rsi_prev = stock_data['RSI'].iloc[-2] if len(stock_data['RSI']) >= 2 else stock_data['RSI'].iloc[-1]
-
-        if rsi > rsi_prev:
-            score += 10  # Rising RSI (bullish)
-        elif rsi < rsi_prev:
-            score += 0  # Falling RSI (bearish)
-
-        # MACD Momentum (15 points)
-        macd_hist = stock_data['MACD_Hist'].iloc[-1]
-
-        if macd_hist > 0:
-            score += 15  # Bullish histogram
-        elif macd_hist < 0:
-            score += 0  # Bearish histogram
-
-        return score
-
-    def calculate_volatility_score(self, stock_data):
-        """Calculate volatility score (25 points)"""
-        score = 0
-
-        # ATR-based volatility (10 points)
-        atr = stock_data['ATR'].iloc[-1]
-        avg_price = stock_data['Close'].iloc[-20:].mean()
-
-        if atr:
-            atr_pct = (atr / avg_price) * 100
-
-            if atr_pct > 2.0:
-                score += 10  # High volatility (good for swing)
-            elif atr_pct > 1.0:
-                score += 7  # Moderate volatility
-            elif atr_pct > 0.5:
-                score += 4  # Low volatility
-            else:
-                score += 0  # Very low volatility
-
-        # Bollinger Band Squeeze (15 points)
-        bandwidth = stock_data['Bandwidth'].iloc[-1]
-
-        if bandwidth < 0.05:  # Very tight bands (squeeze)
-            score += 15
-        elif bandwidth < 0.10:  # Moderately tight bands
-            score += 10
-        elif bandwidth < 0.20:  # Normal bands
-            score += 5
-        else:
-            score += 0  # Wide bands
-
-        return score
-
-    def calculate_volume_score(self, stock_data):
-        """Calculate volume profile score (20 points)"""
-        score = 0
-
-        # High volume (10 points)
-        current_volume = stock_data['Volume'].iloc[-1]
-        volume_ma = stock_data['Volume_MA'].iloc[-1]
-
-        if current_volume > volume_ma * 1.5:
-            score += 10  # High volume
-        elif current_volume > volume_ma * 1.2:
-            score += 7  # Above average volume
-        elif current_volume > volume_ma:
-            score += 5  # Normal volume
-        else:
-            score += 0  # Low volume
-
-        # Volume spike (5 points)
-        prev_volume = stock_data['Volume'].iloc[-2] if len(stock_data['Volume']) >= 2 else current_volume
-
-        if current_volume > prev_volume * 2.0:
-            score += 5  # Volume spike (institutional interest)
-
-        # Volume trend (increasing) (5 points)
-        if len(stock_data['Volume']) >= 3:
-            vol_trend = stock_data['Volume'].iloc[-3:]
-            if vol_trend.is_monotonic_increasing():
-                score += 5  # Increasing volume
-
-        return score
-
-    def calculate_price_action_score(self, stock_data):
-        """Calculate price action score (15 points)"""
-        score = 0
-
-        close = stock_data['Close'].iloc[-1]
-        upper_band = stock_data['BB_Upper'].iloc[-1]
-        lower_band = stock_data['BB_Lower'].iloc[-1]
-        middle_band = stock_data['BB_Mid'].iloc[-1]
-
-        # Price near upper band (breakout potential) (5 points)
-        if close > middle_band * 0.98:
-            score += 5
-
-        # Price near lower band (support) (3 points)
-        if close < middle_band * 1.02:
-            score += 3
-
-        # Price action: Higher highs, higher lows (5 points)
-        if len(stock_data['Close']) >= 5:
-            highs = stock_data['High'].iloc[-5:]
-            if stock_data['High'].iloc[-1] == highs.max():
-                score += 5
-
-        # Price action: Consolidation near middle band (2 points)
-        if 0.98 < (close / middle_band) < 1.02:
-            score += 2
-
-        return score
-
-    def screen_stocks(self, tickers, start_date="2025-08-01", end_date=datetime.now()):
-        """Screen stocks based on technical criteria"""
-        print(f"\n🔍 Screening {len(tickers)} stocks for swing trading...")
-        print(f"   Time range: {start_date} to {end_date}")
+        return indicators.volume_ma(volume, period)
+
+    def score_cross_section(self, cs):
+        """
+        Momentum, volatility, volume and price action scores for every ticker at once
+
+        Args:
+            cs: CrossSection with computed indicators
+
+        Returns:
+            Dictionary of score name -> float array[tickers]
+        """
+        rsi = cs.last('RSI')
+        rsi_prev = cs.last('RSI', 1)
+        rsi_prev = np.where(cs.counts >= 2, rsi_prev, rsi)
+
+        # Momentum (40 points)
+        momentum = np.select([(rsi > 30) & (rsi < 70), rsi > 70], [5, 10], 0)
+        momentum = momentum + np.where(rsi > rsi_prev, 10, 0)
+        momentum = momentum + np.where(cs.last('MACD_Hist') > 0, 15, 0)
+
+        # Volatility (25 points)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_price = np.nanmean(cs.tail('Close', 20), axis=1)
+            atr_pct = cs.last('ATR') / avg_price * 100
+        bandwidth = cs.last('Bandwidth')
+        volatility = np.select([atr_pct > 2.0, atr_pct > 1.0, atr_pct > 0.5], [10, 7, 4], 0)
+        volatility = volatility + np.select([bandwidth < 0.05, bandwidth < 0.10, bandwidth < 0.20], [15, 10, 5], 0)
+
+        # Volume (20 points)
+        current_volume = cs.last('Volume')
+        volume_ma = cs.last('Volume_MA')
+        prev_volume = np.where(cs.counts >= 2, cs.last('Volume', 1), current_volume)
+        volume_trend = cs.tail('Volume', 3)
+        volume = np.select(
+            [current_volume > volume_ma * 1.5, current_volume > volume_ma * 1.2, current_volume > volume_ma], [10, 7, 5], 0
+        )
+        volume = volume + np.where(current_volume > prev_volume * 2.0, 5, 0)
+        increasing = (cs.counts >= 3) & (np.diff(volume_trend, axis=1) >= 0).all(axis=1)
+        volume = volume + np.where(increasing, 5, 0)
+
+        # Price action (15 points)
+        close = cs.last('Close')
+        middle_band = cs.last('BB_Mid')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            band_ratio = close / middle_band
+        new_high = cs.new_highs(5)[cs.rows, np.maximum(cs.counts - 1, 0)]
+        price_action = np.where(close > middle_band * 0.98, 5, 0)
+        price_action = price_action + np.where(close < middle_band * 1.02, 3, 0)
+        higher_high = (cs.counts >= 5) & new_high
+        price_action = price_action + np.where(higher_high, 5, 0)
+        price_action = price_action + np.where((band_ratio > 0.98) & (band_ratio < 1.02), 2, 0)
+        bonus = patterns.pattern_points(cs.patterns(), np.maximum(cs.counts - 1, 0))
+        price_action = np.minimum(price_action + bonus, 15)
+
+        return {
+            'momentum_score': momentum.astype(np.float64),
+            'volatility_score': volatility.astype(np.float64),
+            'volume_score': volume.astype(np.float64),
+            'price_action_score': price_action.astype(np.float64),
+        }
+
+    def screen_cross_section(self, cs, min_bars=30, verbose=True):
+        """
+        Compute indicators and scores for every ticker of a CrossSection in one pass
+
+        Returns:
+            Dictionary of ticker -> result (same fields as screen_stocks)
+        """
+        if not cs.tickers:
+            return {}
+
+        cs.compute()
+        scores = self.score_cross_section(cs)
+        total = sum(scores.values())
+
+        if self.compact:
+            self.stocks_data.update(compact_cross_section(cs))
+
+        # Volume profile of the last 60 bars (cached per ticker and last bar date)
+        poc, _, _ = get_profile_cache().cross_section(cs, window=60, bins=50)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            poc_distance = (cs.last('Close') - poc) / poc
+
+        latest = {column: cs.last(column) for column in ('RSI', 'MACD_Hist', 'ATR', 'Bandwidth', 'Close', 'Volume', 'Volume_MA')}
+        dates = cs.last_dates()
 
         results = {}
-
-        for i, ticker in enumerate(tickers, 1):
-            print(f"\n[{i}/{len(tickers)}] {ticker}")
-
-            try:
-                # Download data
-                stock = yf.Ticker(ticker)
-                hist = stock.history(start=start_date, end=end_date)
-
-                if hist.empty or len(hist) < 30:
-                    print(f"   ❌ Insufficient data (< 30 days)")
-                    continue
-
-                # Reset index
-                hist.index = hist.index.tz_localize(None).tz_localize('Asia/Jakarta')
-
-                # Calculate indicators
-                hist['RSI'] = self.calculate_rsi(hist['Close'], period=14)
-                hist['MACD'], hist['MACD_Signal'], hist['MACD_Hist'] = self.calculate_macd(hist['Close'])
-                hist['ATR'] = self.calculate_atr(hist['High'], hist['Low'], hist['Close'])
-                hist['BB_Upper'], hist['BB_Mid'], hist['BB_Lower'], hist['Bandwidth'] = self.calculate_bollinger(hist['Close'])
-                hist['Volume_MA'] = self.calculate_volume_ma(hist['Volume'])
-
-                # Calculate scores
-                momentum_score = self.calculate_momentum_score(hist)
-                volatility_score = self.calculate_volatility_score(hist)
-                volume_score = self.calculate_volume_score(hist)
-                price_action_score = self.calculate_price_action_score(hist)
-
-                # Total score (100 points max)
-                total_score = momentum_score + volatility_score + volume_score + price_action_score
-
-                # Get latest data
-                latest = hist.iloc[-1]
-
-                results[ticker] = {
-                    'total_score': total_score,
-                    'momentum_score': momentum_score,
-                    'volatility_score': volatility_score,
-                    'volume_score': volume_score,
-                    'price_action_score': price_action_score,
-                    'rsi': latest['RSI'],
-                    'macd_hist': latest['MACD_Hist'],
-                    'atr': latest['ATR'],
-                    'bandwidth': latest['Bandwidth'],
-                    'price': latest['Close'],
-                    'volume': latest['Volume'],
-                    'volume_ma': latest['Volume_MA'],
-                    'date': latest.name
-                }
-
-                print(f"   📊 Score: {total_score:.0f}/100")
-                print(f"      Momentum: {momentum_score:.0f}")
-                print(f"      Volatility: {volatility_score:.0f}")
-                print(f"      Volume: {volume_score:.0f}")
-                print(f"      Price Action: {price_action_score:.0f}")
-                print(f"      Price: Rp {latest['Close']:,.0f}")
-
-            except Exception as e:
-                print(f"   ❌ Error processing {ticker}: {str(e)}")
+        for row, ticker in enumerate(cs.tickers):
+            if verbose:
+                print(f"\n[{row + 1}/{len(cs.tickers)}] {ticker}")
+
+            if cs.counts[row] < min_bars:
+                if verbose:
+                    print(f"   ❌ Insufficient data (< {min_bars} days)")
+                continue
+
+            results[ticker] = {
+                'total_score': total[row],
+                'momentum_score': scores['momentum_score'][row],
+                'volatility_score': scores['volatility_score'][row],
+                'volume_score': scores['volume_score'][row],
+                'price_action_score': scores['price_action_score'][row],
+                'rsi': latest['RSI'][row],
+                'macd_hist': latest['MACD_Hist'][row],
+                'atr': latest['ATR'][row],
+                'bandwidth': latest['Bandwidth'][row],
+                'price': latest['Close'][row],
+                'volume': latest['Volume'][row],
+                'volume_ma': latest['Volume_MA'][row],
+                'poc': poc[row],
+                'poc_distance': poc_distance[row],
+                'date': dates[row]
+            }
+
+            if verbose:
+                print(f"   📊 Score: {total[row]:.0f}/100")
+                print(f"      Momentum: {scores['momentum_score'][row]:.0f}")
+                print(f"      Volatility: {scores['volatility_score'][row]:.0f}")
+                print(f"      Volume: {scores['volume_score'][row]:.0f}")
+                print(f"      Price Action: {scores['price_action_score'][row]:.0f}")
+                print(f"      Price: Rp {latest['Close'][row]:,.0f}")
 
         return results
 
+    def screen_stocks(self, tickers, start_date="2025-08-01", end_date=None):
+        """Screen stocks based on technical criteria"""
+        print(f"\n🔍 Screening {len(tickers)} stocks for swing trading...")
+        print(f"   Time range: {start_date} to {end_date or 'latest'}")
+
+        # Download all tickers concurrently, then score them all at once
+        fetched = self.engine.fetch_history(tickers, start=start_date, end=end_date)
+        report_errors(fetched)
+
+        # Short histories are dropped before packing, so they do not pad the cross-section
+        frames = {}
+        for ticker, result in fetched.items():
+            if result.error is not None:
+                continue
+            if result.data is None or len(result.data) < 30:
+                print(f"   ❌ {ticker}: Insufficient data (< 30 days)")
+                continue
+            frames[ticker] = result.data
+        cs = CrossSection.from_frames(frames)
+
+        return self.screen_cross_section(cs)
+
+    def screen_universe(self, universe, tickers=None, start_date=None, end_date=None, verbose=False):
+        """Screen tickers of a memory-mapped Universe without any network access"""
+        cs = CrossSection.from_universe(universe, tickers=tickers, start=start_date, end=end_date)
+        print(f"\n🔍 Screening {len(cs.tickers)} stocks from the local universe...")
+
+        return self.screen_cross_section(cs, verbose=verbose)
+
+    def rank_by_poc(self, results):
+        """
+        Rank screened stocks by distance of the price to the volume point of control
+
+        Returns:
+            List of (ticker, result) sorted by |price - POC| / POC (closest first)
+        """
+        tickers = list(results)
+        distance = np.abs(np.array([results[ticker]['poc_distance'] for ticker in tickers], dtype=np.float64))
+        order = np.argsort(np.where(np.isnan(distance), np.inf, distance), kind='stable')
+        return [(tickers[i], results[tickers[i]]) for i in order]
+
     def display_analysis(self, sorted_results):
         """Display detailed analysis of top stocks"""
         print("\n📊 DETAILED ANALYSIS OF TOP 10 STOCKS")
@@ -377,11 +342,22 @@ def main():
     # Start date (6 months of data)
     start_date = "2025-08-01"
 
+    # Skip tickers flagged by the ingest-time quality checks
+    quality = QualityIndex.load()
+    flagged = [ticker for ticker in idx_stocks if not quality.is_ok(ticker)]
+    if flagged:
+        print(f"\n⚠️  Skipping tickers with data quality issues: {', '.join(flagged)}")
+        idx_stocks = quality.filter(idx_stocks)
+
     # Initialize screener
     screener = TechnicalScreener()
 
-    # Run screening
-    results = screener.screen_stocks(idx_stocks, start_date=start_date)
+    # Run screening (--universe screens every ticker in the local universe)
+    if '--universe' in sys.argv:
+        universe = Universe("data/universe")
+        results = screener.screen_universe(universe, quality.filter(universe.tickers), start_date=start_date)
+    else:
+        results = screener.screen_stocks(idx_stocks, start_date=start_date)
 
     # Sort by total score
     sorted_results = sorted(results.items(), key=lambda x: x[1]['total_score'], reverse=True)
@@ -393,7 +369,7 @@ def main():
     import csv
 
     with open('/tmp/top_swing_stocks.csv', 'w', newline='') as csvfile:
-        fieldnames = ['rank', 'ticker', 'total_score', 'momentum_score', 'volatility_score', 'volume_score', 'price_action_score', 'rsi', 'macd_hist', 'atr', 'bandwidth', 'price', 'volume', 'volume_ma', 'date']
+        fieldnames = ['rank', 'ticker', 'total_score', 'momentum_score', 'volatility_score', 'volume_score', 'price_action_score', 'rsi', 'macd_hist', 'atr', 'bandwidth', 'price', 'volume', 'volume_ma', 'poc', 'poc_distance', 'date']
 
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
 
@@ -415,6 +391,8 @@ def main():
                 'price': data['price'],
                 'volume': data['volume'],
                 'volume_ma': data['volume_ma'],
+                'poc': data['poc'],
+                'poc_distance': data['poc_distance'],
                 'date': data['date']
             })
 
@@ -429,13 +407,17 @@ def main():
     print("   - Momentum Strength (RSI, MACD, Volume): 40 points")
     print("   - Volatility Characteristics (ATR, Bollinger): 25 points")
     print("   - Volume Profile (High, Spike, Trend): 20 points")
-    print("   - Price Action (Support/Resistance, Trend): 15 points")
+    print("   - Price Action (Support/Resistance, Trend, Patterns): 15 points")
     print("   - TOTAL: 100 points max")
 
     print("\n🎯 Top 5 Stocks for Swing Trading:")
     for i, (ticker, data) in enumerate(sorted_results[:5], 1):
         print(f"   {i}. {ticker} (Score: {data['total_score']:.0f}/100)")
 
+    print("\n📍 Closest to Volume Point of Control (60 days):")
+    for i, (ticker, data) in enumerate(screener.rank_by_poc(results)[:5], 1):
+        print(f"   {i}. {ticker} (POC: Rp {data['poc']:,.0f}, distance: {data['poc_distance'] * 100:+.1f}%)")
+
     print("\n" + "=" * 60)
     print("✅ SCREENING COMPLETE!")
     print("=" * 60)
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Walk-Forward Backtest Runner
+Optimize on a train window, trade the next test window, repeat
+
+Folds (bars, train_bars=504 / test_bars=126 by default):
+
+    rolling:   [train 0-503][test 504-629]
+                    [train 126-629][test 630-755]
+                         [train 252-755][test 756-881] ...
+
+    anchored:  [train 0-503][test 504-629]
+               [train 0-629........][test 630-755]
+               [train 0-755.............][test 756-881] ...
+
+For every fold, each parameter combination of the grid is backtested on
+the train bars; the best one (by metric, e.g. Sharpe) is then run on the
+test bars only. The test windows never overlap, so their equity curves
+form one out-of-sample curve covering everything after the first train
+window.
+
+Indicators and signals are computed once per ticker on the full history
+(one IndicatorGraph per ticker; indicators are causal, so a bar only sees earlier data)
+and shipped to each worker process once, in the pool initializer. Folds
+are independent and run in parallel; every test fold starts from
+initial_capital and the stitched curve compounds the fold returns.
+
+Output:
+- /tmp/walk_forward_folds.csv  - Best parameters, train and test metrics per fold
+- /tmp/walk_forward_equity.csv - Stitched out-of-sample equity per ticker
+
+Usage:
+    python scripts/trading/walk_forward.py [--anchored] [--strategy=rsi_divergence] [--metric=sharpe_ratio] [--workers=8]
+"""
+
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import csv
+import sys
+import os
+import time
+
+# Shared data modules live in the top-level trading/ directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'trading'))
+
+from data_quality import QualityIndex
+from indicator_graph import IndicatorGraph
+import backtest_engine
+from simple_backtest import strategy_signals
+from strategies import STRATEGIES, OHLCV_COLUMNS
+from sweep import PARAMETERS, SIGNAL_PARAMETERS, METRICS, parameter_grid, load_prices
+
+# Smaller grid than the full sweep: it runs once per fold
+DEFAULT_GRID = {
+    'rsi_period': [7, 14, 21],
+    'rsi_overbought': [65, 70, 75, 80],
+    'stop_loss_pct': [0.015, 0.025, 0.035, 0.05],
+    'take_profit_pct': [0.03, 0.04, 0.06, 0.08],
+    'position_size': [0.2],
+}
+
+TRAIN_BARS = 504  # ~2 years of IDX sessions
+TEST_BARS = 126   # ~6 months
+
+# Per-process signals, filled by _init_worker
+_prepared = {}
+
+
+def fold_ranges(bars, train_bars=TRAIN_BARS, test_bars=TEST_BARS, anchored=False):
+    """
+    Train/test bar ranges of every fold
+
+    Args:
+        bars: Number of bars in the history
+        train_bars: Bars in the (first) train window
+        test_bars: Bars in each test window (also the step between folds)
+        anchored: Train from bar 0 every time instead of a rolling window
+
+    Returns:
+        List of (train_start, train_end, test_start, test_end), ends exclusive;
+        the last test window may be shorter
+    """
+    folds = []
+    test_start = train_bars
+
+    while test_start < bars:
+        train_start = 0 if anchored else test_start - train_bars
+        folds.append((train_start, test_start, test_start, min(test_start + test_bars, bars)))
+        test_start += test_bars
+
+    return folds
+
+
+def prepare_signals(data, grid, strategy_name="rsi_divergence"):
+    """
+    Entry/exit signals of every signal parameter set in the grid, computed once
+
+    Args:
+        data: OHLCV DataFrame of one ticker
+        grid: List of parameter dictionaries (from parameter_grid)
+
+    Returns:
+        Dictionary with close (array) and signals:
+        (rsi_period, rsi_oversold, rsi_overbought) -> (entries, exits)
+    """
+    graph = IndicatorGraph(data[OHLCV_COLUMNS])
+
+    signals = {}
+    for params in grid:
+        key = tuple(params[name] for name in SIGNAL_PARAMETERS)
+        if key not in signals:
+            signals[key] = strategy_signals(
+                strategy_name, data, params['rsi_oversold'], params['rsi_overbought'], params['rsi_period'], graph=graph
+            )
+
+    return {'close': data['Close'].to_numpy(dtype=np.float64), 'signals': signals}
+
+
+def _init_worker(prepared):
+    """Pool initializer: keep the prepared signals of every ticker"""
+    _prepared.clear()
+    _prepared.update(prepared)
+
+
+def _score(metrics, metric):
+    """Sort key of a train result (NaN ranks last)"""
+    value = metrics[metric]
+    return -np.inf if value is None or np.isnan(value) else value
+
+
+def _run_fold(ticker, fold_number, fold, grid, metric, initial_capital):
+    """
+    Optimize on the train bars of one fold, then backtest the test bars
+
+    Returns:
+        Dictionary with the fold ranges, best parameters, train/test metrics
+        and the test equity curve
+    """
+    train_start, train_end, test_start, test_end = fold
+    prepared = _prepared[ticker]
+    close = prepared['close']
+
+    best, best_metrics = None, None
+    for params in grid:
+        entries, exits = prepared['signals'][tuple(params[name] for name in SIGNAL_PARAMETERS)]
+        result = backtest_engine.run_signals(
+            close[train_start:train_end], entries[train_start:train_end], exits[train_start:train_end],
+            params['stop_loss_pct'], params['take_profit_pct'], initial_capital, params['position_size']
+        )
+        metrics = backtest_engine.summarize(result, initial_capital)
+
+        if best is None or _score(metrics, metric) > _score(best_metrics, metric):
+            best, best_metrics = params, metrics
+
+    entries, exits = prepared['signals'][tuple(best[name] for name in SIGNAL_PARAMETERS)]
+    result = backtest_engine.run_signals(
+        close[test_start:test_end], entries[test_start:test_end], exits[test_start:test_end],
+        best['stop_loss_pct'], best['take_profit_pct'], initial_capital, best['position_size']
+    )
+
+    return {
+        'ticker': ticker,
+        'fold': fold_number,
+        'range': fold,
+        'params': best,
+        'train': best_metrics,
+        'test': backtest_engine.summarize(result, initial_capital),
+        'equity': result['equity'],
+    }
+
+
+def stitch_equity(folds, dates, initial_capital=100000000):
+    """
+    Out-of-sample equity of consecutive test folds as one curve
+
+    Each fold's equity is scaled so it starts where the previous fold ended.
+
+    Args:
+        folds: Fold results of one ticker, in fold order
+        dates: DatetimeIndex of the ticker's bars
+
+    Returns:
+        DataFrame with date, fold and equity columns
+    """
+    frames = []
+    capital = initial_capital
+
+    for fold in folds:
+        test_start, test_end = fold['range'][2], fold['range'][3]
+        equity = fold['equity'] * (capital / initial_capital)
+        frames.append(pd.DataFrame({'date': dates[test_start:test_end], 'fold': fold['fold'], 'equity': equity}))
+        capital = equity[-1]
+
+    if not frames:
+        return pd.DataFrame(columns=['date', 'fold', 'equity'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def run_walk_forward(prices, grid, strategy_name="rsi_divergence", metric='sharpe_ratio', train_bars=TRAIN_BARS,
+                     test_bars=TEST_BARS, anchored=False, initial_capital=100000000, max_workers=None):
+    """
+    Walk-forward backtest of several tickers
+
+    Args:
+        prices: Dictionary of ticker -> OHLCV DataFrame
+        grid: List of parameter dictionaries optimized on every train window
+        metric: summarize() metric maximized on the train windows
+        max_workers: Worker processes (default: CPU count)
+
+    Returns:
+        Dictionary of ticker -> {'folds': [...], 'equity': DataFrame, 'summary': dict}
+    """
+    prepared = {ticker: prepare_signals(data, grid, strategy_name) for ticker, data in prices.items()}
+    tasks = [
+        (ticker, number, fold)
+        for ticker, data in prices.items()
+        for number, fold in enumerate(fold_ranges(len(data), train_bars, test_bars, anchored), 1)
+    ]
+
+    print(f"\n🔄 Walk-forward ({'anchored' if anchored else 'rolling'}): {len(tasks)} folds x {len(grid)} combinations")
+
+    folds = {ticker: [] for ticker in prices}
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(prepared,)) as executor:
+        futures = [
+            executor.submit(_run_fold, ticker, number, fold, grid, metric, initial_capital)
+            for ticker, number, fold in tasks
+        ]
+
+        for done, future in enumerate(as_completed(futures), 1):
+            fold = future.result()
+            folds[fold['ticker']].append(fold)
+            if done % 10 == 0 or done == len(futures):
+                print(f"   {done}/{len(futures)} folds ({time.time() - started:.1f}s)")
+
+    results = {}
+    for ticker, ticker_folds in folds.items():
+        ticker_folds.sort(key=lambda fold: fold['fold'])
+        equity = stitch_equity(ticker_folds, prices[ticker].index, initial_capital)
+        results[ticker] = {
+            'folds': ticker_folds,
+            'equity': equity,
+            'summary': summarize_walk_forward(ticker_folds, equity, metric, initial_capital),
+        }
+
+    return results
+
+
+def summarize_walk_forward(folds, equity, metric='sharpe_ratio', initial_capital=100000000):
+    """
+    Out-of-sample performance next to the (optimistic) in-sample metric
+
+    Returns:
+        Dictionary with folds, total_return, max_drawdown and sharpe_ratio of
+        the stitched curve, total_trades, and the mean train / test metric
+    """
+    if equity.empty:
+        return {'folds': 0, 'total_return': 0.0, 'max_drawdown': 0.0, 'sharpe_ratio': 0, 'total_trades': 0,
+                f'train_{metric}': np.nan, f'test_{metric}': np.nan}
+
+    values = equity['equity'].to_numpy(dtype=np.float64)
+    return {
+        'folds': len(folds),
+        'total_return': float((values[-1] / initial_capital - 1) * 100),
+        'max_drawdown': backtest_engine.max_bar_drawdown(values) * 100,
+        'sharpe_ratio': float(backtest_engine.sharpe_ratio(values)),
+        'total_trades': sum(fold['test']['total_trades'] for fold in folds),
+        f'train_{metric}': float(np.nanmean([fold['train'][metric] for fold in folds])),
+        f'test_{metric}': float(np.nanmean([fold['test'][metric] for fold in folds])),
+    }
+
+
+def export_to_csv(results, prices, metric='sharpe_ratio', output_dir="/tmp"):
+    """Export per-fold results and the stitched equity curves"""
+    print(f"\n📄 Exporting results to CSV...")
+
+    folds_file = os.path.join(output_dir, 'walk_forward_folds.csv')
+    with open(folds_file, 'w', newline='') as csvfile:
+        fieldnames = ['stock', 'fold', 'train_start', 'train_end', 'test_start', 'test_end'] + PARAMETERS + [
+            f'train_{metric}', f'test_{metric}', 'test_return_pct', 'test_trades']
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+
+        for ticker, result in results.items():
+            dates = prices[ticker].index
+            for fold in result['folds']:
+                train_start, train_end, test_start, test_end = fold['range']
+                row = {
+                    'stock': ticker,
+                    'fold': fold['fold'],
+                    'train_start': dates[train_start],
+                    'train_end': dates[train_end - 1],
+                    'test_start': dates[test_start],
+                    'test_end': dates[test_end - 1],
+                    f'train_{metric}': fold['train'][metric],
+                    f'test_{metric}': fold['test'][metric],
+                    'test_return_pct': (fold['equity'][-1] / fold['equity'][0] - 1) * 100 if len(fold['equity']) else 0.0,
+                    'test_trades': fold['test']['total_trades'],
+                }
+                row.update({name: fold['params'][name] for name in PARAMETERS})
+                writer.writerow(row)
+
+    print(f"   ✅ Folds: {folds_file}")
+
+    equity_file = os.path.join(output_dir, 'walk_forward_equity.csv')
+    frames = [result['equity'].assign(stock=ticker) for ticker, result in results.items() if not result['equity'].empty]
+    if frames:
+        pd.concat(frames, ignore_index=True)[['stock', 'date', 'fold', 'equity']].to_csv(equity_file, index=False)
+    else:
+        pd.DataFrame(columns=['stock', 'date', 'fold', 'equity']).to_csv(equity_file, index=False)
+
+    print(f"   ✅ Out-of-sample equity: {equity_file}")
+
+
+def _option(name, default=None):
+    """Value of a --name=value command line option"""
+    for arg in sys.argv:
+        if arg.startswith(f"--{name}="):
+            return arg.split('=', 1)[1]
+    return default
+
+
+def main():
+    """Main function to run the walk-forward backtest"""
+    print("=" * 60)
+    print("🚶 Walk-Forward Backtest - Indonesian Banking Stocks")
+    print("=" * 60)
+
+    tickers = ['BMRI.JK', 'BBRI.JK', 'BBCA.JK']
+
+    strategy_name = _option('strategy', 'rsi_divergence')
+    metric = _option('metric', 'sharpe_ratio')
+    workers = _option('workers')
+    anchored = '--anchored' in sys.argv
+    universe_path = "data/universe" if '--universe' in sys.argv else None
+
+    if metric not in METRICS:
+        print(f"❌ Unknown metric: {metric} (available: {', '.join(METRICS)})")
+        return
+
+    if strategy_name not in STRATEGIES:
+        print(f"❌ Unknown strategy: {strategy_name} (available: {', '.join(STRATEGIES)})")
+        return
+
+    # Skip tickers flagged by the ingest-time quality checks
+    quality = QualityIndex.load()
+    for ticker in tickers:
+        if not quality.is_ok(ticker):
+            print(f"\n⚠️  Skipping {ticker}: {', '.join(quality.get(ticker)['issues'])}")
+    tickers = quality.filter(tickers)
+
+    prices = load_prices(tickers, universe_path=universe_path)
+    if not prices:
+        print("❌ No price data available")
+        return
+
+    # Signal parameters the strategy does not take would only repeat identical runs
+    defaults = STRATEGIES[strategy_name].defaults
+    grid = parameter_grid(**{
+        name: values for name, values in DEFAULT_GRID.items() if name not in SIGNAL_PARAMETERS or name in defaults
+    })
+
+    print(f"\n📊 Stocks: {', '.join(prices)}")
+    print(f"📊 Strategy: {strategy_name}, optimizing {metric}")
+    print(f"📊 Folds: {TRAIN_BARS} train / {TEST_BARS} test bars ({'anchored' if anchored else 'rolling'})")
+
+    results = run_walk_forward(prices, grid, strategy_name=strategy_name, metric=metric, anchored=anchored,
+                               max_workers=int(workers) if workers else None)
+
+    print(f"\n" + "=" * 60)
+    print("📊 WALK-FORWARD SUMMARY (OUT-OF-SAMPLE)")
+    print("=" * 60)
+
+    for ticker, result in results.items():
+        summary = result['summary']
+        print(f"\n{ticker}:")
+        print(f"  Folds: {summary['folds']}")
+        print(f"  Total Return: {summary['total_return']:.2f}%")
+        print(f"  Max Drawdown: {summary['max_drawdown']:.2f}%")
+        print(f"  Sharpe Ratio: {summary['sharpe_ratio']:.2f}")
+        print(f"  Total Trades: {summary['total_trades']}")
+        print(f"  {metric}: train {summary[f'train_{metric}']:.2f} vs test {summary[f'test_{metric}']:.2f}")
+
+    export_to_csv(results, prices, metric)
+
+
+if __name__ == "__main__":
+    main()
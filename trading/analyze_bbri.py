@@ -7,38 +7,17 @@ Simple technical analysis framework
 # Since we can't install yfinance due to system limitations,
 # this is a framework that can be expanded once dependencies are available
 
+import indicators
+
 def calculate_rsi(prices, period=14):
     """Calculate RSI indicator"""
     if len(prices) < period + 1:
         return None
-
-    gains = []
-    losses = []
-
-    for i in range(1, len(prices)):
-        change = prices[i] - prices[i-1]
-        if change > 0:
-            gains.append(change)
-            losses.append(0)
-        else:
-            gains.append(0)
-            losses.append(abs(change))
-
-    avg_gain = sum(gains[-period:]) / period
-    avg_loss = sum(losses[-period:]) / period
-
-    if avg_loss == 0:
-        return 100
-
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return round(rsi, 2)
+    return indicators.last(indicators.rsi(prices, period), 2)
 
 def calculate_sma(prices, period):
     """Calculate Simple Moving Average"""
-    if len(prices) < period:
-        return None
-    return round(sum(prices[-period:]) / period, 2)
+    return indicators.last(indicators.sma(prices, period), 2)
 
 def analyze_price_action(current_price, support, resistance):
     """Analyze current price position"""
@@ -4,83 +4,44 @@ BMRI Stock Technical Analysis - Weekly Chart
 Provides buy/sell signals based on technical indicators
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import sys
+
+from history_cache import cached_history
+from ohlcv_store import OHLCVStore
+from resample import BarResampler
+import indicators
 
 def calculate_rsi(prices, period=14):
     """Calculate RSI indicator"""
     if len(prices) < period + 1:
         return None
-
-    gains = []
-    losses = []
-
-    for i in range(1, len(prices)):
-        change = prices[i] - prices[i-1]
-        if change > 0:
-            gains.append(change)
-            losses.append(0)
-        else:
-            gains.append(0)
-            losses.append(abs(change))
-
-    avg_gain = sum(gains[-period:]) / period
-    avg_loss = sum(losses[-period:]) / period
-
-    if avg_loss == 0:
-        return 100
-
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return round(rsi, 2)
+    return indicators.last(indicators.rsi(prices, period), 2)
 
 def calculate_sma(prices, period):
     """Calculate Simple Moving Average"""
-    if len(prices) < period:
-        return None
-    return round(sum(prices[-period:]) / period, 2)
+    return indicators.last(indicators.sma(prices, period), 2)
 
 def calculate_ema(prices, period):
     """Calculate Exponential Moving Average"""
     if len(prices) < period:
         return None
-    multiplier = 2 / (period + 1)
-    ema = [prices[0]]
-    for price in prices[1:]:
-        ema.append(round((price * multiplier) + (ema[-1] * (1 - multiplier)), 2))
-    return ema[-1]
+    return indicators.last(indicators.ema(prices, period), 2)
 
 def calculate_macd(prices, fast=12, slow=26, signal=9):
     """Calculate MACD"""
     if len(prices) < slow:
         return None, None, None
 
-    ema_fast = calculate_ema(prices, fast)
-    ema_slow = calculate_ema(prices, slow)
-
-    if ema_fast is None or ema_slow is None:
-        return None, None, None
-
-    macd_line = ema_fast - ema_slow
-    macd_values = [price - (ema_slow + (i * 0.01)) for i, price in enumerate(prices[-fast:])]
-
-    # Signal line (9-period EMA of MACD)
-    if len(macd_values) < signal:
-        return macd_line, None, None
-
-    signal_line = calculate_ema(macd_values[-signal:], signal)
-    histogram = macd_line - signal_line if signal_line else 0
-
-    return round(macd_line, 2), round(signal_line if signal_line else 0, 2), round(histogram, 2)
+    macd_line, signal_line, histogram = indicators.macd(prices, fast, slow, signal)
+    return indicators.last(macd_line, 2), indicators.last(signal_line, 2), indicators.last(histogram, 2)
 
 def find_support_resistance(prices, period=20):
     """Find key support and resistance levels"""
-    recent_prices = prices[-period:]
-    support = round(min(recent_prices), 0)
-    resistance = round(max(recent_prices), 0)
-    return support, resistance
+    support, resistance = indicators.support_resistance(prices, period)
+    return indicators.last(support, 0), indicators.last(resistance, 0)
 
 def generate_signal(current_price, rsi, macd_histogram, support, resistance):
     """Generate buy/sell signal based on multiple indicators"""
@@ -138,24 +99,26 @@ def generate_signal(current_price, rsi, macd_histogram, support, resistance):
 
     return final_signal, signals, buy_zone
 
-def analyze_bmri():
+def analyze_bmri(offline=False):
     """Analyze BMRI stock with weekly data"""
     print("🔍 Analyzing BMRI Stock (Bank Mandiri) - Weekly Chart")
     print("=" * 60)
 
     try:
         # Get BMRI data (weekly, last 2 years)
-        ticker = yf.Ticker("BMRI.JK")
-        data = ticker.history(period="2y", interval="1wk")
+        if offline:
+            data = BarResampler(OHLCVStore()).weekly("BMRI.JK", start=datetime.now() - timedelta(days=730))
+        else:
+            data = cached_history("BMRI.JK", period="2y", interval="1wk")
 
-        if data.empty:
+        if data is None or data.empty:
             print("❌ Error: No data available for BMRI")
             return
 
-        close_prices = data['Close'].tolist()
-        high_prices = data['High'].tolist()
-        low_prices = data['Low'].tolist()
-        volumes = data['Volume'].tolist()
+        close_prices = data['Close'].to_numpy()
+        high_prices = data['High'].to_numpy()
+        low_prices = data['Low'].to_numpy()
+        volumes = data['Volume'].to_numpy()
 
         current_price = close_prices[-1]
         prev_price = close_prices[-2]
@@ -211,4 +174,4 @@ def analyze_bmri():
         print(f"❌ Error during analysis: {str(e)}")
 
 if __name__ == "__main__":
-    analyze_bmri()
+    analyze_bmri(offline='--offline' in sys.argv)
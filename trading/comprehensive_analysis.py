@@ -4,33 +4,74 @@ Comprehensive Stock Analysis with Fundamental Data
 Includes technical, fundamental, and valuation metrics
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import json
+import sys
+
+from history_cache import cached_history
+from ohlcv_store import OHLCVStore
+from resample import BarResampler
+from fundamentals_cache import FundamentalsCache
+from fundamentals_history import FundamentalsHistory, score_snapshot
+import indicators
+from indicator_graph import IndicatorGraph
+
+# Feedback per fundamental score tier (fundamentals_history.SCORE_RULES order, then
+# below every threshold) and the value format
+FUNDAMENTAL_FEEDBACK = [
+    ('returnOnEquity', ["✅ ROE Excellent", "✅ ROE Good", "⚠️ ROE Fair", "❌ ROE Poor"],
+     lambda value: f"{value*100:.1f}%"),
+    ('profitMargins', ["✅ Profit Margin Excellent", "✅ Profit Margin Good", "⚠️ Profit Margin Fair", "❌ Profit Margin Poor"],
+     lambda value: f"{value*100:.1f}%"),
+    ('revenueGrowth', ["✅ Revenue Growth Excellent", "✅ Revenue Growth Good", "⚠️ Revenue Growth Moderate",
+                       "⚠️ Revenue Growth Low", "❌ Revenue Growth Negative"],
+     lambda value: f"{value*100:.1f}%"),
+    ('trailingPE', ["✅ P/E Attractive", "⚠️ P/E Fair", "⚠️ P/E High", "❌ P/E Very High"],
+     lambda value: f"{value:.1f}"),
+    ('debtToEquity', ["✅ Debt Ratio Excellent", "✅ Debt Ratio Good", "⚠️ Debt Ratio Moderate", "❌ Debt Ratio High"],
+     lambda value: f"{value:.2f}"),
+]
 
 class StockAnalyzer:
-    def __init__(self, symbol):
+    def __init__(self, symbol, fundamentals=None, resampler=None):
         self.symbol = symbol
-        self.ticker = yf.Ticker(symbol)
+        self.fundamentals = fundamentals or FundamentalsCache()
+        self.resampler = resampler
+        self.snapshot = None
         self.data = None
         self.info = None
-        self.financials = None
+
+    @property
+    def financials(self):
+        """Income statement (loaded on first access)"""
+        return self.snapshot.financials if self.snapshot else None
+
+    @property
+    def balance_sheet(self):
+        """Balance sheet (loaded on first access)"""
+        return self.snapshot.balance_sheet if self.snapshot else None
+
+    @property
+    def cashflow(self):
+        """Cash flow statement (loaded on first access)"""
+        return self.snapshot.cashflow if self.snapshot else None
 
     def fetch_all_data(self):
         """Fetch all available data from Yahoo Finance"""
         try:
-            # Price data
-            self.data = self.ticker.history(period="2y", interval="1wk", timeout=30)
-
-            # Fundamental data
-            self.info = self.ticker.info
+            # Price data (offline: weekly bars built from the local daily store)
+            if self.resampler is not None:
+                self.data = self.resampler.weekly(self.symbol, start=datetime.now() - timedelta(days=730))
+                if self.data is None:
+                    return False, "No stored data available"
+            else:
+                self.data = cached_history(self.symbol, period="2y", interval="1wk", timeout=30)
 
-            # Financial statements
-            self.financials = self.ticker.financials
-            self.balance_sheet = self.ticker.balance_sheet
-            self.cashflow = self.ticker.cashflow
+            # Fundamental data (cached on disk, refreshed monthly or after earnings)
+            self.snapshot = self.fundamentals.get(self.symbol)
+            self.info = self.snapshot.info
 
             if self.data.empty:
                 return False, "No price data available"
@@ -84,73 +125,29 @@ class StockAnalyzer:
         if self.data.empty:
             return None
 
-        close_prices = self.data['Close'].tolist()
-
-        # RSI
-        def calculate_rsi(prices, period=14):
-            if len(prices) < period + 1:
-                return None
-            gains = []
-            losses = []
-            for i in range(1, len(prices)):
-                change = prices[i] - prices[i-1]
-                gains.append(max(change, 0))
-                losses.append(abs(min(change, 0)))
-            avg_gain = sum(gains[-period:]) / period
-            avg_loss = sum(losses[-period:]) / period
-            if avg_loss == 0:
-                return 100
-            rs = avg_gain / avg_loss
-            return round(100 - (100 / (1 + rs)), 2)
-
-        # SMA
-        def calculate_sma(prices, period):
-            if len(prices) < period:
-                return None
-            return round(sum(prices[-period:]) / period, 2)
-
-        # EMA
-        def calculate_ema(period):
-            if len(close_prices) < period:
-                return None
-            multiplier = 2 / (period + 1)
-            ema = [close_prices[0]]
-            for price in close_prices[1:]:
-                ema.append((price * multiplier) + (ema[-1] * (1 - multiplier)))
-            return round(ema[-1], 2)
-
-        # MACD
-        def calculate_macd():
-            ema_12 = calculate_ema(12)
-            ema_26 = calculate_ema(26)
-            if ema_12 is None or ema_26 is None:
-                return None, None, None
-            macd_line = ema_12 - ema_26
-
-            # Simple histogram
-            recent_changes = [close_prices[i] - close_prices[i-1] for i in range(-9, 0)]
-            signal_line = sum(recent_changes) / len(recent_changes) if recent_changes else 0
-            histogram = macd_line - signal_line
-
-            return round(macd_line, 2), round(signal_line, 2), round(histogram, 2)
-
-        # Support/Resistance
-        def find_support_resistance(period=20):
-            recent_prices = close_prices[-period:]
-            return round(min(recent_prices), 0), round(max(recent_prices), 0)
+        close = self.data['Close']
+        close_prices = close.to_numpy()
+
+        # Shared nodes: ema(12)/ema(26) feed macd, support/resistance computed once
+        graph = IndicatorGraph(self.data)
+        ema_12 = graph.ema(12)
+        ema_26 = graph.ema(26)
+        macd_line, macd_signal, macd_histogram = graph.macd()
+        support, resistance = graph.support_resistance()
+        has_macd = len(close) >= 26
 
         return {
-            'rsi': calculate_rsi(close_prices),
-            'sma_20': calculate_sma(close_prices, 20),
-            'sma_50': calculate_sma(close_prices, 50),
-            'sma_200': calculate_sma(close_prices, 200),
-            'ema_12': calculate_ema(12),
-            'ema_26': calculate_ema(26),
-            'macd_line': calculate_macd()[0],
-            'macd_signal': calculate_macd()[1],
-            'macd_histogram': calculate_macd()[2],
-            'support': find_support_resistance()[0],
-            'resistance': find_support_resistance()[1],
+            'rsi': indicators.last(graph.rsi(), 2),
+            'sma_20': indicators.last(graph.sma(20), 2),
+            'sma_50': indicators.last(graph.sma(50), 2),
+            'sma_200': indicators.last(graph.sma(200), 2),
+            'ema_12': indicators.last(ema_12, 2) if len(close) >= 12 else None,
+            'ema_26': indicators.last(ema_26, 2) if has_macd else None,
+            'macd_line': indicators.last(macd_line, 2) if has_macd else None,
+            'macd_signal': indicators.last(macd_signal, 2) if has_macd else None,
+            'macd_histogram': indicators.last(macd_histogram, 2) if has_macd else None,
+            'support': indicators.last(support, 0),
+            'resistance': indicators.last(resistance, 0),
             'current_price': round(close_prices[-1], 0),
             'prev_price': round(close_prices[-2], 0),
             'price_change': round(((close_prices[-1] - close_prices[-2]) / close_prices[-2]) * 100, 2)
@@ -161,94 +158,20 @@ class StockAnalyzer:
         if not self.info:
             return 0, "No data"
 
-        score = 0
-        max_score = 100
+        # Thresholds and points are shared with the point-in-time score
+        score, tiers = score_snapshot(self.info)
         feedback = []
 
-        # Profitability (30 points)
-        roe = self.info.get('returnOnEquity', 0)
-        if roe:
-            if roe > 0.15:  # 15% ROE is excellent
-                score += 25
-                feedback.append(f"✅ ROE Excellent: {roe*100:.1f}%")
-            elif roe > 0.10:
-                score += 20
-                feedback.append(f"✅ ROE Good: {roe*100:.1f}%")
-            elif roe > 0.05:
-                score += 15
-                feedback.append(f"⚠️ ROE Fair: {roe*100:.1f}%")
-            else:
-                feedback.append(f"❌ ROE Poor: {roe*100:.1f}%")
-
-        # Profit Margin (15 points)
-        profit_margin = self.info.get('profitMargins', 0)
-        if profit_margin:
-            if profit_margin > 0.20:
-                score += 15
-                feedback.append(f"✅ Profit Margin Excellent: {profit_margin*100:.1f}%")
-            elif profit_margin > 0.10:
-                score += 10
-                feedback.append(f"✅ Profit Margin Good: {profit_margin*100:.1f}%")
-            elif profit_margin > 0.05:
-                score += 5
-                feedback.append(f"⚠️ Profit Margin Fair: {profit_margin*100:.1f}%")
-            else:
-                feedback.append(f"❌ Profit Margin Poor: {profit_margin*100:.1f}%")
-
-        # Growth (20 points)
-        revenue_growth = self.info.get('revenueGrowth', 0)
-        if revenue_growth:
-            if revenue_growth > 0.15:
-                score += 20
-                feedback.append(f"✅ Revenue Growth Excellent: {revenue_growth*100:.1f}%")
-            elif revenue_growth > 0.10:
-                score += 15
-                feedback.append(f"✅ Revenue Growth Good: {revenue_growth*100:.1f}%")
-            elif revenue_growth > 0.05:
-                score += 10
-                feedback.append(f"⚠️ Revenue Growth Moderate: {revenue_growth*100:.1f}%")
-            elif revenue_growth > 0:
-                score += 5
-                feedback.append(f"⚠️ Revenue Growth Low: {revenue_growth*100:.1f}%")
-            else:
-                feedback.append(f"❌ Revenue Growth Negative: {revenue_growth*100:.1f}%")
-
-        # Valuation (15 points)
-        pe_ratio = self.info.get('trailingPE', 0)
-        if pe_ratio:
-            if pe_ratio < 15:
-                score += 15
-                feedback.append(f"✅ P/E Attractive: {pe_ratio:.1f}")
-            elif pe_ratio < 25:
-                score += 10
-                feedback.append(f"⚠️ P/E Fair: {pe_ratio:.1f}")
-            elif pe_ratio < 40:
-                score += 5
-                feedback.append(f"⚠️ P/E High: {pe_ratio:.1f}")
-            else:
-                feedback.append(f"❌ P/E Very High: {pe_ratio:.1f}")
-
-        # Financial Health (20 points)
-        debt_to_equity = self.info.get('debtToEquity', 0)
-        if debt_to_equity:
-            if debt_to_equity < 0.5:
-                score += 20
-                feedback.append(f"✅ Debt Ratio Excellent: {debt_to_equity:.2f}")
-            elif debt_to_equity < 1.0:
-                score += 15
-                feedback.append(f"✅ Debt Ratio Good: {debt_to_equity:.2f}")
-            elif debt_to_equity < 2.0:
-                score += 10
-                feedback.append(f"⚠️ Debt Ratio Moderate: {debt_to_equity:.2f}")
-            else:
-                feedback.append(f"❌ Debt Ratio High: {debt_to_equity:.2f}")
+        for field, labels, formatter in FUNDAMENTAL_FEEDBACK:
+            if tiers[field] >= 0:
+                feedback.append(f"{labels[tiers[field]]}: {formatter(float(self.info[field]))}")
 
         # Dividend (optional bonus)
         dividend_yield = self.info.get('dividendYield', 0)
         if dividend_yield and dividend_yield > 0.03:  # >3%
             feedback.append(f"✅ Dividend Yield Good: {dividend_yield*100:.1f}%")
 
-        return score, feedback
+        return int(score), feedback
 
     def generate_investment_recommendation(self, fundamental_score, technical_score):
         """Generate overall investment recommendation"""
@@ -416,13 +339,23 @@ def main():
 
     results = {}
 
+    # Every refreshed snapshot is also kept in the point-in-time history
+    history = FundamentalsHistory()
+    fundamentals = FundamentalsCache(history=history)
+
+    # --offline builds weekly bars from the local daily store (no network for prices)
+    resampler = BarResampler(OHLCVStore()) if '--offline' in sys.argv else None
+
     for stock in stocks:
         print(f"\n⏳ Analyzing {stock}...")
-        analyzer = StockAnalyzer(stock)
+        analyzer = StockAnalyzer(stock, fundamentals=fundamentals, resampler=resampler)
         result = analyzer.analyze()
         results[stock] = result
         display_comprehensive_report(result)
 
+    # Write the snapshots refreshed above to the history in one batch
+    history.flush()
+
     # Comparison Summary
     print(f"\n{'='*80}")
     print(f"📋 COMPARISON SUMMARY - ALL STOCKS")
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Cross-Sectional Indicator Engine
+Computes every screener indicator for a whole [tickers x bars] universe in one pass
+
+Tickers have different listing dates, suspensions and missing bars, so the
+shared date axis has holes. Each ticker's valid bars are packed to the left
+of its row:
+
+    dates:   d0   d1   d2   d3   d4          packed:
+    AAAA     10   11   NaN  12   13    ->    10   11   12   13
+    BBBB     NaN  NaN  20   21   22    ->    20   21   22   NaN
+
+Indicators are then computed along the bar axis for all tickers at once
+(same formulas as indicators.py), so every ticker sees exactly the bar
+sequence it would have as a single DataFrame. Rolling windows use cumulative
+sums (rolling.rolling_stats for the Bollinger mean and deviation) and EMAs
+step through the bars with one vector operation per bar, so the cost does
+not grow with a per-ticker Python loop. Results can be read in packed form
+(latest values per ticker) or scattered back onto the shared date axis.
+"""
+
+import pandas as pd
+import numpy as np
+
+from ohlcv_store import TIMEZONE, normalize_index
+from universe import FIELD_COLUMNS
+import rolling
+import patterns
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+INDICATOR_COLUMNS = [
+    'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist', 'ATR',
+    'BB_Upper', 'BB_Mid', 'BB_Lower', 'Bandwidth', 'Volume_MA',
+]
+
+
+def pack_order(valid):
+    """
+    Column order that moves each row's valid bars to the left
+
+    Args:
+        valid: bool array[tickers, bars]
+
+    Returns:
+        (order, filled): source column of every packed cell, int array[tickers, width],
+        and the bool mask of filled cells
+    """
+    counts = valid.sum(axis=1)
+    width = int(counts.max()) if len(counts) else 0
+
+    # Stable sort puts valid columns first, in date order
+    order = np.argsort(~valid, axis=1, kind='stable')[:, :width]
+    filled = np.arange(width) < counts[:, None]
+
+    return order, filled
+
+
+def pack(values, order, filled):
+    """Packed copy of array[tickers, bars] (NaN padded on the right)"""
+    packed = np.take_along_axis(np.asarray(values, dtype=np.float64), order, axis=1)
+    packed[~filled] = np.nan
+    return packed
+
+
+def unpack(packed, order, filled, bars):
+    """Scatter packed values back onto the shared date axis (NaN where a ticker has no bar)"""
+    result = np.full((packed.shape[0], bars), np.nan)
+    rows, cells = np.nonzero(filled)
+    result[rows, order[rows, cells]] = packed[rows, cells]
+    return result
+
+
+def _window_sums(cumulative, period):
+    """Sums over the last period bars from a cumulative sum (NaN for the first period-1 bars)"""
+    if cumulative.shape[1] < period:
+        return np.full_like(cumulative, np.nan)
+
+    result = np.empty_like(cumulative)
+    result[:, :period - 1] = np.nan
+    result[:, period - 1] = cumulative[:, period - 1]
+    np.subtract(cumulative[:, period:], cumulative[:, :-period], out=result[:, period:])
+    return result
+
+
+def rolling_mean(values, period):
+    """
+    Rolling mean along the bar axis of packed rows
+
+    Rows must be free of NaN apart from the right padding (whose results
+    are meaningless and masked by the caller).
+    """
+    cumulative = np.nan_to_num(values, nan=0.0)
+    np.cumsum(cumulative, axis=1, out=cumulative)
+
+    result = _window_sums(cumulative, period)
+    result /= period
+    return result
+
+
+def ema_rows(values, period):
+    """EMA along the bar axis, seeded with each row's first value (one vector step per bar)"""
+    alpha = 2 / (period + 1)
+    # Bars as rows keeps every step on contiguous memory
+    columns = np.ascontiguousarray(values.T)
+    result = np.empty_like(columns)
+    result[0] = columns[0]
+    for bar in range(1, len(columns)):
+        np.subtract(columns[bar], result[bar - 1], out=result[bar])
+        result[bar] *= alpha
+        result[bar] += result[bar - 1]
+    return result.T
+
+
+class CrossSection:
+    """Packed OHLCV and indicators for many tickers"""
+
+    def __init__(self, tickers, dates, matrices, valid=None):
+        """
+        Args:
+            tickers: List of tickers (one per row)
+            dates: Shared date axis (DatetimeIndex or datetime64 array)
+            matrices: Dictionary of Open/High/Low/Close/Volume -> array[tickers, bars]
+            valid: bool array[tickers, bars] (default: bars where every column is present)
+        """
+        self.tickers = list(tickers)
+        self.dates = pd.DatetimeIndex(dates)
+        self.bars = len(self.dates)
+
+        if valid is None:
+            valid = np.ones(np.shape(matrices['Close']), dtype=bool)
+            for column in PRICE_COLUMNS:
+                valid &= ~np.isnan(np.asarray(matrices[column], dtype=np.float64))
+        self.valid = valid
+
+        self.order, self.filled = pack_order(valid)
+        self.values = {column: pack(matrices[column], self.order, self.filled) for column in PRICE_COLUMNS}
+
+        self.counts = self.filled.sum(axis=1)
+        self.rows = np.arange(len(self.tickers))
+
+    @classmethod
+    def from_frames(cls, frames):
+        """
+        Align per-ticker OHLCV DataFrames on a shared date axis
+
+        Args:
+            frames: Dictionary of ticker -> DataFrame (e.g., FetchEngine results)
+        """
+        tickers = [ticker for ticker, frame in frames.items() if frame is not None and not frame.empty]
+        indexes = {ticker: normalize_index(frames[ticker].index) for ticker in tickers}
+
+        dates = pd.DatetimeIndex([], tz=TIMEZONE)
+        for index in indexes.values():
+            dates = dates.union(index)
+
+        matrices = {column: np.full((len(tickers), len(dates)), np.nan) for column in PRICE_COLUMNS}
+        for row, ticker in enumerate(tickers):
+            frame = frames[ticker]
+            columns = dates.get_indexer(indexes[ticker])
+            for column in PRICE_COLUMNS:
+                matrices[column][row, columns] = frame[column].to_numpy(dtype=np.float64)
+
+        return cls(tickers, dates, matrices)
+
+    @classmethod
+    def from_universe(cls, universe, tickers=None, start=None, end=None):
+        """Cross-section over a memory-mapped Universe"""
+        fields = universe.matrices(tickers=tickers, start=start, end=end)
+        matrices = {FIELD_COLUMNS[name]: np.asarray(values) for name, values in fields.items()}
+        dates = universe.date_index[universe.date_slice(start, end)]
+        return cls(tickers or universe.tickers, dates, matrices)
+
+    def frame(self, column):
+        """Packed column as a DataFrame (bars as rows, one column per ticker)"""
+        return pd.DataFrame(self.values[column].T)
+
+    def compute(self, rsi_period=14, macd_fast=12, macd_slow=26, macd_signal=9, atr_period=14,
+                bb_period=20, bb_std=2, volume_period=20):
+        """Compute every INDICATOR_COLUMNS column for all tickers"""
+        close = self.values['Close']
+
+        # No tickers or no bars: every indicator is empty
+        if not close.size:
+            for column in INDICATOR_COLUMNS:
+                self.values[column] = np.empty_like(close)
+            return self
+        high = self.values['High']
+        low = self.values['Low']
+
+        # RSI (simple average of gains and losses); the first bar has no change
+        delta = np.empty_like(close)
+        delta[:, 0] = 0.0
+        np.subtract(close[:, 1:], close[:, :-1], out=delta[:, 1:])
+        avg_gain = rolling_mean(np.maximum(delta, 0.0), rsi_period)
+        avg_loss = rolling_mean(np.maximum(-delta, 0.0), rsi_period)
+        avg_gain[:, :rsi_period] = np.nan
+        avg_loss[:, :rsi_period] = np.nan
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+        rsi[avg_loss == 0] = 100.0
+        self.values['RSI'] = rsi
+
+        # MACD
+        macd = ema_rows(close, macd_fast)
+        macd -= ema_rows(close, macd_slow)
+        signal = ema_rows(macd, macd_signal)
+        self.values['MACD'] = macd
+        self.values['MACD_Signal'] = signal
+        self.values['MACD_Hist'] = macd - signal
+
+        # ATR (rolling mean of the true range; the first bar has only high - low)
+        true_range = high - low
+        gap = np.abs(high[:, 1:] - close[:, :-1])
+        np.maximum(true_range[:, 1:], gap, out=true_range[:, 1:])
+        np.abs(low[:, 1:] - close[:, :-1], out=gap)
+        np.maximum(true_range[:, 1:], gap, out=true_range[:, 1:])
+        self.values['ATR'] = rolling_mean(true_range, atr_period)
+
+        # Bollinger Bands
+        bands = rolling.rolling_stats(close, (bb_period,), ['mean', 'std'])[bb_period]
+        middle = bands['mean']
+        width = bands['std']
+        width *= bb_std
+        self.values['BB_Upper'] = middle + width
+        self.values['BB_Mid'] = middle
+        self.values['BB_Lower'] = middle - width
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.values['Bandwidth'] = 2 * width / middle
+
+        self.values['Volume_MA'] = rolling_mean(self.values['Volume'], volume_period)
+
+        # Windows that run into the NaN padding are meaningless; keep padding cells empty
+        padding = ~self.filled
+        for column in INDICATOR_COLUMNS:
+            np.putmask(self.values[column], padding, np.nan)
+
+        return self
+
+    def last(self, column, offset=0):
+        """
+        Value of a column on each ticker's latest bar (offset=1 for the bar before)
+
+        Returns:
+            float array[tickers] (NaN if the ticker has fewer bars)
+        """
+        position = self.counts - 1 - offset
+        result = self.values[column][self.rows, np.maximum(position, 0)]
+        return np.where(position >= 0, result, np.nan)
+
+    def tail(self, column, length):
+        """Last length values of each ticker, float array[tickers, length] (NaN padded on the left)"""
+        positions = self.counts[:, None] - length + np.arange(length)
+        result = self.values[column][self.rows[:, None], np.maximum(positions, 0)]
+        return np.where(positions >= 0, result, np.nan)
+
+    def new_highs(self, period=5, column='High'):
+        """
+        Bars whose value is the highest of the last period bars (ties count)
+
+        Returns:
+            bool array[tickers, width] in packed form
+        """
+        positions = rolling.rolling_argmax(self.values[column], period)
+        return positions == np.arange(positions.shape[1])
+
+    def patterns(self, breakout_period=20):
+        """
+        Candlestick/chart patterns of every ticker (see patterns.py)
+
+        Returns:
+            Dictionary of pattern name -> bool array[tickers, width] in packed form
+        """
+        return patterns.scan_patterns(
+            self.values['Open'], self.values['High'], self.values['Low'], self.values['Close'], breakout_period
+        )
+
+    def last_dates(self):
+        """Date of each ticker's latest bar (NaT if it has none)"""
+        if not self.order.shape[1]:
+            return pd.DatetimeIndex([pd.NaT] * len(self.rows))
+        dates = self.dates[self.order[self.rows, np.maximum(self.counts - 1, 0)]]
+        return dates.where(self.counts > 0)
+
+    def aligned(self, column):
+        """Column scattered back onto the shared date axis, array[tickers, bars]"""
+        return unpack(self.values[column], self.order, self.filled, self.bars)
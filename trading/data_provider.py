@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Pluggable Market Data Providers
+Live Yahoo Finance access, recording to local files, and offline replay
+
+Providers:
+1. YahooProvider - Live data through yfinance
+2. RecordingProvider - Wraps another provider and saves every response
+3. ReplayProvider - Serves recorded responses from memory, no network
+
+Select the process-wide provider with environment variables:
+    OPENCLAW_DATA_MODE=live|record|replay   (default: live)
+    OPENCLAW_RECORD_DIR=data/recordings      (recording directory)
+
+Example:
+    OPENCLAW_DATA_MODE=record python3 trading/stock_analysis.py
+    OPENCLAW_DATA_MODE=replay python3 trading/stock_analysis.py
+"""
+
+import pandas as pd
+from datetime import datetime
+import hashlib
+import os
+import pickle
+import threading
+
+# Request arguments that do not change the response
+IGNORED_ARGUMENTS = {'timeout'}
+
+
+class ReplayMissError(LookupError):
+    """Raised when a request was never recorded"""
+
+
+def normalize_request(method, ticker, kwargs):
+    """Canonical (method, ticker, arguments) tuple for a request"""
+    arguments = []
+    for name, value in sorted(kwargs.items()):
+        if name in IGNORED_ARGUMENTS or value is None:
+            continue
+        if isinstance(value, (datetime, pd.Timestamp)):
+            value = pd.Timestamp(value).strftime('%Y-%m-%d')
+        arguments.append((name, str(value)))
+    return (method, ticker, tuple(arguments))
+
+
+def request_digest(request):
+    """File name stem for a recorded request"""
+    return hashlib.sha1(repr(request).encode()).hexdigest()
+
+
+class DataProvider:
+    """Interface for market data sources"""
+
+    # Whether responses may be served from on-disk caches instead of the provider
+    cacheable = True
+
+    # Whether requests go over the network (rate limited and retried)
+    remote = True
+
+    def history(self, ticker, **kwargs):
+        """Price history, same arguments and result as yf.Ticker(ticker).history()"""
+        raise NotImplementedError
+
+    def fundamentals(self, ticker, part):
+        """Fundamentals part: 'info', 'financials', 'balance_sheet' or 'cashflow'"""
+        raise NotImplementedError
+
+
+class YahooProvider(DataProvider):
+    """Live Yahoo Finance data"""
+
+    def history(self, ticker, **kwargs):
+        import yfinance as yf
+        return yf.Ticker(ticker).history(**kwargs)
+
+    def fundamentals(self, ticker, part):
+        import yfinance as yf
+        return getattr(yf.Ticker(ticker), part)
+
+
+class RecordingProvider(DataProvider):
+    """Records every response of another provider to local files"""
+
+    cacheable = False
+
+    def __init__(self, inner, record_dir="data/recordings"):
+        self.inner = inner
+        self.record_dir = record_dir
+        os.makedirs(self.record_dir, exist_ok=True)
+
+    def _record(self, request, data):
+        path = os.path.join(self.record_dir, f"{request_digest(request)}.pkl")
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump({'request': request, 'data': data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+        return data
+
+    def history(self, ticker, **kwargs):
+        request = normalize_request('history', ticker, kwargs)
+        return self._record(request, self.inner.history(ticker, **kwargs))
+
+    def fundamentals(self, ticker, part):
+        request = normalize_request('fundamentals', ticker, {'part': part})
+        return self._record(request, self.inner.fundamentals(ticker, part))
+
+
+class ReplayProvider(DataProvider):
+    """Serves recorded responses without network access"""
+
+    cacheable = False
+    remote = False
+
+    def __init__(self, record_dir="data/recordings", preload=True):
+        """
+        Args:
+            record_dir: Directory written by RecordingProvider
+            preload: Load every recording into memory up front
+        """
+        self.record_dir = record_dir
+        self.memory = {}
+        self.lock = threading.Lock()
+
+        if preload and os.path.isdir(record_dir):
+            for name in os.listdir(record_dir):
+                if name.endswith('.pkl'):
+                    with open(os.path.join(record_dir, name), 'rb') as f:
+                        entry = pickle.load(f)
+                    self.memory[entry['request']] = entry['data']
+
+    def _replay(self, request):
+        with self.lock:
+            if request in self.memory:
+                data = self.memory[request]
+                return data.copy() if hasattr(data, 'copy') else data
+
+        path = os.path.join(self.record_dir, f"{request_digest(request)}.pkl")
+        if not os.path.exists(path):
+            raise ReplayMissError(f"No recording for {request}")
+
+        with open(path, 'rb') as f:
+            data = pickle.load(f)['data']
+
+        with self.lock:
+            self.memory[request] = data
+        return data.copy() if hasattr(data, 'copy') else data
+
+    def history(self, ticker, **kwargs):
+        return self._replay(normalize_request('history', ticker, kwargs))
+
+    def fundamentals(self, ticker, part):
+        return self._replay(normalize_request('fundamentals', ticker, {'part': part}))
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def provider_from_env():
+    """Build the provider selected by OPENCLAW_DATA_MODE / OPENCLAW_RECORD_DIR"""
+    mode = os.environ.get('OPENCLAW_DATA_MODE', 'live').lower()
+    record_dir = os.environ.get('OPENCLAW_RECORD_DIR', 'data/recordings')
+
+    if mode == 'live':
+        return YahooProvider()
+    if mode == 'record':
+        return RecordingProvider(YahooProvider(), record_dir)
+    if mode == 'replay':
+        return ReplayProvider(record_dir)
+
+    raise ValueError(f"Unknown OPENCLAW_DATA_MODE: {mode}")
+
+
+def get_provider():
+    """Process-wide data provider"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = provider_from_env()
+        return _provider
+
+
+def set_provider(provider):
+    """Replace the process-wide data provider"""
+    global _provider
+    with _provider_lock:
+        _provider = provider
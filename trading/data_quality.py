@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Ingest-Time Data Quality Checks
+Vectorized validation over the whole [tickers x bars] universe
+
+Checks:
+1. Gaps - Missing bars on IDX trading sessions while a ticker is listed
+2. Splits - Close-to-close jumps matching a split ratio (unadjusted split)
+3. Spikes - Moves beyond the IDX auto-rejection limit that are not splits
+4. Stale bars - OHLCV repeated exactly from the previous bar
+5. Invalid bars - High below Low, or Open/Close outside the High-Low range
+
+The trading calendar is derived from the universe itself: a weekday is a
+session when at least half of the listed tickers traded on it.
+
+Issues are graded: a ticker is excluded (issues) for unadjusted splits or
+invalid bars in its last RECENT_BARS bars, or for too many of them overall;
+older isolated ones, which only distort a short stretch of history, are
+recorded as warnings and the ticker stays usable.
+
+Results are stored as a per-ticker quality index (JSON), so downstream
+jobs can filter tickers with a lookup instead of scanning data again.
+"""
+
+import numpy as np
+from datetime import datetime
+import json
+import os
+
+# Largest legitimate daily move on IDX (upper auto-rejection band)
+MAX_DAILY_MOVE = 0.35
+
+SPLIT_FACTORS = np.array([2, 3, 4, 5, 8, 10, 20, 25, 50, 100], dtype=np.float64)
+SPLIT_TOLERANCE = 0.05
+
+# Thresholds for a ticker to be considered usable
+MAX_GAP_RATIO = 0.05
+MAX_STALE_RATIO = 0.05
+MAX_SPIKES = 3
+MAX_SPLITS = 1
+MAX_INVALID_RATIO = 0.01
+
+# Bars at the end of each ticker's history where any split / invalid bar excludes it
+RECENT_BARS = 60
+
+
+def trading_calendar(valid, listed, weekdays, min_share=0.5):
+    """
+    Boolean session mask for the shared date axis
+
+    Args:
+        valid: bool[tickers, bars] - ticker has a bar
+        listed: bool[tickers, bars] - ticker is listed (between first and last bar)
+        weekdays: int[bars] - weekday of each date (Monday=0)
+        min_share: Minimum share of listed tickers that must trade on a session
+
+    Returns:
+        bool[bars]
+    """
+    traded = valid.sum(axis=0)
+    listed_count = np.maximum(listed.sum(axis=0), 1)
+    return (weekdays < 5) & (traded / listed_count >= min_share)
+
+
+def listing_mask(valid):
+    """bool[tickers, bars] that is True between each ticker's first and last bar"""
+    bars = valid.shape[1]
+    has_data = valid.any(axis=1)
+    first = np.where(has_data, valid.argmax(axis=1), bars)
+    last = np.where(has_data, bars - 1 - valid[:, ::-1].argmax(axis=1), -1)
+    columns = np.arange(bars)
+    return (columns >= first[:, None]) & (columns <= last[:, None])
+
+
+def previous_valid(values, valid):
+    """Value of the previous valid bar at every position (NaN if none)"""
+    bars = values.shape[1]
+    positions = np.where(valid, np.arange(bars), -1)
+    last_seen = np.maximum.accumulate(positions, axis=1)
+
+    # Shift by one bar so each position sees the bar before it
+    previous = np.full_like(last_seen, -1)
+    previous[:, 1:] = last_seen[:, :-1]
+
+    rows = np.arange(values.shape[0])[:, None]
+    result = values[rows, np.maximum(previous, 0)]
+    return np.where(previous >= 0, result, np.nan)
+
+
+def recent_mask(valid, recent_bars=RECENT_BARS):
+    """bool[tickers, bars] that is True on each ticker's last recent_bars valid bars"""
+    bars_from_end = np.cumsum(valid[:, ::-1], axis=1)[:, ::-1]
+    return valid & (bars_from_end <= recent_bars)
+
+
+def assess_matrices(dates, open_, high, low, close, volume):
+    """
+    Run every check over dense [tickers x bars] arrays
+
+    Returns:
+        Dictionary of check name -> bool[tickers, bars] flags, plus
+        'valid', 'listed', 'recent' and 'calendar' masks
+    """
+    valid = ~np.isnan(close)
+    listed = listing_mask(valid)
+    recent = recent_mask(valid)
+    weekdays = (np.asarray(dates).astype('datetime64[D]').view('int64') + 3) % 7
+    calendar = trading_calendar(valid, listed, weekdays)
+
+    gaps = listed & calendar[None, :] & ~valid
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prev_close = previous_valid(close, valid)
+        ratio = close / prev_close
+        jump = np.where(ratio >= 1, ratio, 1 / ratio)
+
+        nearest = SPLIT_FACTORS[np.abs(jump[..., None] - SPLIT_FACTORS).argmin(axis=-1)]
+        splits = valid & (np.abs(jump / nearest - 1) <= SPLIT_TOLERANCE)
+        spikes = valid & ~splits & (jump > 1 + MAX_DAILY_MOVE)
+
+    stale = valid.copy()
+    for values in (open_, high, low, close, volume):
+        stale &= values == previous_valid(values, valid)
+
+    invalid = valid & (
+        (high < low) |
+        (open_ > high) | (open_ < low) |
+        (close > high) | (close < low)
+    )
+
+    return {
+        'valid': valid,
+        'listed': listed,
+        'recent': recent,
+        'calendar': calendar,
+        'gaps': gaps,
+        'splits': splits,
+        'spikes': spikes,
+        'stale': stale,
+        'invalid': invalid,
+    }
+
+
+def assess_universe(universe):
+    """
+    Build a quality index for every ticker in a Universe
+
+    Args:
+        universe: Universe (memory-mapped OHLCV arrays)
+
+    Returns:
+        QualityIndex
+    """
+    fields = universe.matrices()
+    flags = assess_matrices(
+        universe.dates, fields['open'], fields['high'], fields['low'], fields['close'], fields['volume']
+    )
+
+    bars = flags['valid'].sum(axis=1)
+    sessions = (flags['listed'] & flags['calendar'][None, :]).sum(axis=1)
+    counts = {name: flags[name].sum(axis=1) for name in ('gaps', 'splits', 'spikes', 'stale', 'invalid')}
+    recent_splits = (flags['splits'] & flags['recent']).sum(axis=1)
+    recent_invalid = (flags['invalid'] & flags['recent']).sum(axis=1)
+    dates = np.asarray(universe.dates)
+
+    records = {}
+    for row, ticker in enumerate(universe.tickers):
+        if bars[row] == 0:
+            continue
+
+        listed_dates = dates[flags['listed'][row]]
+        gap_ratio = counts['gaps'][row] / max(sessions[row], 1)
+        stale_ratio = counts['stale'][row] / bars[row]
+
+        invalid_ratio = counts['invalid'][row] / bars[row]
+
+        # Issues exclude the ticker; warnings are old, isolated problems
+        issues = []
+        warnings = []
+        if recent_splits[row] or counts['splits'][row] > MAX_SPLITS:
+            issues.append('unadjusted_split')
+        elif counts['splits'][row]:
+            warnings.append('unadjusted_split')
+        if gap_ratio > MAX_GAP_RATIO:
+            issues.append('gaps')
+        if counts['spikes'][row] > MAX_SPIKES:
+            issues.append('spikes')
+        if stale_ratio > MAX_STALE_RATIO:
+            issues.append('stale')
+        if recent_invalid[row] or invalid_ratio > MAX_INVALID_RATIO:
+            issues.append('invalid_bars')
+        elif counts['invalid'][row]:
+            warnings.append('invalid_bars')
+
+        records[ticker] = {
+            'bars': int(bars[row]),
+            'first_date': str(listed_dates[0]),
+            'last_date': str(listed_dates[-1]),
+            'gaps': int(counts['gaps'][row]),
+            'gap_ratio': round(float(gap_ratio), 4),
+            'splits': int(counts['splits'][row]),
+            'spikes': int(counts['spikes'][row]),
+            'stale': int(counts['stale'][row]),
+            'stale_ratio': round(float(stale_ratio), 4),
+            'invalid': int(counts['invalid'][row]),
+            'recent_splits': int(recent_splits[row]),
+            'recent_invalid': int(recent_invalid[row]),
+            'issues': issues,
+            'warnings': warnings,
+            'ok': not issues,
+        }
+
+    return QualityIndex(records)
+
+
+class QualityIndex:
+    """Per-ticker data quality lookup"""
+
+    def __init__(self, records=None, created=None):
+        self.records = records or {}
+        self.created = created or datetime.now().isoformat(timespec='seconds')
+
+    @classmethod
+    def load(cls, path="data/quality_index.json"):
+        """Load a saved quality index (empty index if the file does not exist)"""
+        if not os.path.exists(path):
+            return cls()
+
+        with open(path) as f:
+            data = json.load(f)
+
+        return cls(data['tickers'], data.get('created'))
+
+    def save(self, path="data/quality_index.json"):
+        """Save the quality index as JSON"""
+        with open(path, 'w') as f:
+            json.dump({'created': self.created, 'tickers': self.records}, f, indent=2)
+
+    def get(self, ticker):
+        """Quality record for a ticker (or None)"""
+        return self.records.get(ticker)
+
+    def is_ok(self, ticker, unknown_ok=True):
+        """Check whether a ticker has no excluding issue (unknown tickers pass by default)"""
+        record = self.records.get(ticker)
+        if record is None:
+            return unknown_ok
+        return record['ok']
+
+    def filter(self, tickers, unknown_ok=True):
+        """Keep only tickers without an excluding issue"""
+        return [ticker for ticker in tickers if self.is_ok(ticker, unknown_ok)]
+
+    def flagged(self):
+        """Dictionary of ticker -> issues for excluded tickers"""
+        return {ticker: record['issues'] for ticker, record in self.records.items() if not record['ok']}
+
+    def warned(self):
+        """Dictionary of ticker -> warnings for usable tickers with minor issues"""
+        return {
+            ticker: record['warnings'] for ticker, record in self.records.items()
+            if record['ok'] and record.get('warnings')
+        }
@@ -32,7 +32,6 @@ Supported Stocks:
 Stocks covered: All major Indonesian banking stocks listed on IDX
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -40,12 +39,20 @@ import os
 import sys
 import json
 
+from ohlcv_store import OHLCVStore
+from fetch_engine import FetchEngine, report_errors
+from data_provider import get_provider
+from universe import build_universe
+from data_quality import assess_universe
+
 class StockDataDownloader:
     """Downloads and manages historical stock data"""
 
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", max_workers=8):
         self.data_dir = data_dir
         self.ensure_directory()
+        self.store = OHLCVStore(os.path.join(data_dir, "store"))
+        self.engine = FetchEngine(max_workers=max_workers)
 
     def ensure_directory(self):
         """Ensure data directory exists"""
@@ -53,88 +60,228 @@ class StockDataDownloader:
             os.makedirs(self.data_dir)
             print(f"✅ Created data directory: {self.data_dir}")
 
-    def download_stock_yahoo(self, ticker, period_start, period_end="2026-02-12"):
+    def fetch_stock_yahoo(self, ticker, period_start, period_end):
+        """
+        Fetch and clean stock data from Yahoo Finance without saving it
+
+        Args:
+            ticker: Stock ticker (e.g., "BMRI.JK")
+            period_start: Start date (inclusive)
+            period_end: End date (exclusive)
+
+        Returns:
+            DataFrame with OHLCV data or None
+        """
+        # Get historical data (rate limited, retried with backoff; raises if no bars come back)
+        hist = self.engine.history(ticker, start=period_start, end=period_end)
+
+        # Reset index
+        hist.index = hist.index.tz_localize(None).tz_localize('Asia/Jakarta')
+        hist.index = hist.index.normalize()
+
+        # Ensure OHLCV columns exist
+        required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+        missing_columns = [col for col in required_columns if col not in hist.columns]
+
+        if missing_columns:
+            print(f"   ⚠️  Missing columns: {missing_columns}")
+            return None
+
+        # Clean column names
+        hist = hist[required_columns]
+
+        # Remove NaN values
+        hist = hist.dropna()
+
+        # Remove zero volume rows (possible data errors)
+        hist = hist[hist['Volume'] > 0]
+
+        return hist if not hist.empty else None
+
+    def download_stock_yahoo(self, ticker, period_start, period_end=None):
         """
         Download stock data from Yahoo Finance
 
         Args:
             ticker: Stock ticker (e.g., "BMRI.JK")
             period_start: Start date (e.g., "2015-01-01")
-            period_end: End date (default: today)
+            period_end: End date (default: None, open-ended up to the latest bar)
 
         Returns:
-            DataFrame with OHLCV data
+            DataFrame with OHLCV data (None if no valid bars remain after cleaning)
+
+        Raises:
+            Download errors (e.g., EmptyHistoryError), so FetchEngine.map reports them per ticker
         """
         print(f"📥 Downloading {ticker} from Yahoo Finance...")
-        print(f"   Period: {period_start} to {period_end}")
+        print(f"   Period: {period_start} to {period_end or 'latest'}")
 
-        try:
-            stock = yf.Ticker(ticker)
+        hist = self.fetch_stock_yahoo(ticker, period_start, period_end)
+
+        if hist is None:
+            print(f"   ❌ No data found for {ticker}")
+            return None
+
+        print(f"   ✅ Downloaded {len(hist)} days of data")
+        print(f"   Date range: {hist.index[0]} to {hist.index[-1]}")
+        print(f"   Volume range: {hist['Volume'].min():,} to {hist['Volume'].max():,}")
+
+        # Save to columnar store (replaces any previously stored history)
+        self.store.replace(ticker, hist)
+        print(f"   ✅ Saved to store: {self.store.root}")
+
+        return hist
+
+    def sync_stock(self, ticker, period_start):
+        """
+        Incrementally update a stored stock with bars after its last stored date
+
+        The request starts at an overlap bar that is already stored. If the
+        overlap bar no longer matches (split, dividend adjustment or restated
+        data), the full history is downloaded again.
 
-            # Get historical data
-            hist = stock.history(start=period_start, end=period_end)
+        Args:
+            ticker: Stock ticker (e.g., "BMRI.JK")
+            period_start: Start date used when a full download is needed
 
-            if hist.empty:
-                print(f"   ❌ No data found for {ticker}")
-                return None
+        Returns:
+            DataFrame with the full stored OHLCV history
+        """
+        # Open-ended requests (no end date) keep replay recordings and cache
+        # keys stable across days; the provider returns up to the latest bar
+        period_end = None
+        last_date = self.store.last_date(ticker)
 
-            # Reset index
-            hist.index = hist.index.tz_localize(None).tz_localize('Asia/Jakarta')
-            hist.index = hist.index.normalize()
+        if last_date is None:
+            print(f"   ℹ️  No stored data for {ticker}, running full download")
+            return self.download_stock_yahoo(ticker, period_start, period_end)
 
-            # Ensure OHLCV columns exist
-            required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-            missing_columns = [col for col in required_columns if col not in hist.columns]
+        # Verify against the second-to-last stored bar: the last one may have
+        # been saved during a trading session and is refreshed anyway
+        stored_tail = self.store.read(ticker, start=last_date - timedelta(days=14))
+        overlap_date = stored_tail.index[-2] if len(stored_tail) >= 2 else stored_tail.index[-1]
 
-            if missing_columns:
-                print(f"   ⚠️  Missing columns: {missing_columns}")
-                return None
+        print(f"🔄 Syncing {ticker} from {overlap_date.strftime('%Y-%m-%d')}")
 
-            # Clean column names
-            hist = hist[required_columns]
+        # Errors propagate to FetchEngine.map (stored data is left unchanged)
+        delta = self.fetch_stock_yahoo(ticker, overlap_date.strftime('%Y-%m-%d'), period_end)
 
-            # Remove NaN values
-            hist = hist.dropna()
+        if delta is None:
+            print(f"   ⚠️  No bars returned, keeping stored data")
+            return self.store.read(ticker)
 
-            # Remove zero volume rows (possible data errors)
-            hist = hist[hist['Volume'] > 0]
+        if not self.overlap_matches(stored_tail.loc[[overlap_date]], delta):
+            print(f"   ⚠️  Overlap bar changed (split or restatement), re-downloading full history")
+            return self.download_stock_yahoo(ticker, period_start, period_end)
 
-            print(f"   ✅ Downloaded {len(hist)} days of data")
-            print(f"   Date range: {hist.index[0]} to {hist.index[-1]}")
-            print(f"   Volume range: {hist['Volume'].min():,} to {hist['Volume'].max():,}")
+        new_bars = delta[delta.index > last_date]
+        self.store.write(ticker, delta)
 
-            # Save to CSV
-            csv_file = f"{self.data_dir}/{ticker.replace('.', '_')}_{datetime.now().strftime('%Y%m%d')}.csv"
-            hist.to_csv(csv_file)
-            print(f"   ✅ Saved to: {csv_file}")
+        print(f"   ✅ {len(new_bars)} new bars (last stored: {last_date.strftime('%Y-%m-%d')})")
 
-            return hist
+        return self.store.read(ticker)
 
-        except Exception as e:
-            print(f"   ❌ Error downloading {ticker}: {str(e)}")
-            return None
+    def overlap_matches(self, stored, fetched, rtol=1e-4):
+        """
+        Check that stored overlap bars match freshly fetched bars
+
+        Args:
+            stored: Stored OHLCV bars
+            fetched: Newly fetched OHLCV bars
 
-    def download_multiple_stocks(self, tickers, period_start):
+        Returns:
+            True if every stored bar is present in fetched with the same prices
+        """
+        if not stored.index.isin(fetched.index).all():
+            return False
+
+        price_columns = ['Open', 'High', 'Low', 'Close']
+        return np.allclose(
+            stored[price_columns].to_numpy(),
+            fetched.loc[stored.index, price_columns].to_numpy(),
+            rtol=rtol
+        )
+
+    def download_multiple_stocks(self, tickers, period_start, incremental=False):
         """
         Download multiple stocks
 
         Args:
             tickers: List of stock tickers
             period_start: Start date for historical data
+            incremental: Only fetch bars after the last stored date
 
         Returns:
             Dictionary of DataFrames
         """
-        results = {}
+        mode = "Syncing" if incremental else "Downloading"
+        print(f"\n📥 {mode} {len(tickers)} stocks from {period_start} to {datetime.now().strftime('%Y-%m-%d')}")
 
-        print(f"\n📥 Downloading {len(tickers)} stocks from {period_start} to {datetime.now().strftime('%Y-%m-%d')}")
+        def job(ticker):
+            if incremental:
+                return self.sync_stock(ticker, period_start)
+            return self.download_stock_yahoo(ticker, period_start)
 
-        for i, ticker in enumerate(tickers, 1):
-            print(f"\n[{i}/{len(tickers)}] {ticker}")
-            data = self.download_stock_yahoo(ticker, period_start)
-            results[ticker] = data
+        # Tickers are stored in separate directories, so they can run concurrently
+        fetched = self.engine.map(tickers, job)
+        report_errors(fetched)
 
-        return results
+        return {ticker: result.data for ticker, result in fetched.items()}
+
+    def load_stock(self, ticker, start=None, end=None, columns=None):
+        """
+        Load stored stock data without downloading
+
+        Args:
+            ticker: Stock ticker
+            start: First date to include (optional)
+            end: Last date to include (optional)
+            columns: List of OHLCV columns (default: all)
+
+        Returns:
+            DataFrame with OHLCV data or None if the ticker is not stored
+        """
+        return self.store.read(ticker, start=start, end=end, columns=columns)
+
+    def build_universe(self, tickers=None, start=None):
+        """
+        Rebuild the memory-mapped universe from the store
+
+        Args:
+            tickers: List of stock tickers (default: every stored ticker)
+            start: First date to include (optional)
+
+        Returns:
+            Universe opened read-only
+        """
+        universe_dir = os.path.join(self.data_dir, "universe")
+        universe = build_universe(self.store, universe_dir, tickers=tickers, start=start)
+        print(f"\n✅ Universe saved to: {universe_dir} ({universe.shape[0]} tickers x {universe.shape[1]} bars)")
+        return universe
+
+    def check_quality(self, universe):
+        """
+        Run the data quality checks once over the universe and save the index
+
+        Args:
+            universe: Universe built from the store
+
+        Returns:
+            QualityIndex
+        """
+        quality = assess_universe(universe)
+        quality_file = os.path.join(self.data_dir, "quality_index.json")
+        quality.save(quality_file)
+
+        flagged = quality.flagged()
+        print(f"\n🩺 Data quality: {len(quality.records) - len(flagged)}/{len(quality.records)} tickers OK")
+        for ticker, issues in flagged.items():
+            print(f"   ⚠️  {ticker}: {', '.join(issues)}")
+        for ticker, warnings in quality.warned().items():
+            print(f"   ℹ️  {ticker}: {', '.join(warnings)} (older, kept)")
+        print(f"   ✅ Quality index saved to: {quality_file}")
+
+        return quality
 
     def get_latest_price(self, ticker):
         """
@@ -147,8 +294,7 @@ class StockDataDownloader:
             Latest price or None
         """
         try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period="1d")
+            data = get_provider().history(ticker, period="1d")
             if not data.empty:
                 return {
                     'ticker': ticker,
@@ -234,12 +380,18 @@ def main():
     # Initialize downloader
     downloader = StockDataDownloader()
 
-    # Download all stocks
-    results = downloader.download_multiple_stocks(banking_stocks, period_start)
+    # Download all stocks (only new bars for tickers already in the store)
+    results = downloader.download_multiple_stocks(banking_stocks, period_start, incremental=True)
 
     # Save summary
     downloader.save_summary(results)
 
+    # Rebuild the memory-mapped universe for multi-ticker studies
+    universe = downloader.build_universe()
+
+    # Validate once at ingest so downstream jobs only need a lookup
+    downloader.check_quality(universe)
+
     # Get latest prices
     print(f"\n💰 Latest Prices:")
 
@@ -252,6 +404,7 @@ def main():
     print("✅ Data Download Complete!")
     print("=" * 60)
     print(f"\n📁 Data Directory: {downloader.data_dir}")
+    print(f"📦 Store Directory: {downloader.store.root}")
     print(f"📄 Summary File: {downloader.data_dir}/summary.json")
     print(f"\n💡 Next Steps:")
     print(f"   1. Review downloaded data")
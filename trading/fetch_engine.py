@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Concurrent Fetch Engine for Market Data
+Downloads many tickers through a bounded worker pool
+
+Components:
+1. TokenBucket - Shared rate limiter across all worker threads
+2. FetchEngine.call - One rate-limited request with exponential backoff + jitter
+3. FetchEngine.map - Run a per-ticker job on the worker pool with per-ticker error reporting
+4. FetchEngine.history - One provider history request (rate limited unless replayed)
+5. FetchEngine.fetch_history - Concurrent price history for a ticker list
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import namedtuple
+import random
+import threading
+import time
+
+from history_cache import get_cache
+from data_provider import get_provider
+
+FetchResult = namedtuple('FetchResult', ['ticker', 'data', 'error', 'elapsed'])
+
+
+class EmptyHistoryError(RuntimeError):
+    """Raised (and retried) when a history request returns no bars"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate: Tokens added per second (sustained requests per second)
+            capacity: Maximum burst size (default: rate)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class FetchEngine:
+    """Bounded worker pool with rate limiting and retry for multi-ticker downloads"""
+
+    def __init__(self, max_workers=8, rate=4.0, burst=8, max_retries=3, base_delay=1.0, max_delay=30.0, verbose=True):
+        """
+        Args:
+            max_workers: Number of concurrent worker threads
+            rate: Maximum sustained requests per second (shared by all workers)
+            burst: Maximum burst of requests
+            max_retries: Attempts per request before giving up
+            base_delay: First backoff delay in seconds
+            max_delay: Upper bound for a single backoff delay
+            verbose: Print per-ticker progress
+        """
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.verbose = verbose
+
+    def backoff_delay(self, attempt):
+        """Exponential backoff with jitter for the given (1-based) attempt"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(delay / 2, delay)
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Run one network request with rate limiting and retry
+
+        Returns:
+            The result of fn(*args, **kwargs)
+
+        Raises:
+            The last exception if every attempt fails
+        """
+        for attempt in range(1, self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff_delay(attempt))
+
+    def history(self, ticker, **history_kwargs):
+        """
+        Uncached price history from the active data provider
+
+        yfinance reports failed requests as an empty DataFrame instead of an
+        exception, so an empty result raises EmptyHistoryError, which the
+        retry in call() treats like any other failed request.
+
+        Raises:
+            EmptyHistoryError if the provider returned no bars (after retries)
+        """
+        provider = get_provider()
+
+        def request():
+            hist = provider.history(ticker, **history_kwargs)
+            if hist is None or hist.empty:
+                raise EmptyHistoryError(f"No price history returned for {ticker}")
+            return hist
+
+        if not provider.remote:
+            return request()
+        return self.call(request)
+
+    def _run_job(self, ticker, job):
+        start = time.monotonic()
+        try:
+            return FetchResult(ticker, job(ticker), None, time.monotonic() - start)
+        except Exception as e:
+            return FetchResult(ticker, None, e, time.monotonic() - start)
+
+    def map(self, tickers, job):
+        """
+        Run job(ticker) for every ticker on the worker pool
+
+        Args:
+            tickers: List of stock tickers (duplicates are removed)
+            job: Callable taking a ticker and returning its data
+
+        Returns:
+            Dictionary of ticker -> FetchResult, in input order
+        """
+        tickers = list(dict.fromkeys(tickers))
+        results = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._run_job, ticker, job) for ticker in tickers]
+
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results[result.ticker] = result
+
+                if self.verbose:
+                    status = "✅" if result.error is None else f"❌ {result.error}"
+                    print(f"   [{done}/{len(tickers)}] {result.ticker} {status} ({result.elapsed:.1f}s)")
+
+        return {ticker: results[ticker] for ticker in tickers}
+
+    def fetch_history(self, tickers, **history_kwargs):
+        """
+        Download price history for many tickers concurrently
+
+        Requests go through the process-wide history cache, so tickers that
+        were fetched recently are served without a network call (and without
+        using a rate limiter token).
+
+        Args:
+            tickers: List of stock tickers
+            **history_kwargs: Arguments for the provider history call (start, end, period, interval, ...)
+
+        Returns:
+            Dictionary of ticker -> FetchResult (data is the history DataFrame)
+        """
+        def job(ticker):
+            return get_cache().history(ticker, fetch_fn=self.history, **history_kwargs)
+
+        return self.map(tickers, job)
+
+
+def report_errors(results):
+    """Print a summary of failed tickers from a FetchEngine result dictionary"""
+    failed = {ticker: result.error for ticker, result in results.items() if result.error is not None}
+
+    if failed:
+        print(f"\n⚠️  {len(failed)}/{len(results)} tickers failed:")
+        for ticker, error in failed.items():
+            print(f"   {ticker}: {error}")
+
+    return failed
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+On-Disk Fundamentals Cache
+Stores ticker.info and financial statements with their fetch date
+
+Layout:
+    {cache_dir}/{TICKER}/meta.json            - fetch dates + next earnings date
+    {cache_dir}/{TICKER}/info.json            - ticker.info
+    {cache_dir}/{TICKER}/financials.pkl       - ticker.financials
+    {cache_dir}/{TICKER}/balance_sheet.pkl    - ticker.balance_sheet
+    {cache_dir}/{TICKER}/cashflow.pkl         - ticker.cashflow
+
+A snapshot is refreshed when it is older than max_age_days, or when an
+earnings date recorded at fetch time has passed since. Each part is only
+read (or fetched) the first time a metric accesses it.
+"""
+
+from datetime import datetime, timedelta
+import json
+import os
+import pickle
+
+from data_provider import get_provider
+
+STATEMENTS = ['financials', 'balance_sheet', 'cashflow']
+PARTS = ['info'] + STATEMENTS
+
+
+def fetch_part(ticker, part):
+    """Fetch one fundamentals part (info or a statement) from the active data provider"""
+    return get_provider().fundamentals(ticker, part)
+
+
+def earnings_date_from_info(info):
+    """Next/last earnings date announced in ticker.info (or None)"""
+    for key in ('earningsTimestamp', 'earningsTimestampStart'):
+        timestamp = (info or {}).get(key)
+        if timestamp:
+            return datetime.fromtimestamp(timestamp)
+    return None
+
+
+class FundamentalsSnapshot:
+    """Lazily loaded fundamentals of one ticker"""
+
+    def __init__(self, cache, ticker):
+        self.cache = cache
+        self.ticker = ticker
+
+    @property
+    def info(self):
+        return self.cache.load(self.ticker, 'info')
+
+    @property
+    def financials(self):
+        return self.cache.load(self.ticker, 'financials')
+
+    @property
+    def balance_sheet(self):
+        return self.cache.load(self.ticker, 'balance_sheet')
+
+    @property
+    def cashflow(self):
+        return self.cache.load(self.ticker, 'cashflow')
+
+    @property
+    def fetched_at(self):
+        """Fetch date of each cached part"""
+        return {part: datetime.fromisoformat(value) for part, value in self.cache.meta(self.ticker)['fetched'].items()}
+
+
+class FundamentalsCache:
+    """Fundamentals snapshots cached on disk with a refresh cadence"""
+
+    def __init__(self, cache_dir="data/fundamentals", max_age_days=30, fetch_fn=None, history=None):
+        """
+        Args:
+            cache_dir: Directory for cached snapshots
+            max_age_days: Refresh a part once it is older than this
+            fetch_fn: Callable(ticker, part) used to fetch a part
+            history: FundamentalsHistory that records every fetched info snapshot (optional, written by its flush())
+        """
+        self.cache_dir = cache_dir
+        self.max_age = timedelta(days=max_age_days)
+        self.fetch_fn = fetch_fn or fetch_part
+        # Recording/replay must see every request, so cached files are not reused
+        self.persistent = fetch_fn is not None or get_provider().cacheable
+        self.history = history
+        self.memory = {}
+        self.metas = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _ticker_dir(self, ticker):
+        return os.path.join(self.cache_dir, ticker.replace('.', '_'))
+
+    def _part_path(self, ticker, part):
+        extension = 'json' if part == 'info' else 'pkl'
+        return os.path.join(self._ticker_dir(ticker), f"{part}.{extension}")
+
+    def meta(self, ticker):
+        """Cache metadata (fetch dates, earnings date) for a ticker"""
+        if ticker not in self.metas:
+            meta_file = os.path.join(self._ticker_dir(ticker), 'meta.json')
+            if os.path.exists(meta_file):
+                with open(meta_file) as f:
+                    self.metas[ticker] = json.load(f)
+            else:
+                self.metas[ticker] = {'ticker': ticker, 'fetched': {}, 'earnings_date': None}
+        return self.metas[ticker]
+
+    def _write_meta(self, ticker, meta):
+        self.metas[ticker] = meta
+        with open(os.path.join(self._ticker_dir(ticker), 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    def is_stale(self, ticker, part, now=None):
+        """Check whether a cached part must be refetched"""
+        now = now or datetime.now()
+        meta = self.meta(ticker)
+
+        fetched = meta['fetched'].get(part)
+        if fetched is None or not os.path.exists(self._part_path(ticker, part)):
+            return True
+
+        fetched = datetime.fromisoformat(fetched)
+        if now - fetched > self.max_age:
+            return True
+
+        # New figures are published once the recorded earnings date passes
+        earnings_date = meta.get('earnings_date')
+        if earnings_date and fetched < datetime.fromisoformat(earnings_date) <= now:
+            return True
+
+        return False
+
+    def _fetch(self, ticker, part):
+        data = self.fetch_fn(ticker, part)
+
+        os.makedirs(self._ticker_dir(ticker), exist_ok=True)
+        path = self._part_path(ticker, part)
+
+        if part == 'info':
+            with open(path + '.tmp', 'w') as f:
+                json.dump(data, f, indent=2, default=str)
+        else:
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+        meta = self.meta(ticker)
+        meta['fetched'][part] = datetime.now().isoformat(timespec='seconds')
+        if part == 'info':
+            earnings_date = earnings_date_from_info(data)
+            meta['earnings_date'] = earnings_date.isoformat(timespec='seconds') if earnings_date else None
+            if self.history is not None:
+                self.history.record(ticker, data)
+        self._write_meta(ticker, meta)
+
+        return data
+
+    def _read(self, ticker, part):
+        path = self._part_path(ticker, part)
+        if part == 'info':
+            with open(path) as f:
+                return json.load(f)
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def load(self, ticker, part):
+        """
+        Load one part of a ticker's fundamentals, fetching it if stale
+
+        Args:
+            ticker: Stock ticker
+            part: 'info', 'financials', 'balance_sheet' or 'cashflow'
+
+        Returns:
+            info dictionary or statement DataFrame
+        """
+        if part not in PARTS:
+            raise ValueError(f"Unknown fundamentals part: {part}")
+
+        key = (ticker, part)
+        if key in self.memory and not self.is_stale(ticker, part):
+            return self.memory[key]
+
+        stale = self.is_stale(ticker, part) or not self.persistent
+        data = self._fetch(ticker, part) if stale else self._read(ticker, part)
+        self.memory[key] = data
+
+        return data
+
+    def get(self, ticker):
+        """Lazy fundamentals snapshot for a ticker"""
+        return FundamentalsSnapshot(self, ticker)
+
+    def refresh(self, ticker, parts=None):
+        """Force a refetch of some (default: all) parts"""
+        for part in parts or PARTS:
+            self.memory[(ticker, part)] = self._fetch(ticker, part)
+
+    def load_all(self, tickers, parts=('info',)):
+        """
+        Load parts for many tickers into memory (for universe-wide scoring)
+
+        Returns:
+            Dictionary of ticker -> FundamentalsSnapshot
+        """
+        snapshots = {}
+        for ticker in tickers:
+            for part in parts:
+                self.load(ticker, part)
+            snapshots[ticker] = self.get(ticker)
+        return snapshots
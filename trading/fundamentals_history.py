@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Point-in-Time Fundamentals History
+Versioned store of fundamentals snapshots with vectorized as-of lookups
+
+Layout:
+    {path}/tickers.json     - ticker id -> ticker
+    {path}/ticker_id.npy    - int32 ticker id per observation
+    {path}/date.npy         - datetime64[D] observation date
+    {path}/{field}.npy      - float64 value per observation (NaN if missing)
+
+Observations are kept sorted by (ticker, date), so "value of every field
+for ticker T as of date D" for thousands of (T, D) pairs is a single
+np.searchsorted call without any network access. Keeping that order means
+rewriting the arrays, so record() only queues a snapshot and flush()
+writes every queued snapshot in one append.
+
+SCORE_RULES holds the fundamental quality score thresholds, shared by the
+vectorized score_fundamentals and comprehensive_analysis' per-ticker report.
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+import json
+import os
+
+# ticker.info keys recorded with every snapshot
+FIELDS = [
+    'returnOnEquity',
+    'returnOnAssets',
+    'profitMargins',
+    'operatingMargins',
+    'revenueGrowth',
+    'earningsQuarterlyGrowth',
+    'trailingPE',
+    'priceToBook',
+    'debtToEquity',
+    'currentRatio',
+    'dividendYield',
+    'payoutRatio',
+    'marketCap',
+    'bookValue',
+]
+
+# Fundamental quality score: field -> (higher is better, thresholds best first, points per threshold)
+SCORE_RULES = {
+    'returnOnEquity': (True, [0.15, 0.10, 0.05], [25, 20, 15]),
+    'profitMargins': (True, [0.20, 0.10, 0.05], [15, 10, 5]),
+    'revenueGrowth': (True, [0.15, 0.10, 0.05, 0], [20, 15, 10, 5]),
+    'trailingPE': (False, [15, 25, 40], [15, 10, 5]),
+    'debtToEquity': (False, [0.5, 1.0, 2.0], [20, 15, 10]),
+}
+
+_DATE_OFFSET = 1 << 31
+
+
+def _to_days(dates):
+    """Dates as int64 days since epoch"""
+    index = pd.DatetimeIndex(pd.to_datetime(dates))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype('datetime64[D]').astype(np.int64)
+
+
+def _keys(ticker_ids, days):
+    """Sortable (ticker, date) key"""
+    return ticker_ids.astype(np.int64) * (1 << 32) + (days + _DATE_OFFSET)
+
+
+def _value(info, field):
+    value = (info or {}).get(field)
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class FundamentalsHistory:
+    """Append-only point-in-time store of fundamentals snapshots"""
+
+    def __init__(self, path="data/fundamentals/history"):
+        self.path = path
+        self.pending = []
+        self._load()
+
+    def _load(self):
+        tickers_file = os.path.join(self.path, 'tickers.json')
+
+        if not os.path.exists(tickers_file):
+            self.tickers = []
+            self.ticker_id = np.array([], dtype=np.int32)
+            self.days = np.array([], dtype=np.int64)
+            self.values = {field: np.array([], dtype=np.float64) for field in FIELDS}
+        else:
+            with open(tickers_file) as f:
+                self.tickers = json.load(f)
+            self.ticker_id = np.load(os.path.join(self.path, 'ticker_id.npy'), mmap_mode='r')
+            self.days = np.load(os.path.join(self.path, 'date.npy'), mmap_mode='r').astype(np.int64)
+            self.values = {
+                field: np.load(os.path.join(self.path, f"{field}.npy"), mmap_mode='r') for field in FIELDS
+            }
+
+        self.ticker_index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.keys = _keys(np.asarray(self.ticker_id), np.asarray(self.days))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def append(self, snapshots):
+        """
+        Append fundamentals snapshots
+
+        An observation for the same (ticker, date) replaces the stored one.
+
+        Args:
+            snapshots: List of (ticker, observed_date, info) tuples
+
+        Returns:
+            Number of observations stored
+        """
+        if not snapshots:
+            return len(self)
+
+        for ticker, _, _ in snapshots:
+            if ticker not in self.ticker_index:
+                self.ticker_index[ticker] = len(self.tickers)
+                self.tickers.append(ticker)
+
+        new_ids = np.array([self.ticker_index[ticker] for ticker, _, _ in snapshots], dtype=np.int32)
+        new_days = _to_days([observed for _, observed, _ in snapshots])
+
+        ticker_id = np.concatenate([np.asarray(self.ticker_id), new_ids])
+        days = np.concatenate([np.asarray(self.days), new_days])
+        values = {
+            field: np.concatenate([np.asarray(self.values[field]), [_value(info, field) for _, _, info in snapshots]])
+            for field in FIELDS
+        }
+
+        # Sort by key; on duplicate keys keep the newest (last appended) row
+        keys = _keys(ticker_id, days)
+        order = np.lexsort((np.arange(len(keys)), keys))
+        keys = keys[order]
+        keep = np.append(keys[1:] != keys[:-1], True)
+        order = order[keep]
+
+        os.makedirs(self.path, exist_ok=True)
+        arrays = {'ticker_id': ticker_id[order], 'date': days[order].astype('datetime64[D]')}
+        arrays.update({field: values[field][order] for field in FIELDS})
+
+        for name, array in arrays.items():
+            file_path = os.path.join(self.path, f"{name}.npy")
+            with open(file_path + '.tmp', 'wb') as f:
+                np.save(f, array)
+            os.replace(file_path + '.tmp', file_path)
+
+        with open(os.path.join(self.path, 'tickers.json'), 'w') as f:
+            json.dump(self.tickers, f, indent=2)
+
+        self._load()
+        return len(self)
+
+    def record(self, ticker, info, observed=None):
+        """
+        Queue one ticker.info snapshot observed on a date (default: today)
+
+        Returns:
+            Number of queued snapshots (written by flush(), or before the next lookup)
+        """
+        self.pending.append((ticker, observed or datetime.now().date(), info))
+        return len(self.pending)
+
+    def flush(self):
+        """Write every queued snapshot in one append"""
+        pending, self.pending = self.pending, []
+        return self.append(pending)
+
+    def asof(self, tickers, dates, fields=None):
+        """
+        Latest observation on or before each date, for each (ticker, date) pair
+
+        Args:
+            tickers: Sequence of tickers
+            dates: Sequence of dates (same length as tickers)
+            fields: Fields to return (default: all)
+
+        Returns:
+            DataFrame with ticker, date, observed and one column per field
+            (NaN where no observation exists yet)
+        """
+        if self.pending:
+            self.flush()
+
+        fields = fields or FIELDS
+        tickers = np.asarray(tickers, dtype=object)
+        query_days = _to_days(dates)
+        query_ids = pd.Index(self.tickers, dtype=object).get_indexer(tickers).astype(np.int64)
+
+        result = pd.DataFrame({'ticker': tickers, 'date': query_days.astype('datetime64[D]')})
+
+        if not len(self):
+            result['observed'] = np.datetime64('NaT', 'D')
+            for field in fields:
+                result[field] = np.nan
+            return result
+
+        pos = np.searchsorted(self.keys, _keys(query_ids, query_days), side='right') - 1
+        pos = np.maximum(pos, 0)
+        found = (query_ids >= 0) & (np.asarray(self.ticker_id)[pos] == query_ids) & (self.keys[pos] <= _keys(query_ids, query_days))
+
+        observed = np.asarray(self.days)[pos].astype('datetime64[D]')
+        result['observed'] = np.where(found, observed, np.datetime64('NaT', 'D'))
+
+        for field in fields:
+            result[field] = np.where(found, np.asarray(self.values[field])[pos], np.nan)
+
+        return result
+
+    def asof_universe(self, tickers, date, fields=None):
+        """As-of lookup of many tickers on a single date"""
+        return self.asof(tickers, [date] * len(tickers), fields)
+
+
+def score_tiers(values):
+    """
+    SCORE_RULES tier of every scored field
+
+    Args:
+        values: DataFrame or dictionary with SCORE_RULES columns (e.g., from asof())
+
+    Returns:
+        Dictionary of field -> int array: index of the first threshold met
+        (0 = best), len(thresholds) if none is met, -1 if missing or zero
+    """
+    tiers = {}
+    for field, (higher, thresholds, _) in SCORE_RULES.items():
+        array = np.asarray(values[field], dtype=np.float64)
+        met = [array > threshold if higher else array < threshold for threshold in thresholds]
+        tier = np.select(met, np.arange(len(thresholds)), len(thresholds))
+        tiers[field] = np.where(np.isnan(array) | (array == 0), -1, tier)
+    return tiers
+
+
+def score_fundamentals(values):
+    """
+    Vectorized fundamental quality score (0-100, missing or zero values score nothing)
+
+    Args:
+        values: DataFrame or dictionary with SCORE_RULES columns (e.g., from asof())
+
+    Returns:
+        float64 array of scores
+    """
+    tiers = score_tiers(values)
+    score = 0
+    for field, (_, _, points) in SCORE_RULES.items():
+        score = score + np.append(points, [0, 0])[tiers[field]]
+    return np.asarray(score, dtype=np.float64)
+
+
+def score_snapshot(info):
+    """
+    Fundamental quality score of one ticker.info snapshot
+
+    Returns:
+        (score, tiers): score and dictionary of field -> tier (see score_tiers)
+    """
+    values = {field: [_value(info, field)] for field in SCORE_RULES}
+    tiers = score_tiers(values)
+    return float(score_fundamentals(values)[0]), {field: int(tier[0]) for field, tier in tiers.items()}
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Transparent TTL Cache for Price History Calls
+Process-wide memory cache backed by an on-disk cache
+
+Cache key: (ticker, start, end, period, interval)
+
+TTL depends on IDX market hours (Mon-Fri 09:00-16:00 WIB):
+- Market open: short TTL, the latest bar is still changing
+- Market closed: valid until the next session opens
+
+Both layers are size-bounded with least-recently-used eviction, and
+hit/miss counters are kept for reporting.
+"""
+
+import pandas as pd
+from datetime import datetime, timedelta
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+from ohlcv_store import TIMEZONE
+from data_provider import get_provider
+
+MARKET_OPEN_HOUR = 9
+MARKET_CLOSE_HOUR = 16
+
+INTRADAY_INTERVALS = {'1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h'}
+
+# TTLs while the market is open (seconds)
+INTRADAY_TTL = 60
+SESSION_TTL = 15 * 60
+
+
+def jakarta_now():
+    """Current time in Asia/Jakarta"""
+    return pd.Timestamp.now(tz=TIMEZONE)
+
+
+def market_is_open(now=None):
+    """Check whether IDX is in its trading session"""
+    now = now if now is not None else jakarta_now()
+    return now.weekday() < 5 and MARKET_OPEN_HOUR <= now.hour < MARKET_CLOSE_HOUR
+
+
+def next_market_open(now=None):
+    """Next IDX session open (weekends skipped, exchange holidays ignored)"""
+    now = now if now is not None else jakarta_now()
+    candidate = now.normalize() + timedelta(hours=MARKET_OPEN_HOUR)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def ttl_for(interval="1d", now=None):
+    """Cache lifetime in seconds for data of a given interval"""
+    now = now if now is not None else jakarta_now()
+
+    if market_is_open(now):
+        return INTRADAY_TTL if interval in INTRADAY_INTERVALS else SESSION_TTL
+
+    return max(SESSION_TTL, (next_market_open(now) - now).total_seconds())
+
+
+def _normalize_date(value):
+    if value is None:
+        return None
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return pd.Timestamp(value).strftime('%Y-%m-%d')
+    return str(value)
+
+
+def fetch_history(ticker, **history_kwargs):
+    """Uncached price history from the active data provider"""
+    return get_provider().history(ticker, **history_kwargs)
+
+
+class HistoryCache:
+    """Memory + disk LRU cache for price history with market-hours TTLs"""
+
+    def __init__(self, cache_dir="data/cache/history", max_entries=256, max_disk_bytes=512 * 1024 * 1024, fetch_fn=None):
+        """
+        Args:
+            cache_dir: Directory for on-disk entries (None disables the disk layer)
+            max_entries: Maximum entries kept in memory
+            max_disk_bytes: Maximum total size of on-disk entries
+            fetch_fn: Callable(ticker, **history_kwargs) used on a miss
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.fetch_fn = fetch_fn or fetch_history
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, ticker, start=None, end=None, period=None, interval="1d"):
+        """Cache key for a history request"""
+        return (ticker, _normalize_date(start), _normalize_date(end), period, interval)
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.pkl")
+
+    def _remember(self, key, expires, data):
+        with self.lock:
+            self.memory[key] = (expires, data)
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_entries:
+                self.memory.popitem(last=False)
+                self.evictions += 1
+
+    def _read_disk(self, key, now):
+        if not self.cache_dir:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+        if entry['key'] != key or entry['expires'] <= now:
+            return None
+
+        # Touch the file so disk eviction is least-recently-used
+        os.utime(path)
+        return entry
+
+    def _write_disk(self, key, expires, data):
+        if not self.cache_dir:
+            return
+
+        path = self._disk_path(key)
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump({'key': key, 'expires': expires, 'data': data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+        self._evict_disk()
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(path)
+            total -= size
+            with self.lock:
+                self.evictions += 1
+
+    def history(self, ticker, start=None, end=None, period=None, interval="1d", fetch_fn=None, **history_kwargs):
+        """
+        Cached equivalent of yf.Ticker(ticker).history(...)
+
+        Extra keyword arguments (e.g. timeout) are passed to the fetch on a
+        miss but are not part of the cache key. fetch_fn overrides the
+        cache's fetch function for this call only.
+
+        Returns:
+            A copy of the cached DataFrame
+        """
+        key = self.make_key(ticker, start, end, period, interval)
+        now = time.time()
+
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None and entry[0] > now:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return entry[1].copy()
+
+        entry = self._read_disk(key, now)
+        if entry is not None:
+            self._remember(key, entry['expires'], entry['data'])
+            with self.lock:
+                self.disk_hits += 1
+            return entry['data'].copy()
+
+        request = {name: value for name, value in
+                   (('start', start), ('end', end), ('period', period)) if value is not None}
+        data = (fetch_fn or self.fetch_fn)(ticker, interval=interval, **request, **history_kwargs)
+
+        with self.lock:
+            self.misses += 1
+
+        # Empty responses are usually transient, so they are never cached
+        if data is not None and not data.empty:
+            expires = now + ttl_for(interval)
+            self._remember(key, expires, data)
+            self._write_disk(key, expires, data)
+            return data.copy()
+
+        return data
+
+    def clear(self):
+        """Drop every memory and disk entry"""
+        with self.lock:
+            self.memory.clear()
+
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def stats(self):
+        """Hit/miss counters"""
+        with self.lock:
+            requests = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self.memory),
+                'hit_rate': (self.hits + self.disk_hits) / requests if requests else 0.0,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide history cache"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            # Recording/replay must see every request, so skip the disk layer
+            cache_dir = "data/cache/history" if get_provider().cacheable else None
+            _default_cache = HistoryCache(cache_dir=cache_dir)
+        return _default_cache
+
+
+def cached_history(ticker, **history_kwargs):
+    """Cached price history through the process-wide cache"""
+    return get_cache().history(ticker, **history_kwargs)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Memoized Indicator Dependency Graph
+Every indicator node is computed at most once per (dataset version, name, params)
+
+Nodes and their dependencies:
+    ema(n), rsi(n), atr(n), support_resistance(n), pivot_levels(left, right)
+    rolling_stats(column, windows), obv, anchored_vwap(anchor), volume_profile(window, bins)
+    sma(n), volume_ma(n)     -> rolling_stats(column, 5/10/20/50/200 or (n,))
+    macd(fast, slow, signal) -> ema(fast), ema(slow)
+    bollinger(n, k)          -> sma(n), rolling_stats(Close, ...)
+
+SMAs of the standard window lengths (5/10/20/50/200) come from one shared
+rolling_stats node, so SMA 20, SMA 50 and the Bollinger bands of one
+dataset cost a single pass over the data.
+
+Nodes are kept in a process-wide LRU cache shared by all graphs, so two
+analyzers looking at the same dataset share their work. The dataset
+version is a content hash of the OHLCV frame unless the caller provides
+one (e.g., the store revision and last bar date).
+
+Returned series are shared between callers and must not be modified.
+"""
+
+import pandas as pd
+from collections import OrderedDict
+import hashlib
+import threading
+
+import indicators
+import volume_profile
+from rolling import ROLLING_WINDOWS
+
+
+def dataset_version(data):
+    """Content hash of an OHLCV DataFrame"""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    digest.update(repr(list(data.columns)).encode())
+    return digest.hexdigest()
+
+
+class NodeCache:
+    """LRU cache of computed indicator nodes with hit statistics"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.nodes = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, compute):
+        """Cached node value, computed with compute() on a miss"""
+        with self.lock:
+            if key in self.nodes:
+                self.nodes.move_to_end(key)
+                self.hits += 1
+                return self.nodes[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self.lock:
+            self.nodes[key] = value
+            self.nodes.move_to_end(key)
+            while len(self.nodes) > self.max_entries:
+                self.nodes.popitem(last=False)
+                self.evictions += 1
+
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.nodes.clear()
+
+    def stats(self):
+        """Hit/miss counters"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self.nodes),
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+_default_cache = NodeCache()
+
+
+def get_node_cache():
+    """Process-wide indicator node cache"""
+    return _default_cache
+
+
+class IndicatorGraph:
+    """Memoized indicators over one OHLCV dataset"""
+
+    def __init__(self, data, version=None, cache=None):
+        """
+        Args:
+            data: DataFrame with Open/High/Low/Close/Volume columns
+            version: Dataset version key (default: content hash of data)
+            cache: NodeCache (default: the process-wide cache)
+        """
+        self.data = data
+        self.version = version if version is not None else dataset_version(data)
+        self.cache = cache or get_node_cache()
+
+    def node(self, name, compute, **params):
+        """Value of a node, computed at most once per (version, name, params)"""
+        key = (self.version, name, tuple(sorted(params.items())))
+        return self.cache.get(key, compute)
+
+    def ema(self, period, column='Close'):
+        return self.node('ema', lambda: indicators.ema(self.data[column], period), period=period, column=column)
+
+    def rolling_stats(self, column='Close', windows=ROLLING_WINDOWS):
+        """Dictionary of window -> {'mean': Series, 'std': Series} from one pass"""
+        windows = tuple(windows)
+        return self.node(
+            'rolling_stats', lambda: indicators.rolling_windows(self.data[column], windows),
+            column=column, windows=windows
+        )
+
+    def _windows(self, period):
+        return ROLLING_WINDOWS if period in ROLLING_WINDOWS else (period,)
+
+    def sma(self, period, column='Close'):
+        return self.rolling_stats(column, self._windows(period))[period]['mean']
+
+    def rsi(self, period=14, method='sma'):
+        return self.node('rsi', lambda: indicators.rsi(self.data['Close'], period, method), period=period, method=method)
+
+    def macd(self, fast=12, slow=26, signal=9):
+        """(macd_line, signal_line, histogram) built from the shared ema nodes"""
+        def compute():
+            line = self.ema(fast) - self.ema(slow)
+            signal_line = indicators.ema(line, signal)
+            return line, signal_line, line - signal_line
+
+        return self.node('macd', compute, fast=fast, slow=slow, signal=signal)
+
+    def bollinger(self, period=20, std_dev=2):
+        """(upper, middle, lower, bandwidth) around the shared sma node"""
+        def compute():
+            middle = self.sma(period)
+            std = self.rolling_stats('Close', self._windows(period))[period]['std']
+            upper = middle + std * std_dev
+            lower = middle - std * std_dev
+            return upper, middle, lower, (upper - lower) / middle
+
+        return self.node('bollinger', compute, period=period, std_dev=std_dev)
+
+    def atr(self, period=14, method='sma'):
+        return self.node(
+            'atr', lambda: indicators.atr(self.data['High'], self.data['Low'], self.data['Close'], period, method),
+            period=period, method=method
+        )
+
+    def volume_ma(self, period=20):
+        return self.sma(period, column='Volume')
+
+    def support_resistance(self, period=20):
+        return self.node('support_resistance', lambda: indicators.support_resistance(self.data['Close'], period), period=period)
+
+    def pivot_levels(self, left=5, right=5):
+        return self.node(
+            'pivot_levels', lambda: indicators.pivot_levels(self.data['High'], self.data['Low'], left, right),
+            left=left, right=right
+        )
+
+    def obv(self):
+        """On-balance volume"""
+        return self.node('obv', lambda: pd.Series(
+            volume_profile.on_balance_volume(self.data['Close'], self.data['Volume']), index=self.data.index
+        ))
+
+    def anchored_vwap(self, anchor=0):
+        """VWAP since the bar at position anchor (e.g., data.index.get_loc(date))"""
+        return self.node('anchored_vwap', lambda: pd.Series(
+            volume_profile.anchored_vwap(self.data['High'], self.data['Low'], self.data['Close'], self.data['Volume'], anchor),
+            index=self.data.index
+        ), anchor=anchor)
+
+    def volume_profile(self, window=60, bins=50):
+        """Volume profile of the last window bars: dict with edges, volumes, poc, val, vah"""
+        def compute():
+            recent = self.data.iloc[-window:]
+            edges, volumes = volume_profile.volume_profile(recent['High'], recent['Low'], recent['Volume'], bins)
+            poc, val, vah = volume_profile.profile_levels(edges, volumes)
+            return {'edges': edges, 'volumes': volumes, 'poc': poc, 'val': val, 'vah': vah}
+
+        return self.node('volume_profile', compute, window=window, bins=bins)
+
+    def stats(self):
+        """Hit statistics of the underlying node cache"""
+        return self.cache.stats()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Vectorized Technical Indicators
+One shared implementation of every indicator used by the analyzers,
+the screener and the backtester
+
+Every function works on the whole series at once and returns full
+series (NaN during the warm-up bars), not just the latest value:
+- pandas Series in -> Series out (same index)
+- pandas DataFrame in -> DataFrame out (one column per ticker, bars as rows)
+- list / numpy array in -> numpy array out
+
+Indicators:
+1. sma, ema - Moving averages
+2. rsi - Relative Strength Index (simple average or Wilder smoothing)
+3. macd - MACD line, signal line (EMA of the MACD line) and histogram
+4. true_range, atr - True range including gaps, and its average
+5. bollinger - Bands and bandwidth
+6. volume_ma - Volume moving average
+7. support_resistance - Rolling lowest/highest close
+8. pivot_levels - Levels of the latest confirmed pivot low/high
+9. rolling_windows - Mean/std/min/max of several windows in one pass
+
+Rolling means and standard deviations use the cumulative-sum kernels in
+rolling.py (same NaN rules as pandas rolling, better precision).
+"""
+
+import pandas as pd
+import numpy as np
+
+import rolling
+
+RSI_METHODS = ['sma', 'wilder']
+
+
+def _series(values):
+    """Float Series (or DataFrame) view of a Series, DataFrame, array or list"""
+    if isinstance(values, (pd.Series, pd.DataFrame)):
+        return values.astype(np.float64)
+    return pd.Series(np.asarray(values, dtype=np.float64))
+
+
+def _like(result, values):
+    """Return result as the same kind of container as the input"""
+    if isinstance(values, (pd.Series, pd.DataFrame)):
+        return result
+    return result.to_numpy()
+
+
+def _bars_last(values):
+    """Float array with bars on the last axis ([tickers, bars] for a DataFrame)"""
+    if isinstance(values, pd.DataFrame):
+        return values.to_numpy(dtype=np.float64).T
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=np.float64)
+    return np.asarray(values, dtype=np.float64)
+
+
+def _wrap(result, values):
+    """Wrap an array from _bars_last-shaped input like the original input"""
+    if isinstance(values, pd.DataFrame):
+        return pd.DataFrame(result.T, index=values.index, columns=values.columns)
+    if isinstance(values, pd.Series):
+        return pd.Series(result, index=values.index, name=values.name)
+    return result
+
+
+def _along_bars(kernel, values, *args):
+    """Apply an array kernel along the bar axis and wrap the result like the input"""
+    return _wrap(kernel(_bars_last(values), *args), values)
+
+
+def last(values, digits=None):
+    """
+    Latest value of an indicator series
+
+    Args:
+        values: Series or array
+        digits: Round to this many digits (optional)
+
+    Returns:
+        float, or None if the series is empty or still warming up
+    """
+    if len(values) == 0:
+        return None
+
+    value = values.iloc[-1] if isinstance(values, pd.Series) else values[-1]
+    if pd.isna(value):
+        return None
+
+    value = float(value)
+    return round(value, digits) if digits is not None else value
+
+
+def rolling_windows(values, windows=rolling.ROLLING_WINDOWS, stats=('mean', 'std')):
+    """
+    Rolling statistics for several window lengths from one pass over the data
+
+    Args:
+        values: Series, DataFrame or array
+        windows: Window lengths (default: 5/10/20/50/200)
+        stats: Statistics from rolling.ROLLING_STATS
+
+    Returns:
+        Dictionary of window -> dictionary of stat -> series like the input
+        (NaN until the window is full, like pandas rolling)
+    """
+    results = rolling.rolling_stats(_bars_last(values), windows, stats)
+    return {
+        window: {stat: _wrap(result, values) for stat, result in by_stat.items()}
+        for window, by_stat in results.items()
+    }
+
+
+def _rolling_mean(values, period):
+    return rolling.rolling_stats(values, (period,), ['mean'])[period]['mean']
+
+
+def sma(values, period):
+    """Simple moving average"""
+    return _along_bars(_rolling_mean, values, period)
+
+
+def ema(values, period):
+    """Exponential moving average (seeded with the first value)"""
+    prices = _series(values)
+    return _like(prices.ewm(span=period, adjust=False).mean(), values)
+
+
+def _wilder(values, period):
+    """Wilder smoothing seeded with the simple average of the first period values"""
+    smoothed = values.copy()
+    first = smoothed.first_valid_index()
+    if first is None:
+        return smoothed
+
+    start = smoothed.index.get_loc(first)
+    if len(smoothed) - start < period:
+        return smoothed * np.nan
+
+    seed = start + period - 1
+    smoothed.iloc[:seed] = np.nan
+    smoothed.iloc[seed] = values.iloc[start:seed + 1].mean()
+    return smoothed.ewm(alpha=1 / period, adjust=False).mean()
+
+
+def rsi(values, period=14, method='sma'):
+    """
+    Relative Strength Index (0-100)
+
+    Args:
+        values: Close prices
+        period: Lookback period
+        method: 'sma' (average of the last period changes) or 'wilder'
+                (Wilder's recursive smoothing)
+
+    Returns:
+        RSI series; 100 where there were no losses in the window
+    """
+    if method not in RSI_METHODS:
+        raise ValueError(f"Unknown RSI method: {method}")
+
+    prices = _series(values)
+    delta = prices.diff()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+
+    if method == 'sma':
+        avg_gain = sma(gain, period)
+        avg_loss = sma(loss, period)
+    else:
+        avg_gain = _wilder(gain, period)
+        avg_loss = _wilder(loss, period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = 100 - 100 / (1 + avg_gain / avg_loss)
+    result = result.mask(avg_loss == 0, 100.0)
+
+    return _like(result, values)
+
+
+def macd(values, fast=12, slow=26, signal=9):
+    """
+    MACD
+
+    Returns:
+        (macd_line, signal_line, histogram); the signal line is the
+        signal-period EMA of the MACD line
+    """
+    prices = _series(values)
+    line = prices.ewm(span=fast, adjust=False).mean() - prices.ewm(span=slow, adjust=False).mean()
+    signal_line = line.ewm(span=signal, adjust=False).mean()
+    histogram = line - signal_line
+
+    return _like(line, values), _like(signal_line, values), _like(histogram, values)
+
+
+def true_range(high, low, close):
+    """True range: largest of high-low and the gaps from the previous close"""
+    high_s = _series(high)
+    low_s = _series(low)
+    prev_close = _series(close).shift(1)
+
+    # fmax ignores the missing previous close on the first bar
+    ranges = np.fmax(high_s - low_s, np.fmax((high_s - prev_close).abs(), (low_s - prev_close).abs()))
+
+    return _like(ranges, high)
+
+
+def atr(high, low, close, period=14, method='sma'):
+    """
+    Average True Range
+
+    Args:
+        method: 'sma' (rolling mean of true range) or 'wilder'
+    """
+    tr = _series(true_range(high, low, close))
+
+    if method == 'sma':
+        result = sma(tr, period)
+    elif method == 'wilder':
+        result = _wilder(tr, period)
+    else:
+        raise ValueError(f"Unknown ATR method: {method}")
+
+    return _like(result, high)
+
+
+def bollinger(values, period=20, std_dev=2):
+    """
+    Bollinger Bands
+
+    Returns:
+        (upper, middle, lower, bandwidth) where bandwidth = (upper - lower) / middle
+    """
+    prices = _series(values)
+    stats = rolling_windows(prices, (period,))[period]
+    middle = stats['mean']
+    std = stats['std']
+
+    upper = middle + std * std_dev
+    lower = middle - std * std_dev
+    bandwidth = (upper - lower) / middle
+
+    return _like(upper, values), _like(middle, values), _like(lower, values), _like(bandwidth, values)
+
+
+def volume_ma(volume, period=20):
+    """Volume moving average"""
+    return sma(volume, period)
+
+
+def support_resistance(values, period=20):
+    """
+    Rolling support and resistance
+
+    Returns:
+        (support, resistance): lowest and highest value of the last period bars
+        (fewer at the start of the series)
+    """
+    return _along_bars(rolling.rolling_min, values, period), _along_bars(rolling.rolling_max, values, period)
+
+
+def _pivot_level(find_high, values, left, right):
+    confirm = rolling.pivot_highs if find_high else rolling.pivot_lows
+    return rolling.last_pivot_level(values, confirm(values, left, right), right)
+
+
+def pivot_levels(high, low, left=5, right=5):
+    """
+    Support and resistance from confirmed pivots
+
+    A pivot is known right bars after it happens, so every bar only uses
+    pivots that were visible at the time (safe for backtests).
+
+    Returns:
+        (support, resistance): level of the latest pivot low and pivot high
+        (NaN before the first one)
+    """
+    support = _along_bars(lambda lows: _pivot_level(False, lows, left, right), low)
+    resistance = _along_bars(lambda highs: _pivot_level(True, highs, left, right), high)
+    return support, resistance
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Multi-Timeframe Indicators
+Daily, weekly and monthly indicator sets from one daily OHLCV frame
+
+Weekly and monthly bars are built locally (resample.py), their indicators
+are computed on those bars and then aligned back onto the daily index:
+
+    daily:   Mon  Tue  Wed  Thu  Fri | Mon  Tue ...
+    W_RSI:   ...  ...  ...  ...  w1  | w1   w1  ...  (w2 appears on the next Friday)
+
+A higher-timeframe value becomes visible on the last session of its period
+(at the close, like a daily indicator) and is forward-filled until the
+next period completes. The period still in progress is never published,
+so a daily bar only sees weekly/monthly values that were known at the
+time (no lookahead in backtests).
+
+Columns are prefixed with the timeframe: D_RSI, W_RSI, M_RSI, W_Trend, ...
+
+Example:
+    frame = multi_timeframe(daily)
+    entries = (frame['W_Trend'] > 0) & (frame['D_RSI'] < 30)
+"""
+
+import pandas as pd
+import numpy as np
+
+from indicator_graph import IndicatorGraph
+from resample import period_end, period_labels, resample_ohlcv
+
+# Prefix -> resample frequency (None for the daily bars themselves)
+TIMEFRAMES = {'D': None, 'W': 'weekly', 'M': 'monthly'}
+
+TIMEFRAME_COLUMNS = [
+    'Close', 'SMA_20', 'SMA_50', 'EMA_12', 'EMA_26', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist',
+    'ATR', 'BB_Upper', 'BB_Mid', 'BB_Lower', 'Bandwidth', 'Volume_MA', 'Trend',
+]
+
+
+def bar_indicators(bars):
+    """
+    Indicator set for one timeframe
+
+    Args:
+        bars: DataFrame with Open/High/Low/Close/Volume (daily, weekly or monthly)
+
+    Returns:
+        DataFrame with TIMEFRAME_COLUMNS on the same index; Trend is 1 when
+        Close > SMA 20 > SMA 50, -1 when Close < SMA 20 < SMA 50, else 0
+    """
+    graph = IndicatorGraph(bars[['Open', 'High', 'Low', 'Close', 'Volume']])
+    result = pd.DataFrame(index=bars.index)
+
+    result['Close'] = bars['Close'].astype(np.float64)
+    result['SMA_20'] = graph.sma(20)
+    result['SMA_50'] = graph.sma(50)
+    result['EMA_12'] = graph.ema(12)
+    result['EMA_26'] = graph.ema(26)
+    result['RSI'] = graph.rsi(14)
+    result['MACD'], result['MACD_Signal'], result['MACD_Hist'] = graph.macd(12, 26, 9)
+    result['ATR'] = graph.atr(14)
+    result['BB_Upper'], result['BB_Mid'], result['BB_Lower'], result['Bandwidth'] = graph.bollinger(20, 2)
+    result['Volume_MA'] = graph.volume_ma(20)
+
+    close, fast, slow = result['Close'], result['SMA_20'], result['SMA_50']
+    result['Trend'] = np.where((close > fast) & (fast > slow), 1.0, np.where((close < fast) & (fast < slow), -1.0, 0.0))
+    result.loc[slow.isna(), 'Trend'] = np.nan
+
+    return result
+
+
+def completed_positions(index, freq):
+    """
+    Daily row on which each period completes
+
+    Args:
+        index: DatetimeIndex of daily bars (sorted)
+        freq: 'weekly' or 'monthly'
+
+    Returns:
+        int array with the position of the last session of every period;
+        the last period is left out while it is still in progress
+    """
+    labels = period_labels(index, freq)
+    if not len(labels):
+        return np.array([], dtype=np.int64)
+
+    is_last = np.ones(len(labels), dtype=bool)
+    is_last[:-1] = labels[1:] != labels[:-1]
+
+    positions = np.flatnonzero(is_last)
+
+    # Same rule as the Partial flag of resample_ohlcv
+    if index[-1].normalize() < period_end(labels[-1], freq):
+        positions = positions[:-1]
+
+    return positions
+
+
+def align_to_daily(values, index, freq):
+    """
+    Forward-fill higher-timeframe values onto the daily index without lookahead
+
+    Args:
+        values: DataFrame with one row per period, in period order (from resample_ohlcv)
+        index: DatetimeIndex of the daily bars the periods were built from
+        freq: 'weekly' or 'monthly'
+
+    Returns:
+        DataFrame on the daily index (NaN before the first completed period)
+    """
+    positions = completed_positions(index, freq)
+
+    published = np.full((len(index), values.shape[1]), np.nan)
+    published[positions] = values.to_numpy(dtype=np.float64)[:len(positions)]
+
+    return pd.DataFrame(published, index=index, columns=values.columns).ffill()
+
+
+def multi_timeframe(daily, timeframes=('D', 'W', 'M')):
+    """
+    Daily, weekly and monthly indicators aligned on the daily index
+
+    Args:
+        daily: Daily OHLCV DataFrame (sorted DatetimeIndex)
+        timeframes: Prefixes from TIMEFRAMES to compute
+
+    Returns:
+        DataFrame indexed like daily with prefixed columns (D_RSI, W_RSI, M_Trend, ...)
+    """
+    frames = []
+
+    for prefix in timeframes:
+        if prefix not in TIMEFRAMES:
+            raise ValueError(f"Unknown timeframe: {prefix}")
+
+        freq = TIMEFRAMES[prefix]
+        if freq is None:
+            values = bar_indicators(daily)
+        else:
+            values = align_to_daily(bar_indicators(resample_ohlcv(daily, freq)), daily.index, freq)
+
+        frames.append(values.add_prefix(f"{prefix}_"))
+
+    return pd.concat(frames, axis=1)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Columnar OHLCV Store for Indonesian Stocks
+Partitioned on-disk storage for daily bars, replacing the dated per-day CSV dumps
+
+Layout:
+    {root}/{TICKER}/meta.json
+    {root}/{TICKER}/{YEAR}/date.npy     - datetime64[D] session dates (Asia/Jakarta)
+    {root}/{TICKER}/{YEAR}/open.npy     - float64
+    {root}/{TICKER}/{YEAR}/high.npy     - float64
+    {root}/{TICKER}/{YEAR}/low.npy      - float64
+    {root}/{TICKER}/{YEAR}/close.npy    - float64
+    {root}/{TICKER}/{YEAR}/volume.npy   - int64
+
+Every column is a plain .npy file, so reads are memory-mapped and only the
+requested columns and year partitions are touched.
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+import os
+import json
+import shutil
+
+TIMEZONE = 'Asia/Jakarta'
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+COLUMN_DTYPES = {
+    'Open': np.float64,
+    'High': np.float64,
+    'Low': np.float64,
+    'Close': np.float64,
+    'Volume': np.int64,
+}
+
+
+def ticker_key(ticker):
+    """Directory name for a ticker (e.g., "BMRI.JK" -> "BMRI_JK")"""
+    return ticker.replace('.', '_')
+
+
+def normalize_index(index):
+    """Convert a DatetimeIndex to Asia/Jakarta session dates at midnight"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize(TIMEZONE)
+    else:
+        index = index.tz_convert(TIMEZONE)
+    return index.normalize()
+
+
+def session_date(value):
+    """Convert a date-like value to a naive Jakarta session date"""
+    ts = pd.Timestamp(value)
+    if ts.tz is not None:
+        ts = ts.tz_convert(TIMEZONE).tz_localize(None)
+    return ts.normalize()
+
+
+class OHLCVStore:
+    """Partitioned columnar store of daily OHLCV bars (one partition per ticker and year)"""
+
+    def __init__(self, root="data/store"):
+        self.root = root
+
+    def _ticker_dir(self, ticker):
+        return os.path.join(self.root, ticker_key(ticker))
+
+    def _partition_dir(self, ticker, year):
+        return os.path.join(self._ticker_dir(ticker), str(year))
+
+    def has_ticker(self, ticker):
+        """Check whether any data is stored for a ticker"""
+        return len(self.years(ticker)) > 0
+
+    def tickers(self):
+        """List all tickers in the store"""
+        if not os.path.isdir(self.root):
+            return []
+
+        tickers = []
+        for name in sorted(os.listdir(self.root)):
+            meta_file = os.path.join(self.root, name, 'meta.json')
+            if os.path.exists(meta_file):
+                with open(meta_file) as f:
+                    tickers.append(json.load(f)['ticker'])
+
+        return tickers
+
+    def years(self, ticker):
+        """List the year partitions stored for a ticker"""
+        ticker_dir = self._ticker_dir(ticker)
+        if not os.path.isdir(ticker_dir):
+            return []
+
+        return sorted(int(name) for name in os.listdir(ticker_dir) if name.isdigit())
+
+    def _load_column(self, ticker, year, column):
+        path = os.path.join(self._partition_dir(ticker, year), f"{column.lower()}.npy")
+        return np.load(path, mmap_mode='r')
+
+    def _load_partition(self, ticker, year):
+        """Load a full year partition as a naive-indexed DataFrame"""
+        dates = np.asarray(self._load_column(ticker, year, 'date'))
+        columns = {col: np.asarray(self._load_column(ticker, year, col)) for col in COLUMNS}
+        return pd.DataFrame(columns, index=pd.DatetimeIndex(dates.astype('datetime64[ns]')))
+
+    def _write_partition(self, ticker, year, frame):
+        partition_dir = self._partition_dir(ticker, year)
+        os.makedirs(partition_dir, exist_ok=True)
+
+        arrays = {'date': frame.index.values.astype('datetime64[D]')}
+        for col in COLUMNS:
+            arrays[col.lower()] = frame[col].to_numpy(dtype=COLUMN_DTYPES[col])
+
+        # Write to temporary files first so readers never see half-written columns
+        for name, values in arrays.items():
+            path = os.path.join(partition_dir, f"{name}.npy")
+            with open(path + '.tmp', 'wb') as f:
+                np.save(f, values)
+            os.replace(path + '.tmp', path)
+
+    def meta(self, ticker):
+        """Stored metadata for a ticker (or None)"""
+        meta_file = os.path.join(self._ticker_dir(ticker), 'meta.json')
+        if not os.path.exists(meta_file):
+            return None
+        with open(meta_file) as f:
+            return json.load(f)
+
+    def revision(self, ticker):
+        """
+        Identifier of the stored history for a ticker
+
+        It changes when the history is replaced (e.g., after a split or
+        restatement), but not when new bars are appended.
+        """
+        meta = self.meta(ticker)
+        return meta.get('revision') if meta else None
+
+    def _write_meta(self, ticker):
+        now = datetime.now().isoformat()
+        meta = self.meta(ticker) or {
+            'ticker': ticker,
+            'timezone': TIMEZONE,
+            'columns': COLUMNS,
+            'revision': now,
+        }
+        meta['updated'] = now
+
+        meta_file = os.path.join(self._ticker_dir(ticker), 'meta.json')
+        with open(meta_file, 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    def write(self, ticker, data):
+        """
+        Merge daily bars into the store
+
+        Existing bars on the same dates are overwritten, other stored bars are kept.
+
+        Args:
+            ticker: Stock ticker (e.g., "BMRI.JK")
+            data: DataFrame with OHLCV columns and a DatetimeIndex
+
+        Returns:
+            Number of bars written
+        """
+        if data is None or data.empty:
+            return 0
+
+        missing_columns = [col for col in COLUMNS if col not in data.columns]
+        if missing_columns:
+            raise ValueError(f"Missing columns for {ticker}: {missing_columns}")
+
+        frame = data[COLUMNS].copy()
+        frame.index = normalize_index(frame.index).tz_localize(None)
+        frame = frame[~frame.index.duplicated(keep='last')].sort_index()
+
+        os.makedirs(self._ticker_dir(ticker), exist_ok=True)
+        stored_years = set(self.years(ticker))
+
+        for year, chunk in frame.groupby(frame.index.year):
+            if year in stored_years:
+                existing = self._load_partition(ticker, year)
+                existing = existing[~existing.index.isin(chunk.index)]
+                chunk = pd.concat([existing, chunk]).sort_index()
+
+            self._write_partition(ticker, year, chunk)
+
+        self._write_meta(ticker)
+
+        return len(frame)
+
+    def delete(self, ticker):
+        """Remove all stored data for a ticker"""
+        ticker_dir = self._ticker_dir(ticker)
+        if os.path.isdir(ticker_dir):
+            shutil.rmtree(ticker_dir)
+
+    def replace(self, ticker, data):
+        """
+        Replace all stored data for a ticker
+
+        The new history is written to a staging directory under the root and
+        swapped in with renames, so readers never see the ticker without data
+        and a crash leaves either the old or the new history in place.
+        """
+        staging = OHLCVStore(os.path.join(self.root, '.staging'))
+        staging.delete(ticker)
+        count = staging.write(ticker, data)
+
+        ticker_dir = self._ticker_dir(ticker)
+        new_dir = staging._ticker_dir(ticker)
+        old_dir = new_dir + '.old'
+        if os.path.isdir(old_dir):
+            shutil.rmtree(old_dir)
+        if os.path.isdir(ticker_dir):
+            os.replace(ticker_dir, old_dir)
+        if os.path.isdir(new_dir):
+            os.replace(new_dir, ticker_dir)
+        if os.path.isdir(old_dir):
+            shutil.rmtree(old_dir)
+
+        return count
+
+    def read(self, ticker, start=None, end=None, columns=None):
+        """
+        Read daily bars from the store
+
+        Only the year partitions overlapping [start, end] and the requested
+        columns are loaded.
+
+        Args:
+            ticker: Stock ticker
+            start: First date to include (inclusive, optional)
+            end: Last date to include (inclusive, optional)
+            columns: List of OHLCV columns (default: all)
+
+        Returns:
+            DataFrame indexed by Asia/Jakarta session dates, or None if not stored
+        """
+        columns = list(columns) if columns else list(COLUMNS)
+        unknown_columns = [col for col in columns if col not in COLUMN_DTYPES]
+        if unknown_columns:
+            raise ValueError(f"Unknown columns: {unknown_columns}")
+
+        start = session_date(start) if start is not None else None
+        end = session_date(end) if end is not None else None
+
+        years = [
+            year for year in self.years(ticker)
+            if (start is None or year >= start.year) and (end is None or year <= end.year)
+        ]
+
+        if not years:
+            return None if not self.has_ticker(ticker) else self._empty_frame(columns)
+
+        date_parts = []
+        column_parts = {col: [] for col in columns}
+
+        for year in years:
+            dates = self._load_column(ticker, year, 'date')
+            lo = 0 if start is None else np.searchsorted(dates, np.datetime64(start.date(), 'D'), side='left')
+            hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(end.date(), 'D'), side='right')
+
+            if hi <= lo:
+                continue
+
+            date_parts.append(np.asarray(dates[lo:hi]))
+            for col in columns:
+                column_parts[col].append(np.asarray(self._load_column(ticker, year, col)[lo:hi]))
+
+        if not date_parts:
+            return self._empty_frame(columns)
+
+        index = pd.DatetimeIndex(np.concatenate(date_parts).astype('datetime64[ns]')).tz_localize(TIMEZONE)
+        frame = pd.DataFrame({col: np.concatenate(column_parts[col]) for col in columns}, index=index)
+        frame.index.name = 'Date'
+
+        return frame
+
+    def _empty_frame(self, columns):
+        index = pd.DatetimeIndex([], tz=TIMEZONE, name='Date')
+        return pd.DataFrame({col: np.array([], dtype=COLUMN_DTYPES[col]) for col in columns}, index=index)
+
+    def first_date(self, ticker):
+        """First stored session date for a ticker (or None)"""
+        years = self.years(ticker)
+        if not years:
+            return None
+        dates = self._load_column(ticker, years[0], 'date')
+        return pd.Timestamp(dates[0]).tz_localize(TIMEZONE) if len(dates) else None
+
+    def last_date(self, ticker):
+        """Last stored session date for a ticker (or None)"""
+        years = self.years(ticker)
+        if not years:
+            return None
+        dates = self._load_column(ticker, years[-1], 'date')
+        return pd.Timestamp(dates[-1]).tz_localize(TIMEZONE) if len(dates) else None
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Candlestick and Chart Pattern Scanner
+Boolean pattern arrays over full OHLC histories of one or many tickers
+
+Inputs are 1D series or [tickers x bars] matrices (bars on the last axis,
+e.g. CrossSection.values or Universe matrices). Every pattern is a few
+whole-array comparisons, so a full universe history scans in well under a
+second. A pattern is True on the bar where it completes (known at that
+bar's close); bars with missing data are False.
+
+Patterns:
+1. Bullish_Engulfing / Bearish_Engulfing - Body engulfs the previous opposite body
+2. Hammer - Long lower shadow, small body near the high
+3. Inside_Bar - High/low inside the previous bar's range
+4. NR7 - Narrowest range of the last 7 bars
+5. Gap_Up / Gap_Down - Low above the previous high / high below the previous low
+6. Range_Breakout / Range_Breakdown - Close beyond the previous period bars' high/low
+"""
+
+import pandas as pd
+import numpy as np
+
+import rolling
+
+PATTERNS = [
+    'Bullish_Engulfing', 'Bearish_Engulfing', 'Hammer', 'Inside_Bar', 'NR7',
+    'Gap_Up', 'Gap_Down', 'Range_Breakout', 'Range_Breakdown',
+]
+
+# Screener price-action bonus for a pattern on the latest bar
+PATTERN_POINTS = {
+    'Bullish_Engulfing': 5,
+    'Hammer': 3,
+    'Range_Breakout': 5,
+    'Gap_Up': 2,
+    'NR7': 2,
+}
+
+
+def _array(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def previous(values, lag=1):
+    """Values lag bars earlier along the bar axis (NaN for the first bars)"""
+    values = _array(values)
+    result = np.full(values.shape, np.nan)
+    result[..., lag:] = values[..., :-lag]
+    return result
+
+
+def engulfing(open_, close):
+    """
+    Bullish and bearish engulfing
+
+    Returns:
+        (bullish, bearish): the body of a bar covers the opposite-colored
+        body of the previous bar
+    """
+    open_, close = _array(open_), _array(close)
+    prev_open, prev_close = previous(open_), previous(close)
+
+    bullish = (prev_close < prev_open) & (close > open_) & (open_ <= prev_close) & (close >= prev_open)
+    bearish = (prev_close > prev_open) & (close < open_) & (open_ >= prev_close) & (close <= prev_open)
+    return bullish, bearish
+
+
+def hammer(open_, high, low, close, shadow_ratio=2.0, upper_ratio=0.1):
+    """
+    Hammer: lower shadow at least shadow_ratio x the body, upper shadow at
+    most upper_ratio x the bar's range
+    """
+    open_, high, low, close = _array(open_), _array(high), _array(low), _array(close)
+    body = np.abs(close - open_)
+    bar_range = high - low
+
+    lower_shadow = np.minimum(open_, close) - low
+    upper_shadow = high - np.maximum(open_, close)
+
+    return (bar_range > 0) & (lower_shadow >= shadow_ratio * body) & (upper_shadow <= upper_ratio * bar_range)
+
+
+def inside_bar(high, low):
+    """High below and low above the previous bar's"""
+    high, low = _array(high), _array(low)
+    return (high < previous(high)) & (low > previous(low))
+
+
+def narrow_range(high, low, period=7):
+    """Range is the narrowest of the last period bars (ties count; NR7 by default)"""
+    bar_range = _array(high) - _array(low)
+    narrowest = rolling.rolling_min(bar_range, period)
+
+    full = np.arange(bar_range.shape[-1]) >= period - 1
+    return full & (bar_range <= narrowest)
+
+
+def gaps(high, low):
+    """
+    Returns:
+        (gap_up, gap_down): low above the previous high / high below the previous low
+    """
+    high, low = _array(high), _array(low)
+    return low > previous(high), high < previous(low)
+
+
+def range_breakout(high, low, close, period=20):
+    """
+    Returns:
+        (breakout, breakdown): close above the highest high / below the lowest
+        low of the previous period bars
+    """
+    high, low, close = _array(high), _array(low), _array(close)
+    highest = previous(rolling.rolling_max(high, period))
+    lowest = previous(rolling.rolling_min(low, period))
+
+    full = np.arange(close.shape[-1]) >= period
+    return full & (close > highest), full & (close < lowest)
+
+
+def scan_patterns(open_, high, low, close, breakout_period=20):
+    """
+    Scan every pattern at once
+
+    Args:
+        open_, high, low, close: 1D series or array[tickers, bars]
+        breakout_period: Lookback of Range_Breakout / Range_Breakdown
+
+    Returns:
+        Dictionary of PATTERNS name -> bool array shaped like close
+    """
+    results = {}
+    results['Bullish_Engulfing'], results['Bearish_Engulfing'] = engulfing(open_, close)
+    results['Hammer'] = hammer(open_, high, low, close)
+    results['Inside_Bar'] = inside_bar(high, low)
+    results['NR7'] = narrow_range(high, low, 7)
+    results['Gap_Up'], results['Gap_Down'] = gaps(high, low)
+    results['Range_Breakout'], results['Range_Breakdown'] = range_breakout(high, low, close, breakout_period)
+
+    return {name: results[name] for name in PATTERNS}
+
+
+def pattern_frame(data, breakout_period=20):
+    """Pattern columns for an OHLC DataFrame (one bool column per pattern)"""
+    found = scan_patterns(data['Open'], data['High'], data['Low'], data['Close'], breakout_period)
+    return pd.DataFrame(found, index=data.index)
+
+
+def pattern_points(found, position=-1):
+    """
+    Screener bonus (PATTERN_POINTS) for the patterns present at a bar
+
+    Args:
+        found: Output of scan_patterns
+        position: Bar index (int) or int array[tickers] of bar indexes per row
+
+    Returns:
+        int (1D input) or int array[tickers]
+    """
+    points = 0
+    for name, value in PATTERN_POINTS.items():
+        pattern = found[name]
+        if pattern.ndim == 1:
+            points += value if pattern[position] else 0
+        else:
+            points = points + np.where(pattern[np.arange(pattern.shape[0]), position], value, 0)
+
+    return points
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Weekly and Monthly Bars from Daily Data
+Builds higher-timeframe OHLCV locally instead of downloading interval="1wk"
+
+Rules:
+- Weeks follow IDX sessions (Monday to Friday) and are labelled by their
+  Monday, matching Yahoo Finance weekly bars
+- Months are labelled by their first calendar day
+- Holiday weeks simply contain fewer sessions
+- The latest period is flagged Partial while its sessions are still running
+
+Resampled bars are cached per ticker (memory + disk) and updated
+incrementally: only the last cached period is rebuilt when new daily
+bars arrive in the store.
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import timedelta
+import os
+import pickle
+
+FREQUENCIES = ['weekly', 'monthly']
+
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Sessions', 'Partial']
+
+
+def period_labels(index, freq='weekly'):
+    """
+    Period start label for every daily bar
+
+    Args:
+        index: DatetimeIndex of daily bars
+        freq: 'weekly' or 'monthly'
+
+    Returns:
+        DatetimeIndex of the same length with the period start of each bar
+    """
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency: {freq}")
+
+    index = pd.DatetimeIndex(index)
+    naive = index.tz_localize(None) if index.tz is not None else index
+    naive = naive.normalize()
+
+    if freq == 'weekly':
+        labels = naive - pd.to_timedelta(naive.weekday, unit='D')
+    else:
+        labels = naive.to_period('M').to_timestamp()
+
+    labels = pd.DatetimeIndex(labels)
+    return labels.tz_localize(index.tz) if index.tz is not None else labels
+
+
+def period_end(label, freq='weekly'):
+    """Last possible session date (Friday / last weekday of month) of a period"""
+    if freq == 'weekly':
+        return label + timedelta(days=4)
+    return label + pd.offsets.BMonthEnd(0)
+
+
+def resample_ohlcv(daily, freq='weekly'):
+    """
+    Resample daily OHLCV bars to weekly or monthly bars
+
+    Args:
+        daily: DataFrame with Open/High/Low/Close/Volume and a DatetimeIndex
+        freq: 'weekly' or 'monthly'
+
+    Returns:
+        DataFrame indexed by period start with OHLCV, Sessions and Partial columns
+    """
+    if daily is None or daily.empty:
+        index = pd.DatetimeIndex([], tz=getattr(getattr(daily, 'index', None), 'tz', None), name='Date')
+        return pd.DataFrame(columns=BAR_COLUMNS, index=index)
+
+    labels = period_labels(daily.index, freq)
+    grouped = daily.groupby(labels)
+
+    bars = pd.DataFrame({
+        'Open': grouped['Open'].first(),
+        'High': grouped['High'].max(),
+        'Low': grouped['Low'].min(),
+        'Close': grouped['Close'].last(),
+        'Volume': grouped['Volume'].sum(),
+        'Sessions': grouped['Close'].count(),
+    })
+    bars.index.name = 'Date'
+
+    # Only the latest period can still be receiving sessions
+    last_session = daily.index[-1].normalize()
+    partial = np.zeros(len(bars), dtype=bool)
+    partial[-1] = last_session < period_end(bars.index[-1], freq)
+    bars['Partial'] = partial
+
+    return bars
+
+
+class BarResampler:
+    """Cached weekly/monthly bars built from the daily OHLCV store"""
+
+    def __init__(self, store, cache_dir="data/cache/resampled"):
+        """
+        Args:
+            store: OHLCVStore with daily bars
+            cache_dir: Directory for cached bars (None keeps them in memory only)
+        """
+        self.store = store
+        self.cache_dir = cache_dir
+        self.memory = {}
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _cache_path(self, ticker, freq):
+        return os.path.join(self.cache_dir, f"{ticker.replace('.', '_')}_{freq}.pkl")
+
+    def _load(self, ticker, freq):
+        key = (ticker, freq)
+        if key in self.memory:
+            return self.memory[key]
+
+        if not self.cache_dir or not os.path.exists(self._cache_path(ticker, freq)):
+            return None
+
+        with open(self._cache_path(ticker, freq), 'rb') as f:
+            entry = pickle.load(f)
+
+        self.memory[key] = entry
+        return entry
+
+    def _save(self, ticker, freq, entry):
+        self.memory[(ticker, freq)] = entry
+
+        if self.cache_dir:
+            path = self._cache_path(ticker, freq)
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + '.tmp', path)
+
+    def bars(self, ticker, freq='weekly', start=None):
+        """
+        Weekly or monthly bars for a ticker, updated from the store as needed
+
+        Args:
+            ticker: Stock ticker
+            freq: 'weekly' or 'monthly'
+            start: Only return periods starting on/after this date (optional)
+
+        Returns:
+            DataFrame of resampled bars, or None if the ticker is not stored
+        """
+        last_daily = self.store.last_date(ticker)
+        if last_daily is None:
+            return None
+
+        revision = self.store.revision(ticker)
+        entry = self._load(ticker, freq)
+
+        if entry is not None and entry['revision'] == revision and entry['last_daily'] == last_daily:
+            bars = entry['bars']
+        elif entry is not None and entry['revision'] == revision and entry['last_daily'] < last_daily and len(entry['bars']):
+            # Rebuild only from the last cached period, which may have been partial
+            last_label = entry['bars'].index[-1]
+            tail = resample_ohlcv(self.store.read(ticker, start=last_label), freq)
+            bars = pd.concat([entry['bars'].iloc[:-1], tail])
+            self._save(ticker, freq, {'revision': revision, 'last_daily': last_daily, 'bars': bars})
+        else:
+            bars = resample_ohlcv(self.store.read(ticker), freq)
+            self._save(ticker, freq, {'revision': revision, 'last_daily': last_daily, 'bars': bars})
+
+        if start is not None:
+            start = pd.Timestamp(start)
+            if start.tz is None and bars.index.tz is not None:
+                start = start.tz_localize(bars.index.tz)
+            bars = bars[bars.index >= period_labels(pd.DatetimeIndex([start]), freq)[0]]
+
+        return bars.copy()
+
+    def weekly(self, ticker, start=None):
+        """Weekly bars for a ticker"""
+        return self.bars(ticker, 'weekly', start)
+
+    def monthly(self, ticker, start=None):
+        """Monthly bars for a ticker"""
+        return self.bars(ticker, 'monthly', start)
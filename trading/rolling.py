@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Linear-Time Rolling Window Kernels
+Rolling min/max/argmin/argmax over full series (1D) or many tickers (2D)
+
+Uses the van Herk / Gil-Werman algorithm: the series is cut into blocks of
+the window length, and every window is covered by the suffix of one block
+plus the prefix of the next. Prefix and suffix extremes are running
+accumulations, so the cost is about three comparisons per bar whatever the
+window length, with no Python loop over bars.
+
+All kernels work along the last axis (bars), skip NaN like pandas rolling
+min/max, and use partial windows at the start of the series (the first
+bars look at fewer than period values).
+
+Pivots are reported on the bar where they become known (right bars after
+the pivot), so they can be used in backtests without lookahead.
+
+rolling_stats computes count/sum/mean/variance/min/max for several window
+lengths from one set of cumulative sums. The cumulative sums restart at
+every block of max(windows) bars and each block is shifted by its own mean,
+so rounding errors grow with the block length rather than the length of
+the series, and flat windows (suspended stocks) keep a variance of ~0.
+"""
+
+import numpy as np
+
+# Window lengths used by the analyzers (SMA 5/10/20/50/200)
+ROLLING_WINDOWS = (5, 10, 20, 50, 200)
+
+ROLLING_STATS = ['count', 'sum', 'mean', 'var', 'std', 'min', 'max']
+
+
+def _blocks(values, period, fill):
+    """Pad the bar axis (period - 1 in front, up to a block multiple at the end) and cut it into blocks"""
+    values = np.asarray(values, dtype=np.float64)
+    bars = values.shape[-1]
+    padded_bars = -(-(bars + period - 1) // period) * period
+    padded = np.full(values.shape[:-1] + (padded_bars,), fill)
+    padded[..., period - 1:period - 1 + bars] = np.where(np.isnan(values), fill, values)
+    return padded.reshape(values.shape[:-1] + (padded_bars // period, period)), bars
+
+
+def _rolling_extreme(values, period, find_max, with_positions=True):
+    """Rolling extreme value and position (latest bar on ties)"""
+    fill = -np.inf if find_max else np.inf
+    better = np.greater if find_max else np.less
+    accumulate = np.maximum.accumulate if find_max else np.minimum.accumulate
+
+    blocks, bars = _blocks(values, period, fill)
+    shape = blocks.shape
+    flat = shape[:-2] + (shape[-2] * period,)
+
+    prefix = accumulate(blocks, axis=-1)
+    suffix = accumulate(blocks[..., ::-1], axis=-1)[..., ::-1]
+
+    if not with_positions:
+        # Window ending at bar t covers padded cells [t, t + period - 1]
+        combine = np.maximum if find_max else np.minimum
+        result = combine(suffix.reshape(flat)[..., :bars], prefix.reshape(flat)[..., period - 1:period - 1 + bars])
+        result[np.isinf(result)] = np.nan
+        return result, None
+
+    positions = np.arange(shape[-2] * period).reshape(shape[-2:]) - (period - 1)
+
+    # Prefix of each block: running extreme, position of its latest occurrence
+    at_prefix = np.ones(shape, dtype=bool)
+    at_prefix[..., 1:] = ~better(prefix[..., :-1], blocks[..., 1:])
+    prefix_pos = np.maximum.accumulate(np.where(at_prefix, positions, -period), axis=-1)
+
+    # Suffix of each block: running extreme from the right, latest occurrence
+    at_suffix = np.ones(shape, dtype=bool)
+    at_suffix[..., :-1] = better(blocks[..., :-1], suffix[..., 1:])
+    suffix_pos = np.minimum.accumulate(np.where(at_suffix, positions, np.iinfo(np.int64).max)[..., ::-1], axis=-1)[..., ::-1]
+
+    prefix, prefix_pos = prefix.reshape(flat), prefix_pos.reshape(flat)
+    suffix, suffix_pos = suffix.reshape(flat), suffix_pos.reshape(flat)
+
+    # Window ending at bar t covers padded cells [t, t + period - 1]
+    left = suffix[..., :bars]
+    right = prefix[..., period - 1:period - 1 + bars]
+    use_right = ~better(left, right)
+
+    result = np.where(use_right, right, left)
+    result_pos = np.where(use_right, prefix_pos[..., period - 1:period - 1 + bars], suffix_pos[..., :bars])
+
+    empty = np.isinf(result)
+    result[empty] = np.nan
+    result_pos[empty] = -1
+
+    return result, result_pos
+
+
+def rolling_max(values, period):
+    """Highest value of the last period bars"""
+    return _rolling_extreme(values, period, True, with_positions=False)[0]
+
+
+def rolling_min(values, period):
+    """Lowest value of the last period bars"""
+    return _rolling_extreme(values, period, False, with_positions=False)[0]
+
+
+def rolling_argmax(values, period):
+    """Bar index of the highest value of the last period bars (latest on ties, -1 if none)"""
+    return _rolling_extreme(values, period, True)[1]
+
+
+def rolling_argmin(values, period):
+    """Bar index of the lowest value of the last period bars (latest on ties, -1 if none)"""
+    return _rolling_extreme(values, period, False)[1]
+
+
+def _confirmed_pivots(positions, left, right):
+    bars = positions.shape[-1]
+    pivot_bar = np.arange(bars) - right
+    return (positions == pivot_bar) & (pivot_bar >= left)
+
+
+def pivot_highs(high, left=5, right=5):
+    """
+    Confirmed pivot highs without lookahead
+
+    A bar is a pivot high when its high is the highest of the left bars
+    before and the right bars after it (later bars win ties).
+
+    Returns:
+        bool array, True on the bar where the pivot becomes known
+        (right bars after the pivot bar)
+    """
+    return _confirmed_pivots(rolling_argmax(high, left + right + 1), left, right)
+
+
+def pivot_lows(low, left=5, right=5):
+    """Confirmed pivot lows without lookahead (see pivot_highs)"""
+    return _confirmed_pivots(rolling_argmin(low, left + right + 1), left, right)
+
+
+def last_pivot_level(values, confirmed, right):
+    """
+    Level of the most recent confirmed pivot at every bar
+
+    Args:
+        values: Highs (for pivot highs) or lows (for pivot lows)
+        confirmed: Output of pivot_highs / pivot_lows
+        right: Confirmation delay used for the pivots
+
+    Returns:
+        float array, NaN before the first confirmed pivot
+    """
+    values = np.asarray(values, dtype=np.float64)
+    bars = values.shape[-1]
+
+    last_seen = np.maximum.accumulate(np.where(confirmed, np.arange(bars), -1), axis=-1)
+    source = np.maximum(last_seen - right, 0)
+    levels = np.take_along_axis(values, source, axis=-1) if values.ndim > 1 else values[source]
+
+    return np.where(last_seen >= 0, levels, np.nan)
+
+
+def _block_sums(values, block, with_squares=True):
+    """
+    Cumulative count/sum/sum of squares restarted at every block
+
+    The bar axis is padded with one empty block in front (so every window
+    start has a block before it) and each block is shifted by its mean.
+
+    Returns:
+        (counts, sums, squares, reference): cumulative arrays flattened back
+        to [..., padded bars] (squares is None unless requested) and the
+        shift of every block [..., blocks]
+    """
+    bars = values.shape[-1]
+    blocks = -(-bars // block) + 1
+    padded = np.full(values.shape[:-1] + (blocks * block,), np.nan)
+    padded[..., block:block + bars] = values
+    shaped = padded.reshape(values.shape[:-1] + (blocks, block))
+
+    valid = ~np.isnan(shaped)
+    shifted = np.where(valid, shaped, 0.0)
+    reference = shifted.sum(axis=-1) / np.maximum(valid.sum(axis=-1), 1)
+
+    shifted -= reference[..., None]
+    shifted[~valid] = 0.0
+    squares = shifted * shifted if with_squares else None
+
+    flat = padded.shape
+    counts = np.cumsum(valid, axis=-1).reshape(flat)
+    sums = np.cumsum(shifted, axis=-1, out=shifted).reshape(flat)
+    if with_squares:
+        squares = np.cumsum(squares, axis=-1, out=squares).reshape(flat)
+
+    return counts, sums, squares, reference
+
+
+def rolling_stats(values, windows=ROLLING_WINDOWS, stats=None, min_periods=None):
+    """
+    Rolling statistics for several window lengths in one pass
+
+    Args:
+        values: 1D series or array[tickers, bars] (NaN = missing bar)
+        windows: Window lengths
+        stats: Subset of ROLLING_STATS (default: all)
+        min_periods: Valid values a window needs (default: the full window,
+                     like pandas rolling); var/std also need at least 2
+
+    Returns:
+        Dictionary of window -> dictionary of stat -> float array shaped like
+        values (var/std use ddof=1, like pandas)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    stats = list(stats or ROLLING_STATS)
+    for stat in stats:
+        if stat not in ROLLING_STATS:
+            raise ValueError(f"Unknown rolling statistic: {stat}")
+
+    with_squares = 'var' in stats or 'std' in stats
+    bars = values.shape[-1]
+    block = max(windows)
+    counts, sums, squares, reference = _block_sums(values, block, with_squares)
+
+    def per_bar(block_values):
+        """Spread one value per block over the bars of the next block"""
+        return np.repeat(block_values, block, axis=-1)[..., :bars]
+
+    def at(cumulative, lag):
+        return cumulative[..., block - lag:block - lag + bars]
+
+    # Shift of each bar's block, and totals of the block before it (in its own shift)
+    block_end = np.arange(block - 1, counts.shape[-1] - block, block)
+    current = per_bar(reference[..., 1:])
+    delta = per_bar(reference[..., :-1] - reference[..., 1:])
+    prev_count = per_bar(counts[..., block_end])
+    prev_sum = per_bar(sums[..., block_end])
+    prev_square = per_bar(squares[..., block_end]) if with_squares else None
+    offset = np.arange(bars) % block
+
+    results = {}
+    for window in windows:
+        # A window that starts in the previous block adds that block's tail,
+        # re-shifted to the current block: sum(x - r) = sum(x - r') + k (r' - r)
+        crosses = offset < window
+        partial = not crosses.all()
+
+        def corrected(cumulative, correction):
+            result = at(cumulative, 0) - at(cumulative, window)
+            if partial:
+                correction *= crosses
+            result += correction
+            return result
+
+        tail_count = prev_count - at(counts, window)
+        tail_sum = prev_sum - at(sums, window)
+        count = corrected(counts, prev_count * crosses if partial else prev_count.copy())
+        if partial:
+            tail_count *= crosses
+            tail_sum *= crosses
+        total = corrected(sums, prev_sum + tail_count * delta)
+
+        required = window if min_periods is None else min(min_periods, window)
+        missing = count < required
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            result = {'count': count}
+            if 'sum' in stats:
+                result['sum'] = total + count * current
+            if 'mean' in stats:
+                result['mean'] = mean + current
+            if with_squares:
+                square = corrected(squares, prev_square + delta * (2 * tail_sum + tail_count * delta))
+                square -= total * mean
+                square /= count - 1
+                variance = np.maximum(square, 0.0, out=square)
+                variance[(count < 2) | missing] = np.nan
+                result['var'] = variance
+                result['std'] = np.sqrt(variance)
+        if 'min' in stats:
+            result['min'] = rolling_min(values, window)
+        if 'max' in stats:
+            result['max'] = rolling_max(values, window)
+
+        for stat in ('sum', 'mean', 'min', 'max'):
+            if stat in result:
+                result[stat][missing] = np.nan
+
+        results[window] = {stat: result[stat] for stat in stats}
+
+    return results
@@ -5,25 +5,40 @@ Analyzes BMRI, BBCA, BBRI, UNTR with weekly charts
 Provides buy/sell signals with price levels
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import time
+import sys
+
+from fetch_engine import FetchEngine
+from history_cache import cached_history, get_cache
+from ohlcv_store import OHLCVStore
+from resample import BarResampler
+import indicators
+from indicator_graph import IndicatorGraph, get_node_cache
 
 class StockAnalyzer:
-    def __init__(self, symbol):
+    def __init__(self, symbol, resampler=None):
         self.symbol = symbol
+        self.resampler = resampler
         self.data = None
+        self.graph = None
         self.current_price = 0
         self.prev_price = 0
         self.weekly_change = 0
 
-    def fetch_data(self):
-        """Fetch stock data from Yahoo Finance with retry logic"""
+    def fetch_data(self, data=None):
+        """Fetch stock data from Yahoo Finance (or use already fetched data)"""
         try:
-            ticker = yf.Ticker(self.symbol)
-            self.data = ticker.history(period="2y", interval="1wk", timeout=30)
+            if data is None and self.resampler is not None:
+                # Offline: weekly bars built from the local daily store
+                data = self.resampler.weekly(self.symbol, start=datetime.now() - timedelta(days=730))
+                if data is None:
+                    return False, "No stored data available"
+            elif data is None:
+                data = cached_history(self.symbol, period="2y", interval="1wk", timeout=30)
+            self.data = data
+            self.graph = IndicatorGraph(data)
 
             if self.data.empty:
                 return False, "No data available"
@@ -41,83 +56,32 @@ class StockAnalyzer:
 
     def calculate_rsi(self, period=14):
         """Calculate RSI indicator"""
-        close_prices = self.data['Close'].tolist()
-        if len(close_prices) < period + 1:
+        if len(self.data) < period + 1:
             return None
-
-        gains = []
-        losses = []
-
-        for i in range(1, len(close_prices)):
-            change = close_prices[i] - close_prices[i-1]
-            if change > 0:
-                gains.append(change)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(change))
-
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-
-        if avg_loss == 0:
-            return 100
-
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return round(rsi, 2)
+        return indicators.last(self.graph.rsi(period), 2)
 
     def calculate_sma(self, period):
         """Calculate Simple Moving Average"""
-        close_prices = self.data['Close'].tolist()
-        if len(close_prices) < period:
-            return None
-        return round(sum(close_prices[-period:]) / period, 2)
+        return indicators.last(self.graph.sma(period), 2)
 
     def calculate_ema(self, period):
         """Calculate Exponential Moving Average"""
-        close_prices = self.data['Close'].tolist()
-        if len(close_prices) < period:
+        if len(self.data) < period:
             return None
-        multiplier = 2 / (period + 1)
-        ema = [close_prices[0]]
-        for price in close_prices[1:]:
-            ema.append(round((price * multiplier) + (ema[-1] * (1 - multiplier)), 2))
-        return ema[-1]
+        return indicators.last(self.graph.ema(period), 2)
 
     def calculate_macd(self, fast=12, slow=26, signal=9):
         """Calculate MACD"""
-        close_prices = self.data['Close'].tolist()
-        if len(close_prices) < slow:
-            return None, None, None
-
-        ema_fast = self.calculate_ema(fast)
-        ema_slow = self.calculate_ema(slow)
-
-        if ema_fast is None or ema_slow is None:
+        if len(self.data) < slow:
             return None, None, None
 
-        macd_line = ema_fast - ema_slow
-
-        # Calculate MACD histogram based on recent prices
-        recent_prices = close_prices[-signal:]
-        if len(recent_prices) < signal:
-            return round(macd_line, 2), None, None
-
-        # Simple signal line calculation
-        avg_change = sum(recent_prices[i] - recent_prices[i-1] for i in range(1, len(recent_prices))) / (len(recent_prices) - 1)
-        signal_line = avg_change
-        histogram = macd_line - signal_line
-
-        return round(macd_line, 2), round(signal_line, 2) if signal_line else 0, round(histogram, 2)
+        macd_line, signal_line, histogram = self.graph.macd(fast, slow, signal)
+        return indicators.last(macd_line, 2), indicators.last(signal_line, 2), indicators.last(histogram, 2)
 
     def find_support_resistance(self, period=20):
         """Find key support and resistance levels"""
-        close_prices = self.data['Close'].tolist()
-        recent_prices = close_prices[-period:]
-        support = round(min(recent_prices), 0)
-        resistance = round(max(recent_prices), 0)
-        return support, resistance
+        support, resistance = self.graph.support_resistance(period)
+        return indicators.last(support, 0), indicators.last(resistance, 0)
 
     def generate_signal(self):
         """Generate buy/sell signal based on technical analysis"""
@@ -215,9 +179,9 @@ class StockAnalyzer:
             'current': round(self.current_price, 0)
         }
 
-    def analyze(self):
+    def analyze(self, data=None):
         """Perform complete analysis"""
-        success, message = self.fetch_data()
+        success, message = self.fetch_data(data)
         if not success:
             return False, message
 
@@ -290,20 +254,25 @@ def main():
 
     results = {}
 
+    # --offline builds weekly bars from the local daily store (no network)
+    offline = '--offline' in sys.argv
+    resampler = BarResampler(OHLCVStore()) if offline else None
+
+    if not offline:
+        # Fetch all stocks concurrently (rate limited, retried with backoff)
+        print(f"\n⏳ Fetching {len(stocks)} stocks...")
+        fetched = FetchEngine().fetch_history(stocks, period="2y", interval="1wk", timeout=30)
+
     for stock in stocks:
         print(f"\n⏳ Analyzing {stock}...")
-        analyzer = StockAnalyzer(stock)
+        analyzer = StockAnalyzer(stock, resampler=resampler)
 
-        # Retry logic for API calls
-        max_retries = 3
-        for attempt in range(max_retries):
+        if offline:
             result = analyzer.analyze()
-            if result[0]:
-                break
-            else:
-                print(f"   ⚠️ Attempt {attempt + 1}/{max_retries}: {result[1]}")
-                if attempt < max_retries - 1:
-                    time.sleep(2)  # Wait before retry
+        elif fetched[stock].error is not None:
+            result = (False, str(fetched[stock].error))
+        else:
+            result = analyzer.analyze(fetched[stock].data)
 
         results[stock] = result
         display_analysis(result)
@@ -323,6 +292,12 @@ def main():
         else:
             print(f"\n{stock}: ❌ Analysis failed - {result[1]}")
 
+    stats = get_cache().stats()
+    print(f"\n📦 History cache: {stats['hits'] + stats['disk_hits']} hits, {stats['misses']} misses")
+
+    stats = get_node_cache().stats()
+    print(f"🧮 Indicator graph: {stats['hits']} hits, {stats['misses']} computed")
+
     print(f"\n{'='*70}\n")
 
 if __name__ == "__main__":
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Streaming Technical Indicators
+Stateful indicators that update in O(1) per bar instead of recomputing history
+
+Indicators:
+1. StreamingEMA - Exponential moving average
+2. StreamingSMA / StreamingVolumeMA - Simple moving average (ring buffer)
+3. StreamingRSI - RSI with Wilder smoothing
+4. StreamingMACD - MACD line, signal line and histogram
+5. StreamingBollinger - Bollinger Bands and bandwidth (ring buffer)
+6. StreamingATR - Average True Range
+
+Every indicator has:
+- update(...) - Add a completed bar and return the new value
+- peek(...) - Value if the current bar closed at the given quote, without
+  changing the state (for intraday refreshes)
+- to_dict() / from_state(dict) - JSON-serializable state
+
+Values match the full-series functions in indicators.py (RSI with
+method='wilder'); None is returned while an indicator is warming up.
+
+Example:
+    rsi = StreamingRSI(14)
+    rsi.extend(history['Close'])
+    save_state({'BMRI.JK:rsi': rsi}, 'data/state/indicators.json')
+    ...
+    state = load_state('data/state/indicators.json')
+    state['BMRI.JK:rsi'].peek(latest_quote)
+
+watchlist.py refreshes a watchlist's daily indicators this way.
+"""
+
+from collections import deque
+import json
+import math
+import os
+
+
+class StreamingIndicator:
+    """Base class for incremental indicators"""
+
+    # Class name -> class, for restoring saved state
+    registry = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        StreamingIndicator.registry[cls.__name__] = cls
+
+    def params(self):
+        """Constructor arguments"""
+        raise NotImplementedError
+
+    def state(self):
+        """Mutable state as JSON-serializable values"""
+        raise NotImplementedError
+
+    def set_state(self, state):
+        raise NotImplementedError
+
+    def update(self, *bar):
+        raise NotImplementedError
+
+    def peek(self, *bar):
+        raise NotImplementedError
+
+    def extend(self, *columns):
+        """Feed a history of bars (one sequence per update argument)"""
+        value = None
+        for bar in zip(*columns):
+            value = self.update(*bar)
+        return value
+
+    def to_dict(self):
+        return {'type': type(self).__name__, 'params': self.params(), 'state': self.state()}
+
+    @staticmethod
+    def from_state(data):
+        """Rebuild an indicator saved with to_dict()"""
+        indicator = StreamingIndicator.registry[data['type']](**data['params'])
+        indicator.set_state(data['state'])
+        return indicator
+
+
+class StreamingEMA(StreamingIndicator):
+    """Exponential moving average, seeded with the first value"""
+
+    def __init__(self, period):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.value = None
+
+    def params(self):
+        return {'period': self.period}
+
+    def state(self):
+        return {'value': self.value}
+
+    def set_state(self, state):
+        self.value = state['value']
+
+    def peek(self, price):
+        if self.value is None:
+            return float(price)
+        return self.value + self.alpha * (price - self.value)
+
+    def update(self, price):
+        self.value = self.peek(price)
+        return self.value
+
+
+class StreamingSMA(StreamingIndicator):
+    """Simple moving average over a ring buffer"""
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.updates = 0
+
+    def params(self):
+        return {'period': self.period}
+
+    def state(self):
+        return {'window': list(self.window), 'total': self.total, 'updates': self.updates}
+
+    def set_state(self, state):
+        self.window = deque(state['window'], maxlen=self.period)
+        self.total = state['total']
+        self.updates = state['updates']
+
+    def _next_total(self, value):
+        if len(self.window) == self.period:
+            return self.total + value - self.window[0]
+        return self.total + value
+
+    @property
+    def value(self):
+        return self.total / self.period if len(self.window) == self.period else None
+
+    def peek(self, value):
+        if len(self.window) + 1 < self.period:
+            return None
+        return self._next_total(value) / self.period
+
+    def update(self, value):
+        value = float(value)
+        self.total = self._next_total(value)
+        self.window.append(value)
+
+        # Resum once per window to stop floating point drift (amortized O(1))
+        self.updates += 1
+        if self.updates % self.period == 0:
+            self.total = math.fsum(self.window)
+
+        return self.value
+
+
+class StreamingVolumeMA(StreamingSMA):
+    """Rolling volume moving average"""
+
+    def __init__(self, period=20):
+        super().__init__(period)
+
+
+class _WilderAverage:
+    """Wilder smoothing seeded with the simple average of the first period values"""
+
+    def __init__(self, period):
+        self.period = period
+        self.count = 0
+        self.total = 0.0
+        self.value = None
+
+    def state(self):
+        return {'count': self.count, 'total': self.total, 'value': self.value}
+
+    def set_state(self, state):
+        self.count = state['count']
+        self.total = state['total']
+        self.value = state['value']
+
+    def peek(self, x):
+        if self.value is not None:
+            return self.value + (x - self.value) / self.period
+        if self.count + 1 == self.period:
+            return (self.total + x) / self.period
+        return None
+
+    def update(self, x):
+        new_value = self.peek(x)
+        self.count += 1
+        if self.value is None:
+            self.total += x
+        self.value = new_value
+        return self.value
+
+
+class StreamingRSI(StreamingIndicator):
+    """RSI with Wilder smoothing"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev_close = None
+        self.gains = _WilderAverage(period)
+        self.losses = _WilderAverage(period)
+
+    def params(self):
+        return {'period': self.period}
+
+    def state(self):
+        return {'prev_close': self.prev_close, 'gains': self.gains.state(), 'losses': self.losses.state()}
+
+    def set_state(self, state):
+        self.prev_close = state['prev_close']
+        self.gains.set_state(state['gains'])
+        self.losses.set_state(state['losses'])
+
+    @staticmethod
+    def _rsi(avg_gain, avg_loss):
+        if avg_gain is None or avg_loss is None:
+            return None
+        if avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    @property
+    def value(self):
+        return self._rsi(self.gains.value, self.losses.value)
+
+    def peek(self, close):
+        if self.prev_close is None:
+            return None
+        change = close - self.prev_close
+        return self._rsi(self.gains.peek(max(change, 0.0)), self.losses.peek(max(-change, 0.0)))
+
+    def update(self, close):
+        close = float(close)
+        if self.prev_close is not None:
+            change = close - self.prev_close
+            self.gains.update(max(change, 0.0))
+            self.losses.update(max(-change, 0.0))
+        self.prev_close = close
+        return self.value
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD line, signal line and histogram"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+
+    def params(self):
+        return {'fast': self.fast.period, 'slow': self.slow.period, 'signal': self.signal.period}
+
+    def state(self):
+        return {'fast': self.fast.state(), 'slow': self.slow.state(), 'signal': self.signal.state()}
+
+    def set_state(self, state):
+        self.fast.set_state(state['fast'])
+        self.slow.set_state(state['slow'])
+        self.signal.set_state(state['signal'])
+
+    @property
+    def value(self):
+        if self.signal.value is None:
+            return None
+        line = self.fast.value - self.slow.value
+        return line, self.signal.value, line - self.signal.value
+
+    def peek(self, close):
+        line = self.fast.peek(close) - self.slow.peek(close)
+        signal = self.signal.peek(line)
+        return line, signal, line - signal
+
+    def update(self, close):
+        line = self.fast.update(close) - self.slow.update(close)
+        self.signal.update(line)
+        return self.value
+
+
+class StreamingBollinger(StreamingIndicator):
+    """Bollinger Bands over a ring buffer with running sums"""
+
+    def __init__(self, period=20, std_dev=2):
+        self.period = period
+        self.std_dev = std_dev
+        self.window = deque(maxlen=period)
+        # Sums of (x - shift) keep the variance accurate for large prices
+        self.shift = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+
+    def params(self):
+        return {'period': self.period, 'std_dev': self.std_dev}
+
+    def state(self):
+        return {
+            'window': list(self.window),
+            'shift': self.shift,
+            'total': self.total,
+            'total_sq': self.total_sq,
+            'updates': self.updates,
+        }
+
+    def set_state(self, state):
+        self.window = deque(state['window'], maxlen=self.period)
+        self.shift = state['shift']
+        self.total = state['total']
+        self.total_sq = state['total_sq']
+        self.updates = state['updates']
+
+    def _bands(self, total, total_sq):
+        n = self.period
+        mean = total / n
+        variance = max((total_sq - total * mean) / (n - 1), 0.0)
+        middle = mean + self.shift
+        std = math.sqrt(variance)
+        upper = middle + std * self.std_dev
+        lower = middle - std * self.std_dev
+        return upper, middle, lower, (upper - lower) / middle
+
+    def _next_sums(self, price):
+        d = price - self.shift
+        total = self.total + d
+        total_sq = self.total_sq + d * d
+        if len(self.window) == self.period:
+            old = self.window[0] - self.shift
+            total -= old
+            total_sq -= old * old
+        return total, total_sq
+
+    @property
+    def value(self):
+        if len(self.window) < self.period:
+            return None
+        return self._bands(self.total, self.total_sq)
+
+    def peek(self, close):
+        if len(self.window) + 1 < self.period or self.shift is None:
+            return None
+        return self._bands(*self._next_sums(close))
+
+    def update(self, close):
+        close = float(close)
+        if self.shift is None:
+            self.shift = close
+
+        self.total, self.total_sq = self._next_sums(close)
+        self.window.append(close)
+
+        # Resum once per window to stop floating point drift (amortized O(1))
+        self.updates += 1
+        if self.updates % self.period == 0:
+            self.total = math.fsum(x - self.shift for x in self.window)
+            self.total_sq = math.fsum((x - self.shift) ** 2 for x in self.window)
+
+        return self.value
+
+
+class StreamingATR(StreamingIndicator):
+    """Average True Range ('sma' rolling mean or 'wilder' smoothing)"""
+
+    def __init__(self, period=14, method='sma'):
+        if method not in ('sma', 'wilder'):
+            raise ValueError(f"Unknown ATR method: {method}")
+        self.period = period
+        self.method = method
+        self.prev_close = None
+        self.average = StreamingSMA(period) if method == 'sma' else _WilderAverage(period)
+
+    def params(self):
+        return {'period': self.period, 'method': self.method}
+
+    def state(self):
+        return {'prev_close': self.prev_close, 'average': self.average.state()}
+
+    def set_state(self, state):
+        self.prev_close = state['prev_close']
+        self.average.set_state(state['average'])
+
+    def _true_range(self, high, low):
+        if self.prev_close is None:
+            return high - low
+        return max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    @property
+    def value(self):
+        return self.average.value
+
+    def peek(self, high, low, close):
+        return self.average.peek(self._true_range(high, low))
+
+    def update(self, high, low, close):
+        self.average.update(self._true_range(float(high), float(low)))
+        self.prev_close = float(close)
+        return self.value
+
+
+def save_state(indicators, path):
+    """
+    Save named indicators to a JSON file
+
+    Args:
+        indicators: Dictionary of name -> StreamingIndicator
+        path: Output JSON file
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path + '.tmp', 'w') as f:
+        json.dump({name: indicator.to_dict() for name, indicator in indicators.items()}, f)
+    os.replace(path + '.tmp', path)
+
+
+def load_state(path):
+    """Load named indicators saved with save_state() (empty if the file does not exist)"""
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as f:
+        data = json.load(f)
+
+    return {name: StreamingIndicator.from_state(entry) for name, entry in data.items()}
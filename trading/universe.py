@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped Stock Universe
+Dense [tickers x bars] OHLCV arrays on disk for zero-copy multi-ticker loading
+
+Layout:
+    {path}/tickers.json   - ticker index and metadata
+    {path}/dates.npy      - datetime64[D] shared date axis (Asia/Jakarta sessions)
+    {path}/open.npy       - float64[tickers, bars]
+    {path}/high.npy       - float64[tickers, bars]
+    {path}/low.npy        - float64[tickers, bars]
+    {path}/close.npy      - float64[tickers, bars]
+    {path}/volume.npy     - float64[tickers, bars]
+
+Bars where a ticker did not trade (not listed yet, suspended, missing) are NaN.
+Arrays are opened with np.load(mmap_mode='r'), so opening the universe is
+instant and only the pages that are actually read get loaded.
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+import os
+import json
+import shutil
+
+from ohlcv_store import TIMEZONE, session_date
+
+FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+FIELD_COLUMNS = {
+    'open': 'Open',
+    'high': 'High',
+    'low': 'Low',
+    'close': 'Close',
+    'volume': 'Volume',
+}
+
+
+def build_universe(store, path, tickers=None, start=None, end=None):
+    """
+    Build a memory-mapped universe from the OHLCV store
+
+    Args:
+        store: OHLCVStore with daily bars
+        path: Output directory for the universe files
+        tickers: List of tickers (default: every ticker in the store)
+        start: First date to include (optional)
+        end: Last date to include (optional)
+
+    Returns:
+        Universe opened read-only
+    """
+    tickers = list(dict.fromkeys(tickers if tickers is not None else store.tickers()))
+
+    frames = {}
+    for ticker in tickers:
+        frame = store.read(ticker, start=start, end=end)
+        if frame is not None and not frame.empty:
+            frames[ticker] = frame
+
+    tickers = list(frames)
+    if frames:
+        dates = np.unique(np.concatenate([
+            frame.index.tz_localize(None).values.astype('datetime64[D]') for frame in frames.values()
+        ]))
+    else:
+        dates = np.array([], dtype='datetime64[D]')
+
+    # Build next to the target and swap in, so readers never see a partial universe
+    tmp_path = path.rstrip(os.sep) + '.tmp'
+    if os.path.isdir(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    np.save(os.path.join(tmp_path, 'dates.npy'), dates)
+
+    positions = {
+        ticker: np.searchsorted(dates, frame.index.tz_localize(None).values.astype('datetime64[D]'))
+        for ticker, frame in frames.items()
+    }
+
+    for field in FIELDS:
+        values = np.lib.format.open_memmap(
+            os.path.join(tmp_path, f"{field}.npy"), mode='w+', dtype=np.float64, shape=(len(tickers), len(dates))
+        )
+        values[:] = np.nan
+        for row, ticker in enumerate(tickers):
+            values[row, positions[ticker]] = frames[ticker][FIELD_COLUMNS[field]].to_numpy(dtype=np.float64)
+        values.flush()
+        del values
+
+    with open(os.path.join(tmp_path, 'tickers.json'), 'w') as f:
+        json.dump({
+            'tickers': tickers,
+            'fields': FIELDS,
+            'timezone': TIMEZONE,
+            'bars': len(dates),
+            'created': datetime.now().isoformat(timespec='seconds'),
+        }, f, indent=2)
+
+    # Move the old universe aside before swapping the new one in, and delete
+    # it only afterwards: path is missing just between two renames instead of
+    # for a whole rmtree, and readers that already mapped the old arrays keep
+    # their (unlinked) files
+    old_path = path.rstrip(os.sep) + '.old'
+    if os.path.isdir(old_path):
+        shutil.rmtree(old_path)
+    if os.path.isdir(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if os.path.isdir(old_path):
+        shutil.rmtree(old_path)
+
+    return Universe(path)
+
+
+class Universe:
+    """Read-only view of a memory-mapped [tickers x bars] OHLCV universe"""
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(os.path.join(path, 'tickers.json')) as f:
+            self.meta = json.load(f)
+
+        self.tickers = self.meta['tickers']
+        self.ticker_index = {ticker: row for row, ticker in enumerate(self.tickers)}
+        self.dates = np.load(os.path.join(path, 'dates.npy'), mmap_mode='r')
+        self._fields = {}
+
+    @property
+    def shape(self):
+        return (len(self.tickers), len(self.dates))
+
+    @property
+    def date_index(self):
+        """Shared date axis as an Asia/Jakarta DatetimeIndex"""
+        return pd.DatetimeIndex(np.asarray(self.dates).astype('datetime64[ns]')).tz_localize(TIMEZONE)
+
+    def index(self, ticker):
+        """Row number of a ticker"""
+        if ticker not in self.ticker_index:
+            raise KeyError(f"{ticker} is not in the universe")
+        return self.ticker_index[ticker]
+
+    def field(self, name):
+        """Memory-mapped float64[tickers, bars] array for one OHLCV field"""
+        if name not in FIELDS:
+            raise ValueError(f"Unknown field: {name}")
+        if name not in self._fields:
+            self._fields[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r')
+        return self._fields[name]
+
+    def date_slice(self, start=None, end=None):
+        """Column slice covering [start, end] on the shared date axis"""
+        lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(session_date(start).date(), 'D'), side='left')
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, np.datetime64(session_date(end).date(), 'D'), side='right')
+        return slice(int(lo), int(hi))
+
+    def row(self, ticker, name, start=None, end=None):
+        """Zero-copy view of one field for one ticker"""
+        return self.field(name)[self.index(ticker), self.date_slice(start, end)]
+
+    def matrices(self, fields=None, tickers=None, start=None, end=None):
+        """
+        Dense arrays for several fields, optionally restricted to tickers and dates
+
+        Returns:
+            Dictionary of field -> array[tickers, bars] (views when tickers is None)
+        """
+        fields = fields or FIELDS
+        columns = self.date_slice(start, end)
+
+        if tickers is None:
+            return {name: self.field(name)[:, columns] for name in fields}
+
+        rows = [self.index(ticker) for ticker in tickers]
+        return {name: self.field(name)[rows, columns] for name in fields}
+
+    def frame(self, ticker, start=None, end=None):
+        """
+        OHLCV DataFrame for one ticker (bars where it did not trade are dropped)
+
+        Returns:
+            DataFrame with the same columns and index as OHLCVStore.read
+        """
+        columns = self.date_slice(start, end)
+        row = self.index(ticker)
+
+        data = {FIELD_COLUMNS[name]: np.asarray(self.field(name)[row, columns]) for name in FIELDS}
+        index = self.date_index[columns]
+        index.name = 'Date'
+
+        frame = pd.DataFrame(data, index=index).dropna()
+        frame['Volume'] = frame['Volume'].astype(np.int64)
+
+        return frame
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Volume Profile and VWAP Engine
+Price-by-volume histograms, anchored VWAP and on-balance volume
+
+Inputs are 1D series or [tickers x bars] matrices (bars on the last axis).
+Histograms are built with one np.bincount over all tickers: each bar's
+volume is spread evenly over the price bins its high-low range covers
+(added at the first bin, removed after the last bin, then a cumulative
+sum along the bins), so no Python loop runs over bars or tickers.
+
+Levels of a profile:
+- Point of control (POC): middle of the bin with the most volume
+- Value area (VAL..VAH): price range of the highest-volume bins that
+  together hold VALUE_AREA (70%) of the volume
+
+ProfileCache keeps the levels per (ticker, window, bins, last bar date,
+hash of the window's bars), so screening the same universe again only
+computes new or updated tickers, and restated history (a split or
+adjustment rewriting stored bars) is never served from the cache.
+"""
+
+import numpy as np
+from collections import OrderedDict
+import hashlib
+
+VALUE_AREA = 0.70
+
+
+def _rows(values):
+    return np.atleast_2d(np.asarray(values, dtype=np.float64))
+
+
+def _like_input(result, values):
+    """Drop the row axis again for 1D input"""
+    return result[0] if np.ndim(values) == 1 else result
+
+
+def volume_profile(high, low, volume, bins=50):
+    """
+    Price-by-volume histogram of every row
+
+    Args:
+        high, low, volume: 1D series or array[tickers, bars] (NaN bars are ignored)
+        bins: Number of price bins between the lowest low and highest high
+
+    Returns:
+        (edges, volumes): bin edges [..., bins + 1] and volume per bin [..., bins]
+        (NaN edges for rows without data)
+    """
+    high_rows, low_rows, volume_rows = _rows(high), _rows(low), _rows(volume)
+    tickers = high_rows.shape[0]
+
+    valid = ~(np.isnan(high_rows) | np.isnan(low_rows) | np.isnan(volume_rows))
+    with np.errstate(invalid='ignore'):
+        top = np.max(np.where(valid, high_rows, -np.inf), axis=1)
+        bottom = np.min(np.where(valid, low_rows, np.inf), axis=1)
+    empty = ~valid.any(axis=1)
+    top[empty] = np.nan
+    bottom[empty] = np.nan
+
+    # Flat rows (one price) put everything in the first bin
+    span = np.where(top > bottom, top - bottom, 1.0)
+    edges = bottom[:, None] + span[:, None] * np.arange(bins + 1) / bins
+
+    scale = (bins / span)[:, None]
+    with np.errstate(invalid='ignore'):
+        first = np.clip(np.floor((low_rows - bottom[:, None]) * scale), 0, bins - 1)
+        last = np.clip(np.floor((high_rows - bottom[:, None]) * scale), 0, bins - 1)
+
+    first = first[valid].astype(np.int64)
+    last = last[valid].astype(np.int64)
+    weight = volume_rows[valid] / (last - first + 1)
+    offset = np.nonzero(valid)[0] * (bins + 1)
+
+    size = tickers * (bins + 1)
+    steps = np.bincount(first + offset, weight, minlength=size) - np.bincount(last + 1 + offset, weight, minlength=size)
+    volumes = np.cumsum(steps.reshape(tickers, bins + 1), axis=1)[:, :bins]
+    np.maximum(volumes, 0.0, out=volumes)
+
+    return _like_input(edges, high), _like_input(volumes, high)
+
+
+def profile_levels(edges, volumes, value_area=VALUE_AREA):
+    """
+    Point of control and value area of one or many profiles
+
+    Returns:
+        (poc, val, vah): floats (1D profile) or arrays[tickers]; NaN without volume
+    """
+    edge_rows, volume_rows = _rows(edges), _rows(volumes)
+    tickers, bins = volume_rows.shape
+    rows = np.arange(tickers)
+    total = volume_rows.sum(axis=1)
+
+    peak = np.argmax(volume_rows, axis=1)
+    poc = (edge_rows[rows, peak] + edge_rows[rows, peak + 1]) / 2
+
+    # Highest-volume bins until they hold the value area share
+    order = np.argsort(-volume_rows, axis=1, kind='stable')
+    held = np.cumsum(np.take_along_axis(volume_rows, order, axis=1), axis=1)
+    needed = np.minimum(np.sum(held < value_area * total[:, None], axis=1) + 1, bins)
+    chosen = np.zeros((tickers, bins), dtype=bool)
+    np.put_along_axis(chosen, order, np.arange(bins) < needed[:, None], axis=1)
+
+    val = edge_rows[rows, np.argmax(chosen, axis=1)]
+    vah = edge_rows[rows, bins - np.argmax(chosen[:, ::-1], axis=1)]
+
+    missing = ~(total > 0)
+    for levels in (poc, val, vah):
+        levels[missing] = np.nan
+
+    if np.ndim(volumes) == 1:
+        return float(poc[0]), float(val[0]), float(vah[0])
+    return poc, val, vah
+
+
+def anchored_vwap(high, low, close, volume, anchor=0):
+    """
+    Volume-weighted average typical price since an anchor bar
+
+    Args:
+        high, low, close, volume: 1D series or array[tickers, bars]
+        anchor: Bar index to start from (int, or int array[tickers] per row)
+
+    Returns:
+        float array shaped like close (NaN before the anchor)
+    """
+    high_rows, low_rows, close_rows, volume_rows = _rows(high), _rows(low), _rows(close), _rows(volume)
+    bars = close_rows.shape[1]
+    rows = np.arange(close_rows.shape[0])
+
+    typical = (high_rows + low_rows + close_rows) / 3
+    weighted = np.nan_to_num(typical * volume_rows, nan=0.0)
+    traded = np.where(np.isnan(typical), 0.0, np.nan_to_num(volume_rows, nan=0.0))
+
+    # Leading zero column so the sums before bar 0 are 0
+    cum_weighted = np.zeros((len(rows), bars + 1))
+    cum_traded = np.zeros((len(rows), bars + 1))
+    np.cumsum(weighted, axis=1, out=cum_weighted[:, 1:])
+    np.cumsum(traded, axis=1, out=cum_traded[:, 1:])
+
+    anchor = np.broadcast_to(np.asarray(anchor, dtype=np.int64), rows.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap = (cum_weighted[:, 1:] - cum_weighted[rows, anchor][:, None]) / (cum_traded[:, 1:] - cum_traded[rows, anchor][:, None])
+    vwap[np.arange(bars) < anchor[:, None]] = np.nan
+
+    return _like_input(vwap, close)
+
+
+def on_balance_volume(close, volume):
+    """On-balance volume (volume added on up closes, subtracted on down closes; 0 on the first bar)"""
+    close_rows, volume_rows = _rows(close), _rows(volume)
+
+    direction = np.zeros(close_rows.shape)
+    direction[:, 1:] = np.sign(np.nan_to_num(close_rows[:, 1:] - close_rows[:, :-1], nan=0.0))
+    flow = direction * np.nan_to_num(volume_rows, nan=0.0)
+
+    return _like_input(np.cumsum(flow, axis=1), close)
+
+
+class ProfileCache:
+    """LRU cache of point of control and value area per (ticker, window, bins, last bar date, bars hash)"""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.levels = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cross_section(self, cs, window=60, bins=50):
+        """
+        Volume profile levels over the last window bars of every ticker
+
+        Args:
+            cs: CrossSection (packed OHLCV)
+
+        Returns:
+            (poc, val, vah): float arrays[tickers]
+        """
+        high = cs.tail('High', window)
+        low = cs.tail('Low', window)
+        volume = cs.tail('Volume', window)
+
+        # The bars themselves are part of the key, so restated history is recomputed
+        bars = np.stack([high, low, volume], axis=1)
+        keys = [
+            (ticker, window, bins, date, hashlib.sha1(bars[row].tobytes()).hexdigest())
+            for row, (ticker, date) in enumerate(zip(cs.tickers, cs.last_dates()))
+        ]
+
+        found = {}
+        for row, key in enumerate(keys):
+            if key in self.levels:
+                self.levels.move_to_end(key)
+                found[row] = self.levels[key]
+        missing = np.array([row for row in range(len(keys)) if row not in found], dtype=np.int64)
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        if len(missing):
+            edges, volumes = volume_profile(high[missing], low[missing], volume[missing], bins)
+            computed = profile_levels(edges, volumes)
+            for position, row in enumerate(missing):
+                found[row] = tuple(float(levels[position]) for levels in computed)
+                self.levels[keys[row]] = found[row]
+            while len(self.levels) > self.max_entries:
+                self.levels.popitem(last=False)
+                self.evictions += 1
+
+        levels = np.array([found[row] for row in range(len(keys))]).reshape(len(keys), 3)
+        return levels[:, 0], levels[:, 1], levels[:, 2]
+
+
+_default_cache = ProfileCache()
+
+
+def get_profile_cache():
+    """Process-wide volume profile cache"""
+    return _default_cache
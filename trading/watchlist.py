@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Intraday Watchlist Refresh
+Live daily RSI, MACD, Bollinger Bands, ATR and volume MA from saved streaming state
+
+Each ticker's daily indicators are kept as streaming state
+(streaming_indicators.py) in data/state/watchlist.json. A refresh:
+1. Feeds only the completed daily bars stored since the previous refresh
+   (OHLCVStore) into update() - usually none or one bar per ticker
+2. Evaluates the current session's quote with peek(), without changing state
+3. Saves the state again
+
+Repeated intraday refreshes therefore cost one quote request per ticker
+and no indicator recomputation over history. RSI uses Wilder smoothing.
+
+Usage:
+    python3 trading/watchlist.py [--no-quotes]
+"""
+
+import pandas as pd
+from datetime import datetime, timedelta
+import sys
+
+from fetch_engine import FetchEngine, report_errors
+from ohlcv_store import OHLCVStore, TIMEZONE
+from streaming_indicators import (
+    StreamingIndicator, StreamingRSI, StreamingMACD, StreamingBollinger, StreamingATR, StreamingVolumeMA,
+    save_state, load_state,
+)
+
+STATE_FILE = "data/state/watchlist.json"
+
+
+class WatchlistIndicators(StreamingIndicator):
+    """Daily indicators of one ticker, plus the date of the last completed bar fed in"""
+
+    def __init__(self, rsi_period=14, bb_period=20, atr_period=14, volume_period=20):
+        self.rsi = StreamingRSI(rsi_period)
+        self.macd = StreamingMACD()
+        self.bollinger = StreamingBollinger(bb_period)
+        self.atr = StreamingATR(atr_period)
+        self.volume_ma = StreamingVolumeMA(volume_period)
+        self.last_date = None
+
+    def params(self):
+        return {
+            'rsi_period': self.rsi.period,
+            'bb_period': self.bollinger.period,
+            'atr_period': self.atr.period,
+            'volume_period': self.volume_ma.period,
+        }
+
+    def state(self):
+        return {
+            'last_date': self.last_date,
+            'rsi': self.rsi.state(),
+            'macd': self.macd.state(),
+            'bollinger': self.bollinger.state(),
+            'atr': self.atr.state(),
+            'volume_ma': self.volume_ma.state(),
+        }
+
+    def set_state(self, state):
+        self.last_date = state['last_date']
+        self.rsi.set_state(state['rsi'])
+        self.macd.set_state(state['macd'])
+        self.bollinger.set_state(state['bollinger'])
+        self.atr.set_state(state['atr'])
+        self.volume_ma.set_state(state['volume_ma'])
+
+    @staticmethod
+    def _readings(rsi, macd, bands, atr, volume_ma):
+        return {
+            'rsi': rsi,
+            'macd_hist': macd[2] if macd else None,
+            'bandwidth': bands[3] if bands else None,
+            'bb_mid': bands[1] if bands else None,
+            'atr': atr,
+            'volume_ma': volume_ma,
+        }
+
+    @property
+    def value(self):
+        return self._readings(self.rsi.value, self.macd.value, self.bollinger.value, self.atr.value, self.volume_ma.value)
+
+    def peek(self, high, low, close, volume):
+        return self._readings(
+            self.rsi.peek(close), self.macd.peek(close), self.bollinger.peek(close),
+            self.atr.peek(high, low, close), self.volume_ma.peek(volume)
+        )
+
+    def update(self, high, low, close, volume):
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.bollinger.update(close)
+        self.atr.update(high, low, close)
+        self.volume_ma.update(volume)
+        return self.value
+
+
+def refresh_watchlist(tickers, store, state, quotes=None):
+    """
+    Bring every ticker's state up to its last completed stored bar and read the live values
+
+    Args:
+        tickers: List of stock tickers
+        store: OHLCVStore with daily bars
+        state: Dictionary of ticker -> WatchlistIndicators (updated in place, new tickers added)
+        quotes: Dictionary of ticker -> current session bar (Series with High/Low/Close/Volume)
+
+    Returns:
+        Dictionary of ticker -> {'bars_added', 'last_date', 'quote_date', 'price', readings...}
+    """
+    quotes = quotes or {}
+    today = pd.Timestamp.now(tz=TIMEZONE).normalize()
+    results = {}
+
+    for ticker in tickers:
+        indicators = state.get(ticker) or WatchlistIndicators()
+
+        # Completed bars only: a bar stored during today's session is still changing
+        start = pd.Timestamp(indicators.last_date) + timedelta(days=1) if indicators.last_date else None
+        bars = store.read(ticker, start=start, end=today - timedelta(days=1))
+        if bars is not None and not bars.empty:
+            indicators.extend(bars['High'], bars['Low'], bars['Close'], bars['Volume'])
+            indicators.last_date = bars.index[-1].strftime('%Y-%m-%d')
+
+        added = 0 if bars is None else len(bars)
+        if indicators.last_date is None:
+            continue
+        state[ticker] = indicators
+
+        quote = quotes.get(ticker)
+        quote_date = quote.name.tz_convert(TIMEZONE).normalize() if quote is not None else None
+        if quote is not None and quote_date > pd.Timestamp(indicators.last_date).tz_localize(TIMEZONE):
+            readings = indicators.peek(quote['High'], quote['Low'], quote['Close'], quote['Volume'])
+            price = quote['Close']
+        else:
+            readings = indicators.value
+            price = indicators.bollinger.window[-1] if indicators.bollinger.window else None
+            quote_date = None
+
+        results[ticker] = dict(bars_added=added, last_date=indicators.last_date, quote_date=quote_date,
+                               price=price, **readings)
+
+    return results
+
+
+def fetch_quotes(tickers):
+    """Current session bar of every ticker (tickers whose request failed are left out)"""
+    fetched = FetchEngine().fetch_history(tickers, period="1d", timeout=30)
+    report_errors(fetched)
+    return {
+        ticker: result.data.iloc[-1] for ticker, result in fetched.items()
+        if result.error is None and result.data is not None and not result.data.empty
+    }
+
+
+def _format(value, pattern):
+    return pattern.format(value) if value is not None else "n/a"
+
+
+def main():
+    """Refresh the watchlist indicators and print the live readings"""
+    tickers = ["BMRI.JK", "BBCA.JK", "BBRI.JK", "UNTR.JK"]
+
+    print("=" * 70)
+    print("👀 WATCHLIST REFRESH - STREAMING DAILY INDICATORS")
+    print("=" * 70)
+
+    state = load_state(STATE_FILE)
+    quotes = {} if '--no-quotes' in sys.argv else fetch_quotes(tickers)
+
+    results = refresh_watchlist(tickers, OHLCVStore(), state, quotes)
+    save_state(state, STATE_FILE)
+
+    for ticker in tickers:
+        if ticker not in results:
+            print(f"\n{ticker}: ❌ No stored daily bars (run download_stock_data.py first)")
+            continue
+
+        r = results[ticker]
+        source = f"live quote {r['quote_date'].strftime('%Y-%m-%d')}" if r['quote_date'] is not None else "last close"
+        print(f"\n{ticker}: Rp {_format(r['price'], '{:,.0f}')} ({source}, +{r['bars_added']} bars since last refresh)")
+        print(f"   RSI: {_format(r['rsi'], '{:.1f}')}   MACD Hist: {_format(r['macd_hist'], '{:.2f}')}   "
+              f"Bandwidth: {_format(r['bandwidth'], '{:.3f}')}   ATR: {_format(r['atr'], '{:,.0f}')}")
+
+    print(f"\n✅ State saved to: {STATE_FILE}")
+    print(f"⏰ Refresh Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+
+if __name__ == "__main__":
+    main()